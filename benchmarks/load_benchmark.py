@@ -0,0 +1,114 @@
+"""
+Benchmark loading a hetnetpy.hetnet.Graph from a writable.
+
+Compares adding edges one at a time with Graph.add_edge against the bulk
+columnar Graph.add_edges used by readwrite.graph_from_writable. Timings are
+reported for the bundled random-subgraph.json.xz and for a synthetic graph.
+
+Usage:
+
+    python benchmarks/load_benchmark.py --synthetic-edges 1000000
+"""
+import argparse
+import pathlib
+import random
+import time
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+
+directory = pathlib.Path(__file__).parent.parent
+random_subgraph_path = directory.joinpath("test/data/random-subgraph.json.xz")
+
+
+def load_per_edge(writable):
+    """Create a graph by calling Graph.add_node and Graph.add_edge in a loop."""
+    metagraph = hetnetpy.readwrite.metagraph_from_writable(writable)
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    for node in writable["nodes"]:
+        graph.add_node(**node)
+    for edge in writable["edges"]:
+        graph.add_edge(
+            tuple(edge["source_id"]),
+            tuple(edge["target_id"]),
+            edge["kind"],
+            edge["direction"],
+            edge.get("data", {}),
+        )
+    return graph
+
+
+def load_bulk(writable):
+    """Create a graph with the bulk ingestion of graph_from_writable."""
+    return hetnetpy.readwrite.graph_from_writable(writable)
+
+
+def get_synthetic_writable(n_edges, seed=0):
+    """
+    Return the writable of a bipartite gene-disease graph with n_edges edges
+    and an average degree of 10 for both metanodes.
+    """
+    metagraph = hetnetpy.hetnet.MetaGraph.from_edge_tuples(
+        [("Gene", "Disease", "associates", "both")]
+    )
+    writable = hetnetpy.readwrite.writable_from_metagraph(metagraph)
+    n_nodes = max(1, n_edges // 10)
+    writable["nodes"] = [
+        {"kind": kind, "identifier": i, "name": str(i), "data": {}}
+        for kind in ("Gene", "Disease")
+        for i in range(n_nodes)
+    ]
+    rng = random.Random(seed)
+    pairs = set()
+    while len(pairs) < n_edges:
+        pairs.add((rng.randrange(n_nodes), rng.randrange(n_nodes)))
+    writable["edges"] = [
+        {
+            "source_id": ["Gene", source],
+            "target_id": ["Disease", target],
+            "kind": "associates",
+            "direction": "both",
+            "data": {},
+        }
+        for source, target in pairs
+    ]
+    return writable
+
+
+def benchmark(name, writable, repeats=3):
+    timings = dict()
+    for load in load_per_edge, load_bulk:
+        seconds = list()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            load(writable)
+            seconds.append(time.perf_counter() - start)
+        timings[load.__name__] = min(seconds)
+    speedup = timings["load_per_edge"] / timings["load_bulk"]
+    print(
+        f"{name}: {len(writable['edges']):,} edges, "
+        f"per-edge {timings['load_per_edge']:.3f}s, "
+        f"bulk {timings['load_bulk']:.3f}s, "
+        f"speedup {speedup:.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--synthetic-edges",
+        type=int,
+        default=1_000_000,
+        help="number of edges in the synthetic graph (0 to skip)",
+    )
+    args = parser.parse_args()
+
+    writable = hetnetpy.readwrite.extract_writable(random_subgraph_path)
+    benchmark("random-subgraph.json.xz", writable)
+    if args.synthetic_edges:
+        writable = get_synthetic_writable(args.synthetic_edges)
+        benchmark("synthetic", writable, repeats=1)
+
+
+if __name__ == "__main__":
+    main()
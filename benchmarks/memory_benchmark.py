@@ -0,0 +1,194 @@
+"""
+Benchmark the memory footprint of hetnetpy.hetnet.Graph objects.
+
+Reports bytes per node and bytes per edge (excluding inverts) for the
+bundled random-subgraph.json.xz and for a synthetic graph. Memory is
+measured with tracemalloc as the growth while constructing the graph.
+Pass --virtual-inverses to build graphs that do not store inverse edges.
+Pass --edge-data to give synthetic edges Hetionet-like properties and
+--columnar-data to store node and edge data in columnar property stores.
+
+To compare against another version of hetnetpy, save its results with
+--save and pass them as --baseline. Options are only passed to hetnetpy
+when set, so the default benchmark also runs on versions without them.
+
+Usage:
+
+    git stash  # or check out the baseline version
+    python benchmarks/memory_benchmark.py --synthetic-edges 1000000 --save before.json
+    git stash pop
+    python benchmarks/memory_benchmark.py --synthetic-edges 1000000 --baseline before.json
+"""
+import argparse
+import gc
+import json
+import pathlib
+import random
+import tracemalloc
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+
+directory = pathlib.Path(__file__).parent.parent
+random_subgraph_path = directory.joinpath("test/data/random-subgraph.json.xz")
+
+
+def measure(build):
+    """
+    Return (result, bytes allocated) for calling build.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated
+
+
+def get_graph_kwargs(virtual_inverses=False, columnar_data=False):
+    """Return the Graph options that are set, for versions without them."""
+    kwargs = dict()
+    if virtual_inverses:
+        kwargs["virtual_inverses"] = True
+    if columnar_data:
+        kwargs["columnar_data"] = True
+    return kwargs
+
+
+def build_random_subgraph(writable, virtual_inverses=False, columnar_data=False):
+    return hetnetpy.readwrite.graph_from_writable(
+        writable, **get_graph_kwargs(virtual_inverses, columnar_data)
+    )
+
+
+def get_edge_data(rng):
+    """Return edge properties resembling those of Hetionet edges."""
+    return {
+        "source": rng.choice(["STRING", "HI-II-14", "Lit-BM-13", "II_literature"]),
+        "license": rng.choice(["CC BY 4.0", "CC BY-NC 3.0"]),
+        "unbiased": rng.random() < 0.5,
+        "z_score": rng.gauss(0, 1),
+    }
+
+
+def build_synthetic_graph(
+    n_edges, seed=0, virtual_inverses=False, columnar_data=False, edge_data=False
+):
+    """
+    Create a bipartite gene-disease graph with n_edges undirected edges and
+    an average degree of 10 for both metanodes.
+    """
+    metagraph = hetnetpy.hetnet.MetaGraph.from_edge_tuples(
+        [("Gene", "Disease", "associates", "both")]
+    )
+    graph = hetnetpy.hetnet.Graph(
+        metagraph, **get_graph_kwargs(virtual_inverses, columnar_data)
+    )
+    n_nodes = max(1, n_edges // 10)
+    for i in range(n_nodes):
+        graph.add_node("Gene", i)
+        graph.add_node("Disease", i)
+    rng = random.Random(seed)
+    pairs = set()
+    while len(pairs) < n_edges:
+        pairs.add((rng.randrange(n_nodes), rng.randrange(n_nodes)))
+    for source, target in pairs:
+        data = get_edge_data(rng) if edge_data else {}
+        graph.add_edge(
+            ("Gene", source), ("Disease", target), "associates", "both", data
+        )
+    return graph
+
+
+def report(name, graph, allocated, baseline=None):
+    """
+    Print the memory used by graph and return it as a dict. baseline is a
+    dict returned by report for the same graph, such as from another version.
+    """
+    result = {"n_nodes": graph.n_nodes, "n_edges": graph.n_edges, "bytes": allocated}
+    message = (
+        f"{name}: {graph.n_nodes:,} nodes, {graph.n_edges:,} edges, "
+        f"{allocated / 2**20:,.1f} MiB, "
+        f"{allocated / graph.n_edges:,.0f} bytes per edge "
+        f"(including nodes and inverse edges)"
+    )
+    if baseline is not None:
+        assert baseline["n_edges"] == graph.n_edges, "baseline graph differs"
+        message += (
+            f", baseline {baseline['bytes'] / baseline['n_edges']:,.0f} bytes "
+            f"per edge ({allocated / baseline['bytes']:.2f}x)"
+        )
+    print(message)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--synthetic-edges",
+        type=int,
+        default=10_000_000,
+        help="number of edges in the synthetic graph (0 to skip)",
+    )
+    parser.add_argument(
+        "--virtual-inverses",
+        action="store_true",
+        help="derive inverse edges on access rather than storing them",
+    )
+    parser.add_argument(
+        "--columnar-data",
+        action="store_true",
+        help="store node and edge data in columnar property stores",
+    )
+    parser.add_argument(
+        "--edge-data",
+        action="store_true",
+        help="give synthetic edges Hetionet-like properties",
+    )
+    parser.add_argument(
+        "--save",
+        type=pathlib.Path,
+        help="write results to this JSON file, for use as a baseline",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        help="compare to results written by --save",
+    )
+    args = parser.parse_args()
+    baseline = dict()
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+    results = dict()
+    virtual_inverses = args.virtual_inverses
+    columnar_data = args.columnar_data
+
+    writable = hetnetpy.readwrite.extract_writable(random_subgraph_path)
+    graph, allocated = measure(
+        lambda: build_random_subgraph(writable, virtual_inverses, columnar_data)
+    )
+    name = "random-subgraph.json.xz"
+    results[name] = report(name, graph, allocated, baseline.get(name))
+    del graph
+
+    if args.synthetic_edges:
+        graph, allocated = measure(
+            lambda: build_synthetic_graph(
+                args.synthetic_edges,
+                virtual_inverses=virtual_inverses,
+                columnar_data=columnar_data,
+                edge_data=args.edge_data,
+            )
+        )
+        results["synthetic"] = report(
+            "synthetic", graph, allocated, baseline.get("synthetic")
+        )
+        del graph
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
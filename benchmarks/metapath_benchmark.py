@@ -0,0 +1,71 @@
+"""
+Benchmark MetaGraph.extract_all_metapaths on the Hetionet v1.0 metagraph.
+
+Compares extract_all_metapaths, which extends walks of all source metanodes
+in a single pass, to the previous implementation, which extracted metapaths
+separately for each source metanode and sorted each metapath against its
+inverse. Each timing uses a freshly read metagraph, so that metapaths are
+not reused from path_dict.
+
+Usage:
+
+    python benchmarks/metapath_benchmark.py --max-length 6
+"""
+import argparse
+import pathlib
+import time
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+
+directory = pathlib.Path(__file__).parent.parent
+metagraph_path = directory.joinpath("test/data/hetionet-v1.0-metagraph.json")
+
+
+def extract_all_metapaths_per_source(metagraph, max_length, exclude_inverts=False):
+    """
+    Previous implementation of MetaGraph.extract_all_metapaths.
+    """
+    metapaths = set()
+    for source in metagraph.get_nodes():
+        from_source = metagraph.extract_metapaths(source, max_length=max_length)
+        for metapath in from_source:
+            if exclude_inverts:
+                metapath, _ = sorted([metapath, metapath.inverse])
+            metapaths.add(metapath)
+    return sorted(metapaths)
+
+
+def time_extraction(function, max_length, exclude_inverts):
+    """Return the number of metapaths and seconds to extract them."""
+    metagraph = hetnetpy.readwrite.read_metagraph(metagraph_path)
+    start = time.perf_counter()
+    metapaths = function(metagraph, max_length, exclude_inverts)
+    return len(metapaths), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-length", type=int, default=6)
+    args = parser.parse_args()
+    implementations = [
+        ("per-source", extract_all_metapaths_per_source),
+        ("single-pass", hetnetpy.hetnet.MetaGraph.extract_all_metapaths),
+    ]
+    print("length  exclude_inverts  metapaths  per-source (s)  single-pass (s)")
+    for max_length in range(1, args.max_length + 1):
+        for exclude_inverts in False, True:
+            seconds = list()
+            for _, function in implementations:
+                n_metapaths, elapsed = time_extraction(
+                    function, max_length, exclude_inverts
+                )
+                seconds.append(elapsed)
+            print(
+                f"{max_length:>6}  {str(exclude_inverts):>15}  {n_metapaths:>9}  "
+                f"{seconds[0]:>14.3f}  {seconds[1]:>15.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
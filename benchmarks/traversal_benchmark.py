@@ -0,0 +1,110 @@
+"""
+Benchmark path traversal on a hetnetpy.hetnet.Graph.
+
+Times pathtools.paths_from and DWPC for every source node of a few
+metapaths, and the set operations on nodes and edges underlying them, for
+the bundled random-subgraph.json.xz and a synthetic gene-disease graph.
+
+Usage:
+
+    python benchmarks/traversal_benchmark.py --synthetic-edges 100000
+"""
+import argparse
+import pathlib
+import random
+import time
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+from hetnetpy.pathtools import DWPC, paths_from
+
+directory = pathlib.Path(__file__).parent.parent
+random_subgraph_path = directory.joinpath("test/data/random-subgraph.json.xz")
+
+
+def build_synthetic_graph(n_edges, seed=0):
+    """
+    Create a bipartite gene-disease graph with n_edges undirected edges and
+    an average degree of 10 for both metanodes.
+    """
+    metagraph = hetnetpy.hetnet.MetaGraph.from_edge_tuples(
+        [("Gene", "Disease", "associates", "both")]
+    )
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    n_nodes = max(1, n_edges // 10)
+    graph.add_nodes("Gene", range(n_nodes))
+    graph.add_nodes("Disease", range(n_nodes))
+    rng = random.Random(seed)
+    pairs = set()
+    while len(pairs) < n_edges:
+        pairs.add((rng.randrange(n_nodes), rng.randrange(n_nodes)))
+    sources, targets = zip(*pairs)
+    graph.add_edges("GaD", sources, targets)
+    return graph
+
+
+def time_it(function, repeats=3):
+    """Return the minimum seconds over repeats of calling function."""
+    seconds = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def traverse(graph, metapath, sources):
+    n_paths = 0
+    for source in sources:
+        paths = paths_from(graph, source, metapath)
+        DWPC(paths, damping_exponent=0.4)
+        n_paths += len(paths)
+    return n_paths
+
+
+def set_operations(graph):
+    edges = set(graph.get_edges(exclude_inverts=False))
+    nodes = set(graph.get_nodes())
+    for node in graph.get_nodes():
+        for node_edges in node.edges.values():
+            for edge in node_edges:
+                assert edge in edges
+                assert edge.target in nodes
+                assert edge.source == node
+
+
+def benchmark(name, graph, abbrevs, max_sources=1000):
+    print(f"{name}: {graph.n_nodes:,} nodes, {graph.n_edges:,} edges")
+    seconds = time_it(lambda: set_operations(graph))
+    print(f"  node and edge set operations: {seconds:.3f}s")
+    for abbrev in abbrevs:
+        metapath = graph.metagraph.metapath_from_abbrev(abbrev)
+        nodes = graph.metanode_to_nodes[metapath.source()]
+        sources = nodes[:max_sources]
+        n_paths = traverse(graph, metapath, sources)
+        seconds = time_it(lambda: traverse(graph, metapath, sources))
+        print(
+            f"  {abbrev}: {len(sources):,} sources, {n_paths:,} paths, "
+            f"{seconds:.3f}s, {seconds / max(n_paths, 1) * 1e6:.2f} us/path"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--synthetic-edges",
+        type=int,
+        default=100_000,
+        help="number of edges in the synthetic graph (0 to skip)",
+    )
+    args = parser.parse_args()
+
+    graph = hetnetpy.readwrite.read_graph(random_subgraph_path)
+    benchmark("random-subgraph.json.xz", graph, ["DlAeG", "DlAlD", "DrDlAeG"])
+    if args.synthetic_edges:
+        graph = build_synthetic_graph(args.synthetic_edges)
+        benchmark("synthetic", graph, ["GaDaG", "GaDaGaD"], max_sources=100)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@ import regex
 
 import hetnetpy.hetnet
 
+# Note that this is a valid regex module pattern but will not work in the
+# re module due to "look-behind requires fixed-width pattern".
+metaedge_abbrev_pattern = regex.compile(
+    r"(?<=^|[a-z<>])[A-Z][A-Z0-9]*[a-z<>]+[A-Z][A-Z0-9]*"
+)
+
 
 def validate_abbreviations(metagraph):
     """Check that abbreviations are unambigious"""
@@ -120,11 +126,7 @@ def metaedges_from_metapath(abbreviation, standardize_by=None):
     if isinstance(standardize_by, hetnetpy.hetnet.MetaGraph):
         metapath = standardize_by.metapath_from_abbrev(abbreviation)
         return [metaedge.get_standard_abbrev() for metaedge in metapath]
-    # Note that this is a valid regex module pattern but will not work in the
-    # re module due to "look-behind requires fixed-width pattern".
-    regex_string = r"(?<=^|[a-z<>])[A-Z][A-Z0-9]*[a-z<>]+[A-Z][A-Z0-9]*"
-    pattern = regex.compile(regex_string)
-    metaedge_abbrevs = pattern.findall(abbreviation, overlapped=True)
+    metaedge_abbrevs = metaedge_abbrev_pattern.findall(abbreviation, overlapped=True)
     if standardize_by is None:
         return metaedge_abbrevs
     elif standardize_by == "text":
@@ -138,9 +140,12 @@ def metaedge_id_from_abbreviation(metagraph, abbreviation):
     """
     Return the metaedge_id corresponding to a metaedge abbreviation.
     """
+    metaedge = metagraph.abbrev_to_metaedge.get(abbreviation)
+    if metaedge is not None:
+        return metaedge.get_id()
     source_abbrev, target_abbrev = regex.split("[a-z<>]+", abbreviation)
     edge_abbrev = regex.search("[a-z<>]+", abbreviation).group()
-    abbrev_to_kind = {v: k for k, v in metagraph.kind_to_abbrev.items()}
+    abbrev_to_kind = metagraph.abbrev_to_kind
     source_kind = abbrev_to_kind[source_abbrev]
     target_kind = abbrev_to_kind[target_abbrev]
     metanode = metagraph.get_node(source_kind)
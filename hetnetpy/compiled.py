@@ -0,0 +1,78 @@
+import array
+
+
+class CompiledMetaEdge:
+    def __init__(self, metaedge, indptr, indices, edges):
+        """
+        Compressed sparse row (CSR) adjacency for a single metaedge. Row i
+        corresponds to the source node with index i of metaedge.source.
+        indptr and indices are integer arrays, such that the targets of row i
+        are indices[indptr[i]:indptr[i + 1]]. edges is a tuple of Edge
+        objects aligned with indices.
+        """
+        self.metaedge = metaedge
+        self.indptr = indptr
+        self.indices = indices
+        self.edges = edges
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def get_edges(self, index):
+        """Return a tuple of edges incident to the source node at index."""
+        return self.edges[self.indptr[index] : self.indptr[index + 1]]
+
+    def get_targets(self, index):
+        """Return an array of target node indexes for the source node at index."""
+        return self.indices[self.indptr[index] : self.indptr[index + 1]]
+
+    def get_degree(self, index):
+        """Return the (unmasked) degree of the source at index."""
+        return self.indptr[index + 1] - self.indptr[index]
+
+
+class CompiledGraph:
+    def __init__(self, graph):
+        """
+        Read-only, array-backed representation of a hetnetpy.hetnet.Graph.
+        Each metaedge (including inverted metaedges) is packed into a
+        CompiledMetaEdge, whose rows and columns are the dense per-metanode
+        node indexes assigned by Graph.add_node.
+        """
+        self.metagraph = graph.metagraph
+        self.metanode_to_nodes = {
+            metanode: tuple(nodes)
+            for metanode, nodes in graph.metanode_to_nodes.items()
+        }
+        self.metaedge_to_csr = dict()
+        for metaedge in self.metagraph.get_edges(exclude_inverts=False):
+            self.metaedge_to_csr[metaedge] = self._compile_metaedge(metaedge)
+
+    def _compile_metaedge(self, metaedge):
+        indptr = array.array("q", [0])
+        indices = array.array("q")
+        edges = list()
+        for node in self.metanode_to_nodes[metaedge.source]:
+            row = sorted((edge.target.index, edge) for edge in node.edges[metaedge])
+            for index, edge in row:
+                indices.append(index)
+                edges.append(edge)
+            indptr.append(len(indices))
+        return CompiledMetaEdge(metaedge, indptr, indices, tuple(edges))
+
+    def get_nodes(self, metanode):
+        """Return the nodes of metanode, ordered by index."""
+        return self.metanode_to_nodes[metanode]
+
+    def get_csr(self, metaedge):
+        """Return the CompiledMetaEdge for metaedge."""
+        return self.metaedge_to_csr[metaedge]
+
+    def get_edges(self, node, metaedge):
+        """Return a tuple of the edges of metaedge incident to node."""
+        return self.metaedge_to_csr[metaedge].get_edges(node.index)
+
+    def get_degree(self, node, metaedge):
+        """Return the (unmasked) degree of node for metaedge."""
+        return self.metaedge_to_csr[metaedge].get_degree(node.index)
@@ -1,8 +1,19 @@
 import abc
+import array
+import collections
+import collections.abc
+import contextlib
 import functools
+import gc
+import itertools
+import math
 import re
+import sys
+import weakref
 
 import hetnetpy.abbreviation
+import hetnetpy.compiled
+from hetnetpy.properties import PropertyStore, PropertyView
 
 direction_to_inverse = {"forward": "backward", "backward": "forward", "both": "both"}
 
@@ -11,9 +22,30 @@ direction_to_abbrev = {"forward": ">", "backward": "<", "both": "-"}
 direction_to_unicode_abbrev = {"forward": "→", "backward": "←", "both": "–"}
 
 
+def get_slot_items(obj):
+    """
+    Return a dict of the attributes that are set on obj, for classes that use
+    __slots__ instead of a per-instance __dict__. Attributes are ordered from
+    base class to subclass.
+    """
+    items = dict()
+    for cls in reversed(type(obj).__mro__):
+        for name in cls.__dict__.get("__slots__", ()):
+            try:
+                items[name] = getattr(obj, name)
+            except AttributeError:
+                continue
+    return items
+
+
 class ElemMask:
-    def __init__(self):
-        self.masked = False
+    """
+    Masking methods for elements with a masked attribute. Metagraph elements
+    store masked as an attribute, whereas graph nodes and edges read it from
+    the MaskTable of their metanode or metaedge.
+    """
+
+    __slots__ = ()
 
     def is_masked(self):
         return self.masked
@@ -26,10 +58,170 @@ class ElemMask:
 
 
 class IterMask:
+    __slots__ = ()
+
     def is_masked(self):
         return any(elem.is_masked() for elem in self.mask_elem_iter())
 
 
+class ElemData:
+    """
+    data property for graph nodes and edges. _data is either a dict or, for
+    graphs with columnar data, the PropertyStore holding the data at row
+    self.index, in which case data is a PropertyView.
+    """
+
+    __slots__ = ()
+
+    @property
+    def data(self):
+        data = self._data
+        if type(data) is PropertyStore:
+            return PropertyView(data, self.index)
+        return data
+
+    @data.setter
+    def data(self, data):
+        store = self._data
+        if type(store) is PropertyStore:
+            store.set_row(self.index, data)
+        else:
+            self._data = data
+
+
+class GraphState:
+    """
+    Mutation version, mask generation and masked element count shared by a
+    graph and its MaskTables. version increases by one with every change to
+    the nodes, edges or masks of the graph, and structure_version with
+    every change except to masks. Incrementing the generation unmasks every
+    MaskTable at once. change_log is None or a bounded deque of (version,
+    change, element) tuples. compiled is the graph's CompiledGraph or None,
+    which nodes read their adjacency from through their MaskTable.
+    """
+
+    __slots__ = (
+        "version",
+        "structure_version",
+        "generation",
+        "n_masked",
+        "change_log",
+        "compiled",
+    )
+
+    mask_changes = frozenset(["mask", "unmask", "unmask_all"])
+
+    def __init__(self):
+        self.version = 0
+        self.structure_version = 0
+        self.generation = 0
+        self.n_masked = 0
+        self.change_log = None
+        self.compiled = None
+
+    def record(self, change, element):
+        """Increment version and log change (a str) of element."""
+        self.version += 1
+        if change not in self.mask_changes:
+            self.structure_version += 1
+        if self.change_log is not None:
+            self.change_log.append((self.version, change, element))
+
+    def record_all(self, change, elements):
+        """Record change for each of elements."""
+        if self.change_log is None:
+            self.version += len(elements)
+            if change not in self.mask_changes:
+                self.structure_version += len(elements)
+            return
+        for element in elements:
+            self.record(change, element)
+
+    def unmask_all(self):
+        self.generation += 1
+        self.n_masked = 0
+        self.record("unmask_all", None)
+
+
+class MaskTable:
+    """
+    Bit array of mask flags for the nodes of a metanode or the edges of a
+    metaedge orientation, indexed by node or edge index. Bits are only valid
+    in the generation of state they were written in: a table from an earlier
+    generation reads as unmasked and is cleared on its next write. The bit
+    array only grows to the highest masked index.
+    """
+
+    __slots__ = ("state", "bits", "generation", "n_masked", "inverse")
+
+    def __init__(self, state):
+        self.state = state
+        self.bits = bytearray()
+        self.generation = state.generation
+        self.n_masked = 0
+        # MaskTable of the opposite orientation, for edge tables
+        self.inverse = None
+
+    def get(self, index):
+        """Return whether the element at index is masked."""
+        if self.generation != self.state.generation:
+            return False
+        byte = index >> 3
+        bits = self.bits
+        return byte < len(bits) and bool(bits[byte] >> (index & 7) & 1)
+
+    def set(self, index, masked, element=None):
+        """
+        Set whether the element at index is masked. Changes to the mask of
+        element are recorded in the graph state, unless element is None.
+        """
+        state = self.state
+        if self.generation != state.generation:
+            self.bits = bytearray()
+            self.n_masked = 0
+            self.generation = state.generation
+        byte = index >> 3
+        bit = 1 << (index & 7)
+        bits = self.bits
+        if byte >= len(bits):
+            if not masked:
+                return
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if bool(bits[byte] & bit) == bool(masked):
+            return
+        bits[byte] ^= bit
+        change = 1 if masked else -1
+        self.n_masked += change
+        state.n_masked += change
+        if element is not None:
+            state.record("mask" if masked else "unmask", element)
+
+    def move(self, from_index, to_index):
+        """
+        Replace the mask of to_index with the mask of from_index, leaving
+        from_index unmasked.
+        """
+        self.set(to_index, self.get(from_index))
+        self.set(from_index, False)
+
+    def any(self):
+        """Return whether any element of this table is masked."""
+        return self.generation == self.state.generation and self.n_masked > 0
+
+    def get_masked_indexes(self):
+        """Return a list of the indexes of masked elements."""
+        if not self.any():
+            return list()
+        indexes = list()
+        for byte, value in enumerate(self.bits):
+            if not value:
+                continue
+            for bit in range(8):
+                if value >> bit & 1:
+                    indexes.append(byte * 8 + bit)
+        return indexes
+
+
 class BaseGraph:
     def __init__(self):
         self.node_dict = dict()
@@ -69,8 +261,9 @@ class BaseGraph:
 
 
 class BaseNode(ElemMask):
+    __slots__ = ("identifier",)
+
     def __init__(self, identifier):
-        ElemMask.__init__(self)
         self.identifier = identifier
 
     @abc.abstractmethod
@@ -91,8 +284,9 @@ class BaseNode(ElemMask):
 
 
 class BaseEdge(ElemMask):
+    __slots__ = ("source", "target")
+
     def __init__(self, source, target):
-        ElemMask.__init__(self)
         self.source = source
         self.target = target
 
@@ -123,6 +317,8 @@ class BaseEdge(ElemMask):
 
 
 class BasePath(IterMask):
+    __slots__ = ("edges",)
+
     def __init__(self, edges):
         assert isinstance(edges, tuple)
         self.edges = edges
@@ -199,8 +395,37 @@ class BasePath(IterMask):
 
 
 class MetaGraph(BaseGraph):
-    def __init__(self):
+    def __init__(self, metapath_cache_size=100_000, metapath_registry_size=None):
+        """
+        Create a metagraph. Metapaths looked up by abbreviation are cached,
+        retaining the metapath_cache_size most recently used abbreviations.
+        Metapaths are registered in path_dict, a MetaPathRegistry that keeps
+        every metapath when metapath_registry_size is None, or otherwise the
+        metapath_registry_size most recently used metapaths and any others
+        that are still referenced. A bounded registry also bounds the
+        abbreviation cache to its size, since cached metapaths stay
+        referenced.
+        """
         BaseGraph.__init__(self)
+        self.path_dict = MetaPathRegistry(metapath_registry_size)
+        # Metaedges, including inverses, by abbreviation. See set_abbreviations.
+        self.abbrev_to_metaedge = dict()
+        self.abbrev_to_metapath = collections.OrderedDict()
+        self.metapath_cache_size = metapath_cache_size
+
+    def __getstate__(self):
+        # The weak references of path_dict cannot be pickled
+        state = self.__dict__.copy()
+        path_dict = state.pop("path_dict")
+        state["path_dict_items"] = path_dict.max_size, path_dict.items()
+        return state
+
+    def __setstate__(self, state):
+        max_size, items = state.pop("path_dict_items")
+        self.__dict__.update(state)
+        self.path_dict = MetaPathRegistry(max_size)
+        for edges, metapath in items:
+            self.path_dict[edges] = metapath
 
     def get_metanode(self, metanode):
         """
@@ -240,6 +465,8 @@ class MetaGraph(BaseGraph):
             raise ValueError(
                 f"Cannot interpret object of type {type(metaedge).__name__}"
             )
+        if metaedge in self.abbrev_to_metaedge:
+            return self.abbrev_to_metaedge[metaedge]
         if metaedge in self.neo4j_to_metaedge:
             return self.neo4j_to_metaedge[metaedge]
         metaedge_id = hetnetpy.abbreviation.metaedge_id_from_abbreviation(
@@ -254,12 +481,12 @@ class MetaGraph(BaseGraph):
          - tuple of edges
          - metapath abbreviation
         """
+        if isinstance(metapath, str):
+            return self.metapath_from_abbrev(metapath)
         if isinstance(metapath, MetaPath):
             return metapath
         if isinstance(metapath, tuple):
             return self.get_metapath_from_edges(metapath)
-        if isinstance(metapath, str):
-            return self.metapath_from_abbrev(metapath)
 
     @property
     def neo4j_to_metanode(self):
@@ -311,6 +538,10 @@ class MetaGraph(BaseGraph):
             if metaedge.direction == "backward":
                 abbrev = f"<{abbrev}"
             metaedge.kind_abbrev = abbrev
+        self.abbrev_to_metaedge = {
+            metaedge.abbrev: metaedge for metaedge in self.edge_dict.values()
+        }
+        self.abbrev_to_metapath.clear()
 
     def add_node(self, kind):
         metanode = MetaNode(kind)
@@ -352,32 +583,164 @@ class MetaGraph(BaseGraph):
         the metagraph from source to target. If target is None (default), then
         metapaths to any target node are returned.
         """
+        return list(self.iter_metapaths(source, target, max_length))
+
+    def iter_metapaths(
+        self,
+        source,
+        target=None,
+        max_length=4,
+        max_repeats=None,
+        exclude_consecutive=None,
+    ):
+        """
+        Generate metapaths from the source metanode in sorted order, by
+        depth-first walks of the metagraph that prune walks as they go. Only
+        yielded metapaths are created and registered in path_dict.
+
+        Parameters
+        ----------
+        source : hetnetpy.hetnet.MetaNode or an alternative metanode specification
+            metanode at which metapaths start
+        target : None, hetnetpy.hetnet.MetaNode or an alternative metanode specification
+            metanode at which metapaths end. None allows any metanode. Walks
+            that cannot reach target within max_length are not extended.
+        max_length : int
+            maximum number of metaedges in a metapath
+        max_repeats : None or int
+            maximum number of times a metanode can reoccur in a metapath after
+            its first occurrence. For example, 0 excludes metapaths that
+            revisit a metanode. None sets no limit.
+        exclude_consecutive : None or collection of pairs of metaedges
+            pairs (first, second) of metaedges (or alternative metaedge
+            specifications) that cannot occur consecutively. For example,
+            [("GaD", "DaG")] excludes metapaths containing GaDaG.
+        """
+        walk = self._walk_metapaths(
+            source, target, max_length, max_repeats, exclude_consecutive
+        )
+        for edges in walk:
+            yield self.get_metapath_from_edges(edges)
+
+    def count_metapaths(
+        self,
+        source,
+        target=None,
+        max_length=4,
+        max_repeats=None,
+        exclude_consecutive=None,
+    ):
+        """
+        Return the number of metapaths generated by iter_metapaths with the
+        same arguments, without creating any metapaths. Without max_repeats,
+        counts are computed per metanode, last metaedge and remaining length
+        rather than per walk.
+        """
+        if max_repeats is not None:
+            walk = self._walk_metapaths(
+                source, target, max_length, max_repeats, exclude_consecutive
+            )
+            return sum(1 for _ in walk)
+        source, target, excluded, distances = self._prepare_walk(
+            source, target, max_length, exclude_consecutive
+        )
+        counts = dict()
+
+        def count(metanode, last_metaedge, remaining):
+            key = metanode, last_metaedge if excluded else None, remaining
+            n_metapaths = counts.get(key)
+            if n_metapaths is not None:
+                return n_metapaths
+            n_metapaths = 0
+            for metaedge in metanode.edges:
+                if (last_metaedge, metaedge) in excluded:
+                    continue
+                next_metanode = metaedge.target
+                if distances is not None:
+                    distance = distances.get(next_metanode)
+                    if distance is None or distance >= remaining:
+                        continue
+                if target is None or next_metanode is target:
+                    n_metapaths += 1
+                if remaining > 1:
+                    n_metapaths += count(next_metanode, metaedge, remaining - 1)
+            counts[key] = n_metapaths
+            return n_metapaths
+
+        if max_length == 0:
+            return 0
+        return count(source, None, max_length)
+
+    def _prepare_walk(self, source, target, max_length, exclude_consecutive):
+        """
+        Resolve the arguments of iter_metapaths. Returns source, target, a
+        set of excluded consecutive metaedge pairs and, if target is
+        specified, a dict of the number of metaedges on the shortest walk from
+        each metanode to target.
+        """
         source = self.get_metanode(source)
-        if target:
+        if target is not None:
             target = self.get_metanode(target)
-
         assert max_length >= 0
-        if max_length == 0:
-            return []
-
-        metapaths = [self.get_metapath_from_edges((edge,)) for edge in source.edges]
-        previous_metapaths = list(metapaths)
-        for depth in range(1, max_length):
-            current_metapaths = list()
-            for metapath in previous_metapaths:
-                for add_edge in metapath.target().edges:
-                    new_metapath = self.get_metapath_from_edges(
-                        metapath.edges + (add_edge,)
-                    )
-                    current_metapaths.append(new_metapath)
-            metapaths.extend(current_metapaths)
-            previous_metapaths = current_metapaths
+        excluded = set()
+        for first, second in exclude_consecutive or ():
+            excluded.add((self.get_metaedge(first), self.get_metaedge(second)))
+        if target is None:
+            return source, target, excluded, None
+        # Every metaedge has an inverse, so distances to target equal
+        # distances from target
+        distances = {target: 0}
+        metanodes = [target]
+        while metanodes:
+            next_metanodes = list()
+            for metanode in metanodes:
+                for metaedge in metanode.edges:
+                    if metaedge.target not in distances:
+                        distances[metaedge.target] = distances[metanode] + 1
+                        next_metanodes.append(metaedge.target)
+            metanodes = next_metanodes
+        return source, target, excluded, distances
+
+    def _walk_metapaths(
+        self, source, target, max_length, max_repeats, exclude_consecutive
+    ):
+        """
+        Generate the metaedge tuples of the metapaths of iter_metapaths.
+        """
+        source, target, excluded, distances = self._prepare_walk(
+            source, target, max_length, exclude_consecutive
+        )
+        metanode_to_edges = {
+            metanode: sorted(metanode.edges) for metanode in self.get_nodes()
+        }
+        occurrences = collections.Counter([source])
 
-        if target:
-            metapaths = [
-                metapath for metapath in metapaths if metapath.target() == target
-            ]
-        return sorted(metapaths)
+        def extend(edges, metanode, length):
+            last_metaedge = edges[-1] if edges else None
+            next_length = len(edges) + 1
+            for metaedge in metanode_to_edges[metanode]:
+                if (last_metaedge, metaedge) in excluded:
+                    continue
+                next_metanode = metaedge.target
+                if distances is not None:
+                    distance = distances.get(next_metanode)
+                    if distance is None or next_length + distance > length:
+                        continue
+                if max_repeats is not None and occurrences[next_metanode] > max_repeats:
+                    continue
+                next_edges = edges + (metaedge,)
+                if next_length == length:
+                    if target is None or next_metanode is target:
+                        yield next_edges
+                    continue
+                occurrences[next_metanode] += 1
+                yield from extend(next_edges, next_metanode, length)
+                occurrences[next_metanode] -= 1
+
+        # Walk once per length (iterative deepening), so that metapaths are
+        # generated sorted by length and then by metaedges
+        for length in range(1, max_length + 1):
+            yield from extend((), source, length)
 
     def extract_all_metapaths(self, max_length, exclude_inverts=False):
         """
@@ -392,15 +755,39 @@ class MetaGraph(BaseGraph):
         symmetric metrics, such as path count or DWPC. In this case, you may
         want to optimize by computing values for only one metapath orientation.
         """
-        metapaths = set()
-        metanodes = self.get_nodes()
-        for source in metanodes:
-            from_source = self.extract_metapaths(source, max_length=max_length)
-            for metapath in from_source:
-                if exclude_inverts:
-                    metapath, _ = sorted([metapath, metapath.inverse])
-                metapaths.add(metapath)
-        return sorted(metapaths)
+        assert max_length >= 0
+        # Walks are extended one metaedge at a time, with metaedges as ranks
+        # in sorted order. Extending each level in order with sorted
+        # metaedges keeps levels sorted, so metapaths are created in sorted
+        # order without sorting them.
+        metaedges = sorted(self.get_edges(exclude_inverts=False))
+        metaedge_to_rank = {metaedge: rank for rank, metaedge in enumerate(metaedges)}
+        inverse_ranks = [metaedge_to_rank[metaedge.inverse] for metaedge in metaedges]
+        rank_to_next_ranks = [
+            sorted(
+                metaedge_to_rank[next_metaedge]
+                for next_metaedge in metaedge.target.edges
+            )
+            for metaedge in metaedges
+        ]
+        metapaths = list()
+        level = [(rank,) for rank in range(len(metaedges))]
+        for length in range(1, max_length + 1):
+            if length > 1:
+                level = [
+                    ranks + (rank,)
+                    for ranks in level
+                    for rank in rank_to_next_ranks[ranks[-1]]
+                ]
+            for ranks in level:
+                # Keep the orientation that sorts first among two inverses
+                if exclude_inverts and ranks > tuple(
+                    inverse_ranks[rank] for rank in reversed(ranks)
+                ):
+                    continue
+                edges = tuple(metaedges[rank] for rank in ranks)
+                metapaths.append(self.get_metapath_from_edges(edges))
+        return metapaths
 
     def get_metapath_from_edges(self, edges):
         """Store exactly one of each metapath."""
@@ -430,23 +817,54 @@ class MetaGraph(BaseGraph):
             return metapath
 
     def metapath_from_abbrev(self, abbrev):
-        """Retrieve a metapath from its abbreviation"""
+        """
+        Retrieve a metapath from its abbreviation. The most recently used
+        abbreviations are cached, so repeated lookups do not parse abbrev.
+        The cache retains at most metapath_cache_size abbreviations, and at
+        most path_dict.max_size if the registry is bounded.
+        """
+        cache = self.abbrev_to_metapath
+        metapath = cache.get(abbrev)
+        if metapath is not None:
+            cache.move_to_end(abbrev)
+            return metapath
         metaedges = list()
         metaedge_abbrevs = hetnetpy.abbreviation.metaedges_from_metapath(abbrev)
         for metaedge_abbrev in metaedge_abbrevs:
-            metaedge_id = hetnetpy.abbreviation.metaedge_id_from_abbreviation(
-                self, metaedge_abbrev
-            )
-            metaedges.append(self.get_edge(metaedge_id))
-        return self.get_metapath_from_edges(tuple(metaedges))
+            metaedge = self.abbrev_to_metaedge.get(metaedge_abbrev)
+            if metaedge is None:
+                metaedge_id = hetnetpy.abbreviation.metaedge_id_from_abbreviation(
+                    self, metaedge_abbrev
+                )
+                metaedge = self.get_edge(metaedge_id)
+            metaedges.append(metaedge)
+        metapath = self.get_metapath_from_edges(tuple(metaedges))
+        cache_size = self.metapath_cache_size
+        if self.path_dict.max_size is not None:
+            cache_size = min(cache_size, self.path_dict.max_size)
+        if metapath is not None and cache_size:
+            cache[abbrev] = metapath
+            while len(cache) > cache_size:
+                cache.popitem(last=False)
+        return metapath
 
 
 class MetaNode(BaseNode):
+    __slots__ = ("edges", "hash_", "abbrev", "masked")
+
     def __init__(self, identifier):
         BaseNode.__init__(self, identifier)
+        self.masked = False
         self.edges = set()
         self.hash_ = hash(self)
 
+    def __reduce__(self):
+        # Construct from identifier, so that hash_ is set before restoring
+        # edges, whose metaedges hash their source and target
+        state = get_slot_items(self)
+        del state["identifier"], state["hash_"]
+        return self.__class__, (self.identifier,), (None, state)
+
     def get_id(self):
         return self.identifier
 
@@ -466,13 +884,33 @@ class MetaNode(BaseNode):
 
 
 class MetaEdge(BaseEdge):
+    __slots__ = (
+        "kind",
+        "direction",
+        "hash_",
+        "inverse",
+        "inverted",
+        "kind_abbrev",
+        "masked",
+    )
+
     def __init__(self, source, target, kind, direction):
         """source and target are MetaNodes."""
         BaseEdge.__init__(self, source, target)
+        self.masked = False
         self.kind = kind
         self.direction = direction
         self.hash_ = hash(self)
 
+    def __reduce__(self):
+        # Construct from source and target, so that hash_ is set before the
+        # metaedge is added to sets and dicts while unpickling
+        state = get_slot_items(self)
+        for key in "source", "target", "kind", "direction", "hash_":
+            del state[key]
+        args = self.source, self.target, self.kind, self.direction
+        return self.__class__, args, (None, state)
+
     def get_id(self):
         """
         Get the metaedge_id as a tuple like:
@@ -528,6 +966,8 @@ class MetaEdge(BaseEdge):
 
 
 class MetaPath(BasePath):
+    __slots__ = ("inverse", "sub", "__weakref__")
+
     def __init__(self, edges):
         """metaedges is a tuple of edges"""
         assert all(isinstance(edge, MetaEdge) for edge in edges)
@@ -543,8 +983,110 @@ class MetaPath(BasePath):
         return s
 
 
+class MetaPathRegistry(collections.abc.MutableMapping):
+    """
+    Mapping of tuples of metaedges to their MetaPath, which MetaGraph uses as
+    path_dict to return the same MetaPath for the same metaedges. With
+    max_size None, every registered metapath is kept. Otherwise, the
+    max_size most recently used metapaths are kept and other metapaths are
+    held by weak references, so that they are discarded once they are no
+    longer referenced elsewhere, but are returned unchanged while they are.
+    hits and misses count lookups by key.
+    """
+
+    def __init__(self, max_size=None):
+        assert max_size is None or max_size >= 0
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        if max_size is None:
+            self.recent = dict()
+            self.weak = None
+        else:
+            self.recent = collections.OrderedDict()
+            self.weak = weakref.WeakValueDictionary()
+
+    def __getitem__(self, edges):
+        metapath = self.recent.get(edges)
+        if metapath is None and self.weak is not None:
+            metapath = self.weak.get(edges)
+        if metapath is None:
+            self.misses += 1
+            raise KeyError(edges)
+        self.hits += 1
+        if self.weak is not None:
+            self._retain(edges, metapath)
+        return metapath
+
+    def __setitem__(self, edges, metapath):
+        if self.weak is None:
+            self.recent[edges] = metapath
+            return
+        self.weak[edges] = metapath
+        self._retain(edges, metapath)
+
+    def _retain(self, edges, metapath):
+        """Keep metapath as the most recently used, evicting the least."""
+        recent = self.recent
+        recent[edges] = metapath
+        recent.move_to_end(edges)
+        while len(recent) > self.max_size:
+            recent.popitem(last=False)
+
+    def __delitem__(self, edges):
+        found = self.recent.pop(edges, None) is not None
+        if self.weak is not None:
+            found = self.weak.pop(edges, None) is not None or found
+        if not found:
+            raise KeyError(edges)
+
+    def __contains__(self, edges):
+        if edges in self.recent:
+            return True
+        return self.weak is not None and edges in self.weak
+
+    def __iter__(self):
+        if self.weak is None:
+            return iter(self.recent)
+        return iter(list(self.weak.keys()))
+
+    def __len__(self):
+        if self.weak is None:
+            return len(self.recent)
+        return len(self.weak)
+
+    def items(self):
+        """Return a list of (edges, metapath) pairs, without counting lookups."""
+        if self.weak is None:
+            return list(self.recent.items())
+        return list(self.weak.items())
+
+    def get_stats(self):
+        """
+        Return a dict with the number of registered metapaths (size), the
+        number kept regardless of references (n_retained), and the number
+        of hits and misses of lookups and their hit_rate.
+        """
+        n_lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "n_retained": len(self.recent),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / n_lookups if n_lookups else 0.0,
+        }
+
+    def __sizeof__(self):
+        size = object.__sizeof__(self) + sys.getsizeof(self.recent)
+        if self.weak is not None:
+            size += sys.getsizeof(self.weak.data)
+        return size
+
+
 class Graph(BaseGraph):
-    def __init__(self, metagraph, data=dict()):
+    def __init__(
+        self, metagraph, data=dict(), virtual_inverses=False, columnar_data=False
+    ):
         """
         Create a graph.
 
@@ -552,10 +1094,245 @@ class Graph(BaseGraph):
         ----------
         metagraph : hetnetpy.hetnet.MetaGraph
             metagraph with the potential types of nodes and relationships
+        data : dict
+            graph properties / attributes
+        virtual_inverses : bool
+            whether to store only forward (non-inverted) edges. Inverse edges
+            are then created on demand when accessed through edge.inverse,
+            node.edges, get_edge or get_edges(exclude_inverts=False), roughly
+            halving edge memory. Virtual inverse edges share the data of
+            their forward edge.
+        columnar_data : bool
+            whether to store node and edge data in a PropertyStore per
+            metanode and metaedge, rather than a dict per element. Numeric
+            values are stored in typed arrays and strings are dictionary
+            encoded. node.data and edge.data are then dict-like PropertyViews.
         """
         BaseGraph.__init__(self)
         self.metagraph = metagraph
         self.data = data
+        self.virtual_inverses = virtual_inverses
+        self.columnar_data = columnar_data
+        # Per-metanode lookup tables for dense node indexes: a list of nodes
+        # ordered by index and a dict of node identifier to index.
+        self.metanode_to_nodes = dict()
+        self.metanode_to_identifier_index = dict()
+        for metanode in metagraph.get_nodes():
+            self.metanode_to_nodes[metanode] = list()
+            self.metanode_to_identifier_index[metanode] = dict()
+        # Non-inverted edges of each non-inverted metaedge, in the order they
+        # were added. Inverted edges are reached through edge.inverse.
+        self.metaedge_to_edges = {
+            metaedge: list() for metaedge in metagraph.get_edges(exclude_inverts=True)
+        }
+        # Non-inverted edges of each non-inverted metaedge keyed by the int
+        # packing of their source and target indexes. See _get_edge_key.
+        self.edge_key_index = {metaedge: dict() for metaedge in self.metaedge_to_edges}
+        # Mutation version and change log. See Graph.version.
+        self.state = GraphState()
+        # Mask bits of nodes by metanode and of edges by (metaedge, inverted).
+        # An edge and its inverse share an index but not a MaskTable.
+        self.metanode_to_mask_table = {
+            metanode: MaskTable(self.state) for metanode in metagraph.get_nodes()
+        }
+        self.edge_mask_tables = dict()
+        for metaedge in self.metaedge_to_edges:
+            table = MaskTable(self.state)
+            inverse_table = MaskTable(self.state)
+            table.inverse = inverse_table
+            inverse_table.inverse = table
+            self.edge_mask_tables[metaedge, False] = table
+            self.edge_mask_tables[metaedge.inverse, True] = inverse_table
+        # Columnar data, with rows ordered like metanode_to_nodes and
+        # metaedge_to_edges
+        self.metanode_to_properties = dict()
+        self.metaedge_to_properties = dict()
+        if columnar_data:
+            for metanode in self.metanode_to_nodes:
+                self.metanode_to_properties[metanode] = PropertyStore()
+            for metaedge in self.metaedge_to_edges:
+                self.metaedge_to_properties[metaedge] = PropertyStore()
+        # Sums of degree products used by estimate_metapath_cost, as a tuple
+        # of the version they were computed at and a dict
+        self.degree_product_cache = None
+
+    def __getstate__(self):
+        """
+        Return a compact state for pickling. Nodes are stored as lists of
+        identifiers and names per metanode and edges as arrays of source and
+        target node indexes per metaedge, so pickling does not recurse through
+        the references between nodes and edges. Masks and the metapath cache
+        and registry sizes of the metagraph are preserved. The compiled graph
+        and change log are not.
+        """
+        metagraph = self.metagraph
+        state = {
+            "metanodes": list(metagraph.node_dict),
+            "metaedges": [
+                metaedge.get_id()
+                for metaedge in metagraph.get_edges(exclude_inverts=True)
+            ],
+            "kind_to_abbrev": metagraph.kind_to_abbrev,
+            "metagraph_kwargs": {
+                "metapath_cache_size": metagraph.metapath_cache_size,
+                "metapath_registry_size": metagraph.path_dict.max_size,
+            },
+            "data": self.data,
+            "virtual_inverses": self.virtual_inverses,
+            "columnar_data": self.columnar_data,
+            "nodes": dict(),
+            "edges": dict(),
+            "masked": list(),
+        }
+        for metanode, nodes in self.metanode_to_nodes.items():
+            if self.columnar_data:
+                data = self.metanode_to_properties[metanode]
+            else:
+                data = [node._data for node in nodes]
+            state["nodes"][metanode.identifier] = (
+                [node.identifier for node in nodes],
+                [node.name for node in nodes],
+                data,
+            )
+            masked = self.metanode_to_mask_table[metanode].get_masked_indexes()
+            if masked:
+                state["masked"].append((metanode.identifier, None, masked))
+        for metaedge, edges in self.metaedge_to_edges.items():
+            if self.columnar_data:
+                data = self.metaedge_to_properties[metaedge]
+            else:
+                data = [edge._data for edge in edges]
+            state["edges"][metaedge.get_id()] = (
+                array.array("q", [edge.source.index for edge in edges]),
+                array.array("q", [edge.target.index for edge in edges]),
+                data,
+            )
+        for (metaedge, inverted), table in self.edge_mask_tables.items():
+            masked = table.get_masked_indexes()
+            if masked:
+                state["masked"].append((metaedge.get_id(), inverted, masked))
+        return state
+
+    def __setstate__(self, state):
+        """Rebuild a graph from the state created by __getstate__."""
+        metagraph = MetaGraph(**state["metagraph_kwargs"])
+        for kind in state["metanodes"]:
+            metagraph.add_node(kind)
+        for metaedge_id in state["metaedges"]:
+            metagraph.add_edge(metaedge_id)
+        metagraph.set_abbreviations(state["kind_to_abbrev"])
+        columnar_data = state["columnar_data"]
+        self.__init__(
+            metagraph,
+            data=state["data"],
+            virtual_inverses=state["virtual_inverses"],
+            columnar_data=columnar_data,
+        )
+        # Columnar data are restored by replacing the columns of each store
+        # after adding elements with empty data
+        with _paused_gc():
+            for kind, (identifiers, names, data) in state["nodes"].items():
+                metanode = metagraph.node_dict[kind]
+                if columnar_data:
+                    data = itertools.repeat(dict())
+                for identifier, name, node_data in zip(identifiers, names, data):
+                    self._add_node(metanode, identifier, name, node_data)
+                self.n_nodes += len(identifiers)
+                if columnar_data:
+                    store = self.metanode_to_properties[metanode]
+                    store.columns = state["nodes"][kind][2].columns
+            for metaedge_id, (sources, targets, data) in state["edges"].items():
+                metaedge = metagraph.edge_dict[metaedge_id]
+                sources = sources.tolist()
+                targets = targets.tolist()
+                if columnar_data:
+                    data = [dict()] * len(sources)
+                keys = _get_edge_keys(metaedge, sources, targets)
+                self._add_edges_by_index(metaedge, sources, targets, data, keys)
+                if columnar_data:
+                    store = self.metaedge_to_properties[metaedge]
+                    store.columns = state["edges"][metaedge_id][2].columns
+        for identifier, inverted, masked in state["masked"]:
+            if inverted is None:
+                table = self.metanode_to_mask_table[metagraph.node_dict[identifier]]
+            else:
+                table = self.edge_mask_tables[metagraph.edge_dict[identifier], inverted]
+            for index in masked:
+                table.set(index, True)
+
+    @property
+    def version(self):
+        """
+        Monotonically increasing number of changes to the graph. Adding or
+        removing a node or edge and changing a mask each increase the version
+        by one. Changes to node or edge data are not tracked.
+        """
+        return self.state.version
+
+    def enable_change_log(self, maxlen=100_000):
+        """
+        Start logging changes to the graph, retaining the most recent maxlen
+        changes. Each change is a tuple of (version, change, element), where
+        change is one of add_node, remove_node, move_node, add_edge,
+        remove_edge, move_edge, mask, unmask or unmask_all. Edge changes refer
+        to the non-inverted edge. A removal that moves the last node of a
+        metanode or the last edge of a metaedge into the removed index is
+        followed by a move_node or move_edge change, whose element now has the
+        removed index. Set maxlen to None to disable the log.
+        """
+        if maxlen is None:
+            self.state.change_log = None
+        else:
+            self.state.change_log = collections.deque(maxlen=maxlen)
+
+    def get_changes(self, version):
+        """
+        Return a list of the changes made to the graph after version, or None
+        if they are not all available, because the change log is disabled or
+        has discarded some of them. Callers holding results computed at
+        version can update them incrementally from the changes, or must
+        recompute them when None is returned.
+        """
+        state = self.state
+        assert version <= state.version, "version is ahead of the graph"
+        if version == state.version:
+            return list()
+        change_log = state.change_log
+        if not change_log or change_log[0][0] > version + 1:
+            return None
+        return list(itertools.dropwhile(lambda x: x[0] <= version, change_log))
+
+    @property
+    def compiled(self):
+        """
+        The CompiledGraph created by compile, or None. It is stored on the
+        GraphState shared with the nodes of the graph.
+        """
+        return self.state.compiled
+
+    @compiled.setter
+    def compiled(self, compiled):
+        self.state.compiled = compiled
+
+    def compile(self):
+        """
+        Pack the adjacency of every metaedge into integer CSR arrays, which
+        hetnetpy.pathtools, hetnetpy.matrix, Node.get_edges and
+        Node.get_degree read from when available. The compiled representation
+        is stored as graph.compiled and is discarded when nodes or edges are
+        added to or removed from the graph.
+
+        The CSR arrays do not replace the incident edge sets of nodes. Each
+        metaedge orientation adds 8 bytes per node for indptr and 16 bytes
+        per edge: 8 for indices and 8 for the reference in the tuple of
+        edges aligned with indices. The Edge objects themselves are shared.
+
+        Returns
+        -------
+        compiled : hetnetpy.compiled.CompiledGraph
+        """
+        self.compiled = hetnetpy.compiled.CompiledGraph(self)
+        return self.compiled
 
     def add_node(self, kind, identifier, name=None, data={}):
         """
@@ -577,13 +1354,51 @@ class Graph(BaseGraph):
         if name is None:
             name = identifier
         metanode = self.metagraph.node_dict[kind]
-        node = Node(metanode, identifier, name, data)
-        node_id = node.get_id()
-        assert node_id not in self, "node already exists"
-        self.node_dict[node_id] = node
+        assert (kind, identifier) not in self, "node already exists"
+        node = self._add_node(metanode, identifier, name, data)
         self.n_nodes += 1
         return node
 
+    def _add_node(self, metanode, identifier, name, data):
+        """
+        Create a node and assign its index without checking whether it
+        already exists. Does not update n_nodes.
+        """
+        self.compiled = None
+        if type(identifier) is str:
+            identifier = sys.intern(identifier)
+        if self.columnar_data:
+            store = self.metanode_to_properties[metanode]
+            store.append(data)
+            data = store
+        node = Node(metanode, identifier, name, data)
+        self.node_dict[node.get_id()] = node
+        nodes = self.metanode_to_nodes[metanode]
+        node.index = len(nodes)
+        node.mask_table = self.metanode_to_mask_table[metanode]
+        nodes.append(node)
+        self.metanode_to_identifier_index[metanode][identifier] = node.index
+        self.state.record("add_node", node)
+        return node
+
+    def get_node_by_index(self, metanode, index):
+        """
+        Return the node of the specified metanode with the specified index.
+        Nodes are indexed densely within their metanode from 0, in the order
+        they were added to the graph unless nodes have been removed. Removing
+        a node gives its index to the last node of the metanode.
+        """
+        metanode = self.metagraph.get_metanode(metanode)
+        return self.metanode_to_nodes[metanode][index]
+
+    def get_node_index(self, metanode, identifier):
+        """
+        Return the index of the node of the specified metanode with the
+        specified identifier.
+        """
+        metanode = self.metagraph.get_metanode(metanode)
+        return self.metanode_to_identifier_index[metanode][identifier]
+
     def add_edge(self, source_id, target_id, kind, direction, data=dict()):
         """
         Add an edge to the graph. Edge cannot already exist.
@@ -609,12 +1424,10 @@ class Graph(BaseGraph):
         source = source_id
         if not isinstance(source, Node):
             source = self.node_dict[source]
-        source_id = source.get_id()
 
         target = target_id
         if not isinstance(target, Node):
             target = self.node_dict[target]
-        target_id = target.get_id()
 
         metaedge_id = (
             source.metanode.get_id(),
@@ -624,62 +1437,829 @@ class Graph(BaseGraph):
         )
         metaedge = self.metagraph.edge_dict[metaedge_id]
 
-        # Check that edges do not already exist
-        edge_id = source_id, target_id, kind, metaedge.direction
-        inverse_id = target_id, source_id, kind, metaedge.inverse.direction
-        assert edge_id not in self.edge_dict, "edge already exists"
-        assert inverse_id not in self.edge_dict, "inverse edge already exists"
+        # Check that the edge (and therefore its inverse) does not already exist
+        assert not self.has_edge(source, target, metaedge), "edge already exists"
 
-        # Create edge
+        edge = self._add_edge(source, target, metaedge, data)
+        return edge, edge.inverse
+
+    def _add_edge(self, source, target, metaedge, data):
+        """
+        Create an edge and its inverse without checking whether they already
+        exist. Returns the created edge.
+        """
+        self.compiled = None
+        source.degree_cache = None
+        target.degree_cache = None
+        if self.columnar_data:
+            forward_metaedge = metaedge.inverse if metaedge.inverted else metaedge
+            store = self.metaedge_to_properties[forward_metaedge]
+            store.append(data)
+            data = store
+        if self.virtual_inverses:
+            return self._add_forward_edge(source, target, metaedge, data)
+        source_id = source.get_id()
+        target_id = target.get_id()
+        kind = metaedge.kind
         edge = Edge(source, target, metaedge, data)
-        self.edge_dict[edge.get_id()] = edge
+        self.edge_dict[source_id, target_id, kind, metaedge.direction] = edge
+        self._get_incident_edges(source, metaedge).add(edge)
         edge.inverted = metaedge.inverted
         self.n_edges += 1
 
         # Create inverse edge if not identical
-        if edge_id == inverse_id:
+        if source is target and metaedge.inverse is metaedge:
             # Self loop of a bidirectional edge
             edge.inverse = edge
         else:
             inverse = Edge(target, source, metaedge.inverse, data)
-            inverse_id = inverse.get_id()
+            inverse_id = target_id, source_id, kind, metaedge.inverse.direction
             self.edge_dict[inverse_id] = inverse
+            self._get_incident_edges(target, metaedge.inverse).add(inverse)
             inverse.inverted = not edge.inverted
             edge.inverse = inverse
             inverse.inverse = edge
             self.n_inverts += 1
 
-        return edge, edge.inverse
+        forward = edge.inverse if edge.inverted else edge
+        self._register_forward_edge(forward)
+        inverse = forward.inverse
+        if inverse is not forward:
+            inverse.index = forward.index
+            inverse.mask_table = forward.mask_table.inverse
+        return edge
+
+    def _register_forward_edge(self, edge):
+        """
+        Append a non-inverted edge to metaedge_to_edges, assigning its index
+        and MaskTable.
+        """
+        edges = self.metaedge_to_edges[edge.metaedge]
+        edge.index = len(edges)
+        edge.mask_table = self.edge_mask_tables[edge.metaedge, False]
+        edges.append(edge)
+        metaedge, key = _get_edge_key(
+            edge.metaedge, edge.source.index, edge.target.index
+        )
+        self.edge_key_index[metaedge][key] = edge
+        self.state.record("add_edge", edge)
+
+    def has_edge(self, source, target, metaedge):
+        """
+        Return whether an edge of metaedge from source to target exists. Uses
+        integer node indexes rather than building edge identifier tuples.
+        Returns False for node identifiers that are not in the graph.
+
+        Parameters
+        ----------
+        source : hetnetpy.hetnet.Node or tuple of (metanode, node) identifiers
+        target : hetnetpy.hetnet.Node or tuple of (metanode, node) identifiers
+        metaedge : hetnetpy.hetnet.MetaEdge or an alternative metaedge specification
+        """
+        if type(source) is not Node:
+            source = self.node_dict.get(source)
+            if source is None:
+                return False
+        if type(target) is not Node:
+            target = self.node_dict.get(target)
+            if target is None:
+                return False
+        if type(metaedge) is not MetaEdge:
+            metaedge = self.metagraph.get_metaedge(metaedge)
+        if source.metanode is not metaedge.source:
+            return False
+        if target.metanode is not metaedge.target:
+            return False
+        source_index = source.index
+        target_index = target.index
+        if metaedge.inverted:
+            metaedge = metaedge.inverse
+            source_index, target_index = target_index, source_index
+        elif source_index > target_index and metaedge.inverse is metaedge:
+            source_index, target_index = target_index, source_index
+        return source_index << 32 | target_index in self.edge_key_index[metaedge]
+
+    def _get_incident_edges(self, node, metaedge):
+        """
+        Return the set of edges of metaedge incident to node, creating it when
+        the first edge is added. In graphs with virtual inverses, incident
+        edges of inverted and self-inverse metaedges are an IncidentEdgeSet
+        derived from the forward edges.
+        """
+        edges = dict.get(node.edges, metaedge)
+        if edges is None:
+            if self.virtual_inverses and (
+                metaedge.inverted or metaedge.inverse is metaedge
+            ):
+                edges = IncidentEdgeSet(node)
+            else:
+                edges = set()
+            dict.__setitem__(node.edges, metaedge, edges)
+        return edges
+
+    def _add_forward_edge(self, source, target, metaedge, data):
+        """
+        Create an edge for a graph with virtual inverses. Only the forward
+        (non-inverted) orientation is stored. Returns the edge in the
+        orientation of metaedge.
+        """
+        inverted = metaedge.inverted
+        if inverted:
+            source, target, metaedge = target, source, metaedge.inverse
+        edge = Edge(source, target, metaedge, data)
+        edge_id = source.get_id(), target.get_id(), metaedge.kind, metaedge.direction
+        self.edge_dict[edge_id] = edge
+        edge.inverted = False
+        self._register_forward_edge(edge)
+        self.n_edges += 1
+        if metaedge.inverse is metaedge:
+            self._get_incident_edges(source, metaedge).forward_edges.add(edge)
+            if source is target:
+                # Self loop of a bidirectional edge
+                edge.inverse = edge
+                return edge
+            self._get_incident_edges(target, metaedge).forward_edges.add(edge)
+        else:
+            self._get_incident_edges(source, metaedge).add(edge)
+            inverse_edges = self._get_incident_edges(target, metaedge.inverse)
+            inverse_edges.forward_edges.add(edge)
+        self.n_inverts += 1
+        return edge.inverse if inverted else edge
+
+    def get_edge(self, edge_tuple):
+        """
+        Return the edge specified by edge_tuple, which is a tuple of
+        (source_id, target_id, kind, direction).
+        """
+        try:
+            return self.edge_dict[edge_tuple]
+        except KeyError:
+            if not self.virtual_inverses:
+                raise
+        source_id, target_id, kind, direction = edge_tuple
+        inverse_id = target_id, source_id, kind, direction_to_inverse[direction]
+        return self.edge_dict[inverse_id].inverse
+
+    def get_edges(self, exclude_inverts=True):
+        if not self.virtual_inverses:
+            yield from BaseGraph.get_edges(self, exclude_inverts)
+            return
+        for edge in self.edge_dict.values():
+            yield edge
+            if exclude_inverts:
+                continue
+            inverse = edge.inverse
+            if inverse is not edge:
+                yield inverse
+
+    def add_nodes(self, kind, identifiers, names=None, data=None):
+        """
+        Add many nodes of a single metanode to the graph. Nodes cannot already
+        exist.
+
+        Parameters
+        ----------
+        kind : str
+            metanode kind
+        identifiers : sequence or numpy.ndarray
+            node identifiers
+        names : None, sequence or numpy.ndarray
+            node names. None entries (or names=None) default to the identifier
+        data : None, sequence of dicts, or dict of columns
+            node properties / attributes. A dict is interpreted as columns,
+            mapping each property name to a sequence of values.
+
+        Returns
+        -------
+        nodes : list of nodes
+            the created nodes
+        """
+        metanode = self.metagraph.node_dict[kind]
+        identifiers = _as_list(identifiers)
+        n_nodes = len(identifiers)
+        names = [None] * n_nodes if names is None else _as_list(names)
+        assert len(names) == n_nodes, "names and identifiers differ in length"
+        identifier_set = set(identifiers)
+        assert len(identifier_set) == n_nodes, "duplicate nodes"
+        identifier_to_index = self.metanode_to_identifier_index[metanode]
+        assert identifier_set.isdisjoint(identifier_to_index), "node already exists"
+
+        created = list()
+        with _paused_gc():
+            for identifier, name, node_data in zip(
+                identifiers, names, _iter_data(data, n_nodes)
+            ):
+                if name is None:
+                    name = identifier
+                node = self._add_node(metanode, identifier, name, node_data)
+                created.append(node)
+        self.n_nodes += n_nodes
+        return created
+
+    def add_edges(self, metaedge, source_ids, target_ids, data=None):
+        """
+        Add many edges of a single metaedge to the graph. Edges cannot already
+        exist. Node indexes are resolved once, and edges and their incident
+        edge sets are then built in a single pass rather than by add_edge.
+
+        Parameters
+        ----------
+        metaedge : hetnetpy.hetnet.MetaEdge or an alternative metaedge specification
+            the metaedge of all added edges
+        source_ids : sequence or numpy.ndarray
+            identifiers of the source nodes, which must be of kind metaedge.source
+        target_ids : sequence or numpy.ndarray
+            identifiers of the target nodes, which must be of kind metaedge.target
+        data : None, sequence of dicts, or dict of columns
+            edge properties / attributes. A dict is interpreted as columns,
+            mapping each property name to a sequence of values.
+
+        Returns
+        -------
+        edges : list of edges
+            the created edges
+        """
+        metaedge = self.metagraph.get_metaedge(metaedge)
+        source_ids = _as_list(source_ids)
+        target_ids = _as_list(target_ids)
+        n_edges = len(source_ids)
+        assert len(target_ids) == n_edges, "source_ids and target_ids differ in length"
+        source_index = self.metanode_to_identifier_index[metaedge.source]
+        target_index = self.metanode_to_identifier_index[metaedge.target]
+        sources = [source_index[identifier] for identifier in source_ids]
+        targets = [target_index[identifier] for identifier in target_ids]
+
+        # Edges are created in the orientation of the non-inverted metaedge
+        inverted = metaedge.inverted
+        if inverted:
+            metaedge = metaedge.inverse
+            sources, targets = targets, sources
+
+        # Check for duplicates in a single pass over the packed index pairs
+        keys = _get_edge_keys(metaedge, sources, targets)
+        assert len(set(keys)) == n_edges, "duplicate edges"
+        existing_keys = self.edge_key_index[metaedge].keys()
+        assert existing_keys.isdisjoint(keys), "edge already exists"
+
+        created = self._add_edges_by_index(
+            metaedge, sources, targets, list(_iter_data(data, n_edges)), keys
+        )
+        if inverted:
+            created = [edge.inverse for edge in created]
+        return created
+
+    def _add_edges_by_index(self, metaedge, sources, targets, data, keys):
+        """
+        Create edges of the non-inverted metaedge between the nodes with
+        the indexes in sources and targets, without checking whether they
+        already exist. data is a list of data dicts and keys the edge keys
+        of _get_edge_key. Edges, their inverses and incident edge sets are
+        built in a single pass, and graph indexes are then extended at once.
+        Returns the created edges.
+        """
+        n_edges = len(keys)
+        source_nodes = self.metanode_to_nodes[metaedge.source]
+        target_nodes = self.metanode_to_nodes[metaedge.target]
+        inverse_metaedge = metaedge.inverse
+        self_inverse = inverse_metaedge is metaedge
+        kind = metaedge.kind
+        direction = metaedge.direction
+        inverse_direction = inverse_metaedge.direction
+        if self.columnar_data:
+            store = self.metaedge_to_properties[metaedge]
+            for edge_data in data:
+                store.append(edge_data)
+            data = [store] * n_edges
+        metaedge_edges = self.metaedge_to_edges[metaedge]
+        mask_table = self.edge_mask_tables[metaedge, False]
+        inverse_mask_table = mask_table.inverse
+        edge_dict = self.edge_dict
+        virtual_inverses = self.virtual_inverses
+
+        # Incident edges of each source and target node, added at the end
+        source_to_edges = collections.defaultdict(list)
+        target_to_edges = collections.defaultdict(list)
+        created = list()
+        n_inverts = 0
+        with _paused_gc():
+            for index, source, target, edge_data in zip(
+                range(len(metaedge_edges), len(metaedge_edges) + n_edges),
+                sources,
+                targets,
+                data,
+            ):
+                source_node = source_nodes[source]
+                target_node = target_nodes[target]
+                edge = Edge(source_node, target_node, metaedge, edge_data)
+                edge.inverted = False
+                edge.index = index
+                edge.mask_table = mask_table
+                source_id = source_node._id
+                target_id = target_node._id
+                edge_dict[source_id, target_id, kind, direction] = edge
+                created.append(edge)
+                source_to_edges[source].append(edge)
+                if self_inverse and source_node is target_node:
+                    # Self loop of a bidirectional edge
+                    edge.inverse = edge
+                    continue
+                n_inverts += 1
+                if virtual_inverses:
+                    target_to_edges[target].append(edge)
+                    continue
+                inverse = Edge(target_node, source_node, inverse_metaedge, edge_data)
+                inverse.inverted = True
+                inverse.index = index
+                inverse.mask_table = inverse_mask_table
+                edge.inverse = inverse
+                inverse.inverse = edge
+                edge_dict[target_id, source_id, kind, inverse_direction] = inverse
+                target_to_edges[target].append(inverse)
+
+            # In graphs with virtual inverses, inverted and self-inverse
+            # incident edges are IncidentEdgeSets of forward edges
+            for node_to_edges, nodes, node_metaedge in (
+                (source_to_edges, source_nodes, metaedge),
+                (target_to_edges, target_nodes, inverse_metaedge),
+            ):
+                for index, edges in node_to_edges.items():
+                    node = nodes[index]
+                    node.degree_cache = None
+                    incident_edges = self._get_incident_edges(node, node_metaedge)
+                    if type(incident_edges) is IncidentEdgeSet:
+                        incident_edges = incident_edges.forward_edges
+                    incident_edges.update(edges)
+
+        metaedge_edges.extend(created)
+        self.edge_key_index[metaedge].update(zip(keys, created))
+        self.n_edges += n_edges
+        self.n_inverts += n_inverts
+        self.compiled = None
+        self.state.record_all("add_edge", created)
+        return created
+
+    def remove_edge(self, edge):
+        """
+        Remove an edge and its inverse from the graph. Runs in constant time,
+        excluding set removals, by moving the last edge of the metaedge into
+        the index of the removed edge, which is recorded as a move_edge
+        change.
+
+        Parameters
+        ----------
+        edge : hetnetpy.hetnet.Edge or tuple of (source_id, target_id, kind, direction)
+            the edge (or its inverse) to remove
+
+        Raises
+        ------
+        KeyError
+            if edge is not an edge of this graph, including equal edges of
+            other graphs
+        """
+        if not isinstance(edge, Edge):
+            edge = self.get_edge(edge)
+        forward = edge.inverse if edge.inverted else edge
+        metaedge, key = _get_edge_key(
+            forward.metaedge, forward.source.index, forward.target.index
+        )
+        keys = self.edge_key_index.get(metaedge)
+        # Equal edges of other graphs or views must not be removed by index
+        if keys is None or keys.get(key) is not forward:
+            raise KeyError(f"edge does not exist: {edge.get_id()}")
+        del keys[key]
+        self.compiled = None
+        source = forward.source
+        target = forward.target
+        source.degree_cache = None
+        target.degree_cache = None
+        inverse = forward.inverse
+
+        del self.edge_dict[forward.get_id()]
+        if self.virtual_inverses:
+            if metaedge.inverse is metaedge:
+                source.edges[metaedge].forward_edges.discard(forward)
+                target.edges[metaedge].forward_edges.discard(forward)
+            else:
+                source.edges[metaedge].discard(forward)
+                target.edges[metaedge.inverse].forward_edges.discard(forward)
+        else:
+            source.edges[metaedge].discard(forward)
+            if inverse is not forward:
+                del self.edge_dict[inverse.get_id()]
+                target.edges[metaedge.inverse].discard(inverse)
+        self.n_edges -= 1
+        if inverse is not forward:
+            self.n_inverts -= 1
+
+        # Move the last edge of the metaedge into the index of the removed edge
+        index = forward.index
+        edges = self.metaedge_to_edges[metaedge]
+        table = forward.mask_table
+        store = self.metaedge_to_properties.get(metaedge)
+        _detach_element(forward, store)
+        if inverse is not forward:
+            _detach_element(inverse, store)
+        for mask_table in table, table.inverse:
+            mask_table.set(index, False)
+        last = edges.pop()
+        if last is not forward:
+            last_index = last.index
+            edges[index] = last
+            last.index = index
+            last_inverse = last._inverse
+            if last_inverse is not None:
+                last_inverse.index = index
+            for mask_table in table, table.inverse:
+                mask_table.move(last_index, index)
+            if store is not None:
+                store.move_row(last_index, index)
+        if store is not None:
+            store.pop_row()
+        self.state.record("remove_edge", forward)
+        if last is not forward:
+            self.state.record("move_edge", last)
+
+    def remove_node(self, node):
+        """
+        Remove a node and its incident edges from the graph. Runs in time
+        proportional to the degree of the node and of the last node of its
+        metanode, which is moved into the index of the removed node. The
+        index of that last node therefore changes, which is recorded as a
+        move_node change (see enable_change_log). Removing incident edges
+        likewise moves the last edge of each metaedge.
+
+        Parameters
+        ----------
+        node : hetnetpy.hetnet.Node or tuple of (metanode, node) identifiers
+            the node to remove
+
+        Raises
+        ------
+        KeyError
+            if node is not a node of this graph, including equal nodes of
+            other graphs
+        """
+        if not isinstance(node, Node):
+            node = self.node_dict[node]
+        if self.node_dict.get(node.get_id()) is not node:
+            raise KeyError(f"node does not exist: {node.get_id()}")
+        for edges in node.edges.values():
+            for edge in list(edges):
+                self.remove_edge(edge)
+        self.compiled = None
+        del self.node_dict[node.get_id()]
+        metanode = node.metanode
+        identifier_index = self.metanode_to_identifier_index[metanode]
+        del identifier_index[node.identifier]
+        self.n_nodes -= 1
+
+        # Move the last node of the metanode into the index of the removed node
+        index = node.index
+        nodes = self.metanode_to_nodes[metanode]
+        table = node.mask_table
+        store = self.metanode_to_properties.get(metanode)
+        _detach_element(node, store)
+        table.set(index, False)
+        last = nodes.pop()
+        if last is not node:
+            last_index = last.index
+            nodes[index] = last
+            self._set_node_index(last, index)
+            identifier_index[last.identifier] = index
+            table.move(last_index, index)
+            if store is not None:
+                store.move_row(last_index, index)
+        if store is not None:
+            store.pop_row()
+        self.state.record("remove_node", node)
+        if last is not node:
+            self.state.record("move_node", last)
+
+    def _set_node_index(self, node, index):
+        """
+        Change the index of node, updating the edge_key_index keys of its
+        incident edges.
+        """
+        forward_edges = dict()
+        for edges in node.edges.values():
+            for edge in edges:
+                forward = edge.inverse if edge.inverted else edge
+                forward_edges[forward.get_id()] = forward
+        forward_edges = list(forward_edges.values())
+        for edge in forward_edges:
+            metaedge, key = _get_edge_key(
+                edge.metaedge, edge.source.index, edge.target.index
+            )
+            del self.edge_key_index[metaedge][key]
+        node.index = index
+        for edge in forward_edges:
+            metaedge, key = _get_edge_key(
+                edge.metaedge, edge.source.index, edge.target.index
+            )
+            self.edge_key_index[metaedge][key] = edge
 
     def unmask(self):
-        """Unmask all nodes and edges contained within the graph"""
-        for dictionary in self.node_dict, self.edge_dict:
-            for value in dictionary.values():
-                value.masked = False
+        """
+        Unmask all nodes and edges contained within the graph. Runs in
+        constant time by advancing the mask generation.
+        """
+        self.state.unmask_all()
+
+    def any_masked(self):
+        """Return whether any node or edge of the graph is masked."""
+        return self.state.n_masked > 0
 
     def get_metanode_to_nodes(self):
-        metanode_to_nodes = dict()
-        for node in self.get_nodes():
-            metanode = node.metanode
-            metanode_to_nodes.setdefault(metanode, list()).append(node)
-        return metanode_to_nodes
+        """
+        Return a dict of metanode to a list of its nodes, ordered by index.
+        Metanodes without nodes are omitted. Lists are copies of the indexes
+        maintained by add_node.
+        """
+        return {
+            metanode: list(nodes)
+            for metanode, nodes in self.metanode_to_nodes.items()
+            if nodes
+        }
 
     def get_metaedge_to_edges(self, exclude_inverts=False):
-        metaedges = self.metagraph.get_edges(exclude_inverts)
-        metaedge_to_edges = {metaedge: list() for metaedge in metaedges}
-        for edge in self.get_edges(exclude_inverts):
-            metaedge_to_edges[edge.metaedge].append(edge)
+        """
+        Return a dict of metaedge to a list of its edges, in the order they
+        were added. Lists are copies of the indexes maintained by add_edge.
+        """
+        metaedge_to_edges = dict()
+        for metaedge in self.metagraph.get_edges(exclude_inverts):
+            edges = self.metaedge_to_edges.get(metaedge, [])
+            metaedge_to_edges[metaedge] = list(edges)
+        if exclude_inverts:
+            return metaedge_to_edges
+        for metaedge, edges in self.metaedge_to_edges.items():
+            inverses = metaedge_to_edges[metaedge.inverse]
+            for edge in edges:
+                inverse = edge.inverse
+                if inverse is not edge:
+                    inverses.append(inverse)
         return metaedge_to_edges
 
+    def memory_usage(self, deep=True):
+        """
+        Return the bytes used by the graph, broken down by structure and by
+        metanode or metaedge, in the spirit of pandas.DataFrame.memory_usage.
+        Objects shared between structures, such as node identifiers in
+        edge_dict keys, and data values shared between elements are counted
+        once. Runs in time linear in the number
+        of nodes and edges, without traversing data values unless deep.
+
+        Parameters
+        ----------
+        deep : bool
+            whether to include the contents of node and edge data, node
+            identifiers and names, and metapaths. Keys of data dicts are
+            assumed to be shared across elements and are not counted.
+
+        Returns
+        -------
+        usage : dict
+            bytes keyed by (structure, element), where element is a metanode
+            kind, a metaedge abbreviation or None for graph-wide structures.
+            Convert to a pandas.Series for a MultiIndexed summary.
+        """
+        getsizeof = sys.getsizeof
+        usage = dict()
+        seen = set()
+
+        def get_data_size(data):
+            if id(data) in seen:
+                return 0
+            seen.add(id(data))
+            if type(data) is PropertyStore:
+                return _get_store_size(data)
+            size = getsizeof(data)
+            if deep:
+                for value in data.values():
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        size += getsizeof(value)
+            return size
+
+        for metanode, nodes in self.metanode_to_nodes.items():
+            size = getsizeof(nodes)
+            node_data = 0
+            for node in nodes:
+                size += getsizeof(node) + getsizeof(node._id) + getsizeof(node.edges)
+                if deep:
+                    size += getsizeof(node.identifier)
+                    if node.name is not node.identifier:
+                        size += getsizeof(node.name)
+                node_data += get_data_size(node._data)
+            usage["nodes", metanode.identifier] = size
+            usage["node_data", metanode.identifier] = node_data
+            for metaedge in metanode.edges:
+                size = 0
+                for node in nodes:
+                    edges = dict.get(node.edges, metaedge)
+                    if edges is None:
+                        continue
+                    size += getsizeof(edges)
+                    if type(edges) is IncidentEdgeSet:
+                        size += getsizeof(edges.forward_edges)
+                usage["node_edges", metaedge.abbrev] = size
+
+        for metaedge, edges in self.metaedge_to_edges.items():
+            size = getsizeof(edges)
+            inverse_size = 0
+            edge_data = 0
+            for edge in edges:
+                size += getsizeof(edge)
+                inverse = edge._inverse
+                if inverse is not None and inverse is not edge:
+                    inverse_size += getsizeof(inverse)
+                edge_data += get_data_size(edge._data)
+            usage["edges", metaedge.abbrev] = size
+            if metaedge.inverse is not metaedge:
+                usage["edges", metaedge.inverse.abbrev] = inverse_size
+            else:
+                usage["edges", metaedge.abbrev] += inverse_size
+            usage["edge_data", metaedge.abbrev] = edge_data
+
+        usage["node_dict", None] = getsizeof(self.node_dict)
+        usage["edge_dict", None] = getsizeof(self.edge_dict) + sum(
+            map(getsizeof, self.edge_dict)
+        )
+        size = sum(map(getsizeof, self.metanode_to_identifier_index.values()))
+        for keys in self.edge_key_index.values():
+            size += getsizeof(keys) + sum(map(getsizeof, keys))
+        usage["indexes", None] = size
+        size = sum(getsizeof(table.bits) for table in self.edge_mask_tables.values())
+        size += sum(
+            getsizeof(table.bits) for table in self.metanode_to_mask_table.values()
+        )
+        usage["masks", None] = size
+        size = 0
+        if self.compiled is not None:
+            for csr in self.compiled.metaedge_to_csr.values():
+                size += getsizeof(csr.indptr) + getsizeof(csr.indices)
+                size += getsizeof(csr.edges)
+            for nodes in self.compiled.metanode_to_nodes.values():
+                size += getsizeof(nodes)
+        usage["compiled", None] = size
+        change_log = self.state.change_log
+        usage["change_log", None] = 0 if change_log is None else getsizeof(change_log)
+        path_dict = self.metagraph.path_dict
+        size = getsizeof(path_dict)
+        if deep:
+            for edges, metapath in path_dict.items():
+                size += getsizeof(edges) + getsizeof(metapath)
+        usage["path_dict", None] = size
+        return usage
+
     def count_nodes(self, metanode):
         """
         Count the number of nodes for the specified metanode.
         """
         metanode = self.metagraph.get_metanode(metanode)
-        nodes = self.get_metanode_to_nodes()[metanode]
-        return len(nodes)
+        return len(self.metanode_to_nodes[metanode])
+
+    def estimate_metapath_cost(self, metapath):
+        """
+        Estimate the number of paths of metapath and the work of computing
+        them from the degree distributions of its metaedges, without
+        traversing any paths. Walks are extended one metaedge at a time
+        assuming that the walks reaching a node are proportional to its
+        degree for the metaedge they arrived by. Estimates are therefore
+        exact for metapaths of up to two metaedges and ignore degree
+        correlations between non-adjacent metaedges. Walks may revisit
+        nodes, so estimates are upper bounds for paths without duplicate
+        nodes. Masked nodes and edges are excluded, except from the counts
+        of source and target nodes.
+
+        Parameters
+        ----------
+        metapath : hetnetpy.hetnet.MetaPath or an alternative metapath specification
+
+        Returns
+        -------
+        estimate : dict
+            n_sources and n_targets are the numbers of source and target
+            nodes. n_walks lists the expected number of walks from all
+            source nodes after each metaedge, the frontier of a breadth-first
+            traversal, and n_paths is its last value. density is the expected
+            proportion of source–target pairs joined by a walk. cost is the
+            expected number of walks enumerated by traversing from every
+            source node, for ordering jobs. split_index is the number of
+            metaedges to traverse from the source, with the remaining
+            metaedges traversed from the target, that minimizes the expected
+            walks per source–target pair. engine is "matrix" when cost
+            exceeds the number of entries of the source-by-node matrices of
+            a matrix computation, otherwise "traversal".
+        """
+        metapath = self.metagraph.get_metapath(metapath)
+        n_sources = self.count_nodes(metapath.source())
+        n_targets = self.count_nodes(metapath.target())
+        n_walks = self._estimate_walks(metapath.edges)
+        n_walks_inverse = self._estimate_walks(metapath.inverse_edges())
+        n_paths = n_walks[-1]
+        n_pairs = n_sources * n_targets
+        density = 1 - math.exp(-n_paths / n_pairs) if n_pairs else 0.0
+        cost = sum(n_walks)
+        # Expected walks per pair when meeting after split_index metaedges
+        split_costs = list()
+        for split_index in range(len(metapath) + 1):
+            head = sum(n_walks[:split_index]) / n_sources if n_sources else 0.0
+            tail_length = len(metapath) - split_index
+            tail = sum(n_walks_inverse[:tail_length]) / n_targets if n_targets else 0.0
+            split_costs.append((head + tail, split_index))
+        _, split_index = min(split_costs)
+        n_entries = sum(
+            n_sources * self.count_nodes(metaedge.target) for metaedge in metapath
+        )
+        return {
+            "n_sources": n_sources,
+            "n_targets": n_targets,
+            "n_walks": n_walks,
+            "n_paths": n_paths,
+            "density": density,
+            "cost": cost,
+            "split_index": split_index,
+            "engine": "matrix" if cost > n_entries else "traversal",
+        }
+
+    def _estimate_walks(self, metaedges):
+        """
+        Return a list of the expected number of walks from all source nodes
+        after each of metaedges. See estimate_metapath_cost.
+        """
+        n_walks = [float(self._sum_degree_products(metaedges[0]))]
+        for arrived_by, metaedge in zip(metaedges, metaedges[1:]):
+            # Walks reaching each node in proportion to its degree for
+            # arrived_by.inverse continue along metaedge
+            n_edges = self._sum_degree_products(arrived_by.inverse)
+            if n_edges == 0:
+                n_walks.append(0.0)
+                continue
+            products = self._sum_degree_products(arrived_by.inverse, metaedge)
+            n_walks.append(n_walks[-1] * products / n_edges)
+        return n_walks
+
+    def _sum_degree_products(self, metaedge, other=None):
+        """
+        Return the sum over the unmasked source nodes of metaedge of the
+        product of their degrees for metaedge and other, or of their degree
+        for metaedge when other is None. Sums are cached until the graph
+        changes.
+        """
+        state = self.state
+        cache = self.degree_product_cache
+        if cache is None or cache[0] != state.version:
+            cache = self.degree_product_cache = state.version, dict()
+        sums = cache[1]
+        key = metaedge, other
+        total = sums.get(key)
+        if total is None:
+            total = 0
+            check_masks = state.n_masked > 0
+            for node in self.metanode_to_nodes[metaedge.source]:
+                if check_masks and node.masked:
+                    continue
+                degree = node.get_degree(metaedge)
+                if degree and other is not None:
+                    degree *= node.get_degree(other)
+                total += degree
+            sums[key] = total
+        return total
+
+    def filter_nodes(self, metanode, key, value=None, predicate=None):
+        """
+        Return a list of the nodes of metanode whose data[key] equals value,
+        or satisfies predicate if predicate is not None. Nodes without key are
+        excluded. With columnar data, the selection scans a single column
+        rather than every node.
+        """
+        metanode = self.metagraph.get_metanode(metanode)
+        nodes = self.metanode_to_nodes[metanode]
+        if self.columnar_data:
+            rows = self.metanode_to_properties[metanode].select(key, value, predicate)
+            return [nodes[row] for row in rows]
+        return _filter_by_data(nodes, key, value, predicate)
 
-    def get_subgraph(self, metanodes=None, metaedges=None, nodes=None):
+    def filter_edges(self, metaedge, key, value=None, predicate=None):
+        """
+        Return a list of the edges of metaedge whose data[key] equals value,
+        or satisfies predicate if predicate is not None. Edges without key are
+        excluded. Edges are oriented according to metaedge.
+        """
+        metaedge = self.metagraph.get_metaedge(metaedge)
+        forward_metaedge = metaedge.inverse if metaedge.inverted else metaedge
+        edges = self.metaedge_to_edges[forward_metaedge]
+        if self.columnar_data:
+            store = self.metaedge_to_properties[forward_metaedge]
+            edges = [edges[row] for row in store.select(key, value, predicate)]
+        else:
+            edges = _filter_by_data(edges, key, value, predicate)
+        if metaedge.inverted:
+            edges = [edge.inverse for edge in edges]
+        return edges
+
+    def get_subgraph(self, metanodes=None, metaedges=None, nodes=None, view=False):
         """
         Return a subgraph of the hetnet. By default, creates a copy of the
         hetnet. If both metanode and metaedge subsets are specified, then
@@ -695,6 +2275,11 @@ class Graph(BaseGraph):
         nodes : None or list
             nodes to keep. None keeps all nodes, subject to the metanode and
             metanode subsets.
+        view : bool
+            whether to return a read-only hetnetpy.view.GraphView that shares
+            nodes, edges, data and masks with this graph, rather than a copy.
+            Creating a view does not copy any nodes or edges. Adding or
+            removing nodes or edges of this graph invalidates the view.
         """
         if metanodes is None:
             metanodes = self.metagraph.get_nodes()
@@ -720,70 +2305,464 @@ class Graph(BaseGraph):
             k: v for k, v in self.metagraph.kind_to_abbrev.items() if k in kinds
         }
         metagraph.set_abbreviations(kind_to_abbrev)
-        graph = Graph(metagraph, data=self.data)
-
-        # Overwrite based on metagraph
-        metanodes = set(metagraph.get_nodes())
-        metaedges = set(metagraph.get_edges(exclude_inverts=True))
-
-        # Create nodes and edges
-        if nodes is None:
-            nodes = [n for n in self.get_nodes() if n.metanode in metanodes]
-        nodes = list(nodes)
-        for node in nodes:
-            graph.add_node(
-                kind=node.metanode.get_id(),
-                identifier=node.identifier,
-                name=node.name,
-                data=node.data.copy(),
-            )
-        for node in nodes:
-            node = self.node_dict[node.get_id()]
-            for metaedge in metaedges:
-                if metaedge not in node.edges:
-                    continue
-                for edge in node.edges[metaedge]:
-                    if edge.inverted:
-                        continue
-                    target_id = edge.target.get_id()
-                    if target_id not in graph.node_dict:
-                        continue
-                    kind = metaedge.kind
-                    direction = metaedge.direction
-                    graph.add_edge(node, target_id, kind, direction)
+
+        # Retained nodes of each metanode of self. positions maps the index of
+        # each node of self to its index in the subgraph, or None if dropped.
+        metanode_to_nodes = dict()
+        for metanode in metagraph.get_nodes():
+            metanode = self.metagraph.node_dict[metanode.identifier]
+            if nodes is None:
+                metanode_to_nodes[metanode] = self.metanode_to_nodes[metanode]
+            else:
+                metanode_to_nodes[metanode] = list()
+        if nodes is not None:
+            for node in nodes:
+                node = self.node_dict[node.get_id()]
+                retained = metanode_to_nodes.get(node.metanode)
+                if retained is not None:
+                    retained.append(node)
+        metanode_to_positions = dict()
+        for metanode, retained in metanode_to_nodes.items():
+            positions = [None] * len(self.metanode_to_nodes[metanode])
+            for position, node in enumerate(retained):
+                assert positions[node.index] is None, "duplicate nodes"
+                positions[node.index] = position
+            metanode_to_positions[metanode] = positions
+
+        if view:
+            from hetnetpy.view import GraphView
+
+            return GraphView(self, metagraph, metanode_to_nodes, metanode_to_positions)
+
+        graph = Graph(
+            metagraph,
+            data=self.data,
+            virtual_inverses=self.virtual_inverses,
+            columnar_data=self.columnar_data,
+        )
+        with _paused_gc():
+            for metanode, retained in metanode_to_nodes.items():
+                subgraph_metanode = metagraph.node_dict[metanode.identifier]
+                for node in retained:
+                    graph._add_node(
+                        subgraph_metanode, node.identifier, node.name, node.data.copy()
+                    )
+                graph.n_nodes += len(retained)
+
+            # Map the source and target indexes of the edges of each metaedge to
+            # positions in the subgraph, and add the edges with both endpoints
+            # retained at once, without identifier lookups or existence checks
+            for metaedge in metagraph.get_edges(exclude_inverts=True):
+                parent_metaedge = self.metagraph.get_metaedge(metaedge.get_id())
+                parent_edges = self.metaedge_to_edges[parent_metaedge]
+                source_positions = metanode_to_positions[parent_metaedge.source]
+                target_positions = metanode_to_positions[parent_metaedge.target]
+                pairs = [
+                    (
+                        source_positions[edge.source.index],
+                        target_positions[edge.target.index],
+                    )
+                    for edge in parent_edges
+                ]
+                pairs = [pair for pair in pairs if None not in pair]
+                sources = [source for source, _ in pairs]
+                targets = [target for _, target in pairs]
+                keys = _get_edge_keys(metaedge, sources, targets)
+                edge_data = [dict() for _ in keys]
+                graph._add_edges_by_index(metaedge, sources, targets, edge_data, keys)
 
         return graph
 
+    def merge(self, other, on_conflict="error"):
+        """
+        Return a new graph with the nodes and edges of self and other. See
+        Graph.union.
+        """
+        return Graph.union([self, other], on_conflict=on_conflict)
+
+    @staticmethod
+    def union(graphs, on_conflict="error"):
+        """
+        Create a new graph with the nodes and edges of all graphs. The
+        metagraph of the union contains the metanodes and metaedges of every
+        metagraph, whose abbreviations must agree. Node and edge data are
+        copied. Graph data are combined, with later graphs taking precedence.
+        The union uses the storage options (virtual_inverses and
+        columnar_data) of the first graph.
+
+        Nodes are matched by their (metanode, identifier) and edges by their
+        nodes and metaedge, with a set intersection per metanode and per
+        metaedge. Only matched elements are then resolved one at a time.
+
+        Parameters
+        ----------
+        graphs : sequence of hetnetpy.hetnet.Graph
+            graphs to combine, in order of precedence for on_conflict
+        on_conflict : str
+            how to resolve a node or edge that exists in multiple graphs:
+            "error" raises an AssertionError, "first" keeps the earliest
+            name and data, "last" keeps the latest name and data, and
+            "update" updates the earliest data with the data of later graphs.
+        """
+        graphs = list(graphs)
+        assert graphs, "no graphs to combine"
+        assert on_conflict in {"error", "first", "last", "update"}
+        metagraph = _union_metagraphs([graph.metagraph for graph in graphs])
+        data = dict()
+        for graph in graphs:
+            data.update(graph.data)
+        union = Graph(
+            metagraph,
+            data=data,
+            virtual_inverses=graphs[0].virtual_inverses,
+            columnar_data=graphs[0].columnar_data,
+        )
+
+        # Combine nodes by metanode kind. metanode_to_positions maps the
+        # index of each node of a graph to its index in the union.
+        kind_to_nodes = dict()
+        graph_positions = list()
+        for graph in graphs:
+            metanode_to_positions = dict()
+            for metanode, nodes in graph.metanode_to_nodes.items():
+                (
+                    identifiers,
+                    names,
+                    node_data,
+                    identifier_to_position,
+                ) = kind_to_nodes.setdefault(metanode.identifier, ([], [], [], {}))
+                graph_identifiers = [node.identifier for node in nodes]
+                duplicates = identifier_to_position.keys() & graph_identifiers
+                assert not (
+                    duplicates and on_conflict == "error"
+                ), f"nodes in multiple graphs: {sorted(duplicates, key=str)[:5]}"
+                start = len(identifiers)
+                if not duplicates:
+                    positions = list(range(start, start + len(nodes)))
+                    identifiers.extend(graph_identifiers)
+                    names.extend(node.name for node in nodes)
+                    node_data.extend(node.data.copy() for node in nodes)
+                    identifier_to_position.update(zip(graph_identifiers, positions))
+                    metanode_to_positions[metanode] = positions
+                    continue
+                positions = list()
+                for node in nodes:
+                    position = identifier_to_position.get(node.identifier)
+                    if position is None:
+                        position = identifier_to_position[node.identifier] = len(
+                            identifiers
+                        )
+                        identifiers.append(node.identifier)
+                        names.append(node.name)
+                        node_data.append(node.data.copy())
+                    elif on_conflict == "last":
+                        names[position] = node.name
+                        node_data[position] = node.data.copy()
+                    elif on_conflict == "update":
+                        node_data[position].update(node.data)
+                    positions.append(position)
+                metanode_to_positions[metanode] = positions
+            graph_positions.append(metanode_to_positions)
+        for kind, (identifiers, names, node_data, _) in kind_to_nodes.items():
+            union.add_nodes(kind, identifiers, names, node_data)
+
+        # Combine edges by forward metaedge, keyed like edge_key_index
+        metaedge_to_edges = dict()
+        for graph, metanode_to_positions in zip(graphs, graph_positions):
+            for graph_metaedge, edges in graph.metaedge_to_edges.items():
+                metaedge = metagraph.get_metaedge(graph_metaedge.get_id())
+                forward_metaedge, _ = _get_edge_key(metaedge, 0, 0)
+                (
+                    sources,
+                    targets,
+                    edge_data,
+                    key_to_position,
+                ) = metaedge_to_edges.setdefault(forward_metaedge, ([], [], [], {}))
+                source_positions = metanode_to_positions[graph_metaedge.source]
+                target_positions = metanode_to_positions[graph_metaedge.target]
+                keys = [
+                    _get_edge_key(
+                        metaedge,
+                        source_positions[edge.source.index],
+                        target_positions[edge.target.index],
+                    )[1]
+                    for edge in edges
+                ]
+                duplicates = key_to_position.keys() & keys
+                assert not (
+                    duplicates and on_conflict == "error"
+                ), f"{len(duplicates)} {metaedge} edges in multiple graphs"
+                for key, edge in zip(keys, edges):
+                    if duplicates and key in duplicates:
+                        position = key_to_position[key]
+                        if on_conflict == "last":
+                            edge_data[position] = edge.data.copy()
+                        elif on_conflict == "update":
+                            edge_data[position].update(edge.data)
+                        continue
+                    key_to_position[key] = len(sources)
+                    sources.append(key >> 32)
+                    targets.append(key & 0xFFFFFFFF)
+                    edge_data.append(edge.data.copy())
+
+        # Edges are unique by construction, so skip the checks of add_edges
+        for metaedge, (sources, targets, edge_data, keys) in metaedge_to_edges.items():
+            union._add_edges_by_index(metaedge, sources, targets, edge_data, list(keys))
+        return union
+
+
+@contextlib.contextmanager
+def _paused_gc():
+    """
+    Pause cyclic garbage collection while creating many objects. Bulk object
+    creation otherwise triggers repeated collections that scan the entire
+    (growing) graph without freeing anything.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _detach_element(element, store):
+    """
+    Give a removed node or edge its own data dict and MaskTable, so that it no
+    longer reads from the rows and bits of the graph it was removed from.
+    """
+    if store is not None:
+        element._data = store.get_row(element.index)
+    element.mask_table = MaskTable(GraphState())
+
+
+def _get_edge_key(metaedge, source_index, target_index):
+    """
+    Return (forward_metaedge, key) for an edge of metaedge between the nodes
+    with the specified indexes. key packs the node indexes, oriented like the
+    non-inverted forward_metaedge, into a single int. For bidirectional
+    metaedges between a metanode and itself, the smaller index comes first.
+    Supports up to 2**32 nodes per metanode.
+    """
+    if metaedge.inverted:
+        metaedge = metaedge.inverse
+        source_index, target_index = target_index, source_index
+    elif metaedge.inverse is metaedge and source_index > target_index:
+        source_index, target_index = target_index, source_index
+    return metaedge, source_index << 32 | target_index
+
+
+def _get_edge_keys(metaedge, sources, targets):
+    """
+    Return the keys of _get_edge_key for edges of the non-inverted metaedge
+    between the nodes with the indexes in sources and targets. For
+    bidirectional metaedges between the same metanode, a-b and b-a are the
+    same edge.
+    """
+    if metaedge.inverse is metaedge:
+        return [
+            s << 32 | t if s <= t else t << 32 | s for s, t in zip(sources, targets)
+        ]
+    return [s << 32 | t for s, t in zip(sources, targets)]
+
+
+def _union_metagraphs(metagraphs):
+    """
+    Return a new MetaGraph with the metanodes and metaedges of metagraphs.
+    Metaedges that are inverses of each other are combined.
+    """
+    metagraph = MetaGraph()
+    kind_to_abbrev = dict()
+    for other in metagraphs:
+        for kind, abbrev in other.kind_to_abbrev.items():
+            assert (
+                kind_to_abbrev.setdefault(kind, abbrev) == abbrev
+            ), f"conflicting abbreviations for {kind}"
+        for kind in other.node_dict:
+            if kind not in metagraph.node_dict:
+                metagraph.add_node(kind)
+    for other in metagraphs:
+        for metaedge in other.get_edges(exclude_inverts=True):
+            if metaedge.get_id() not in metagraph.edge_dict:
+                metagraph.add_edge(metaedge.get_id())
+    metagraph.set_abbreviations(kind_to_abbrev)
+    assert hetnetpy.abbreviation.validate_abbreviations(metagraph)
+    return metagraph
+
+
+def _get_store_size(store):
+    """Return the bytes used by the columns of a PropertyStore."""
+    size = sys.getsizeof(store) + sys.getsizeof(store.columns)
+    for column in store.columns.values():
+        size += sys.getsizeof(column.values) + sys.getsizeof(column.present)
+        if column.categories is not None:
+            size += sys.getsizeof(column.categories)
+            size += sys.getsizeof(column.category_to_code)
+            size += sum(map(sys.getsizeof, column.categories))
+        elif column.kind == "object":
+            size += sum(map(sys.getsizeof, column.values))
+    return size
+
+
+def _filter_by_data(elements, key, value, predicate):
+    """Filter nodes or edges with dict data by the value of key."""
+    missing = object()
+    selected = list()
+    for element in elements:
+        element_value = element.data.get(key, missing)
+        if element_value is missing:
+            continue
+        if predicate is None:
+            if element_value == value:
+                selected.append(element)
+        elif predicate(element_value):
+            selected.append(element)
+    return selected
+
+
+def _as_list(values):
+    """Convert a sequence or numpy.ndarray to a list of Python objects."""
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+def _iter_data(data, n):
+    """
+    Yield n data dicts from data, which can be None, a sequence of dicts, or
+    a dict mapping property names to columns of values.
+    """
+    if data is None:
+        for _ in range(n):
+            yield dict()
+        return
+    if isinstance(data, dict):
+        keys = list(data)
+        columns = [_as_list(data[key]) for key in keys]
+        assert all(len(column) == n for column in columns), "columns differ in length"
+        for i in range(n):
+            yield {key: column[i] for key, column in zip(keys, columns)}
+        return
+    data = _as_list(data)
+    assert len(data) == n, "data differs in length"
+    yield from data
+
+
+class Node(BaseNode, ElemData):
+    # Node and Edge define __slots__ to avoid a per-instance __dict__, so
+    # arbitrary attributes cannot be assigned. Store custom annotations in
+    # node.data. int_id is reserved for readwrite.writable_from_graph.
+    __slots__ = (
+        "_id",
+        "metanode",
+        "name",
+        "_data",
+        "edges",
+        "index",
+        "mask_table",
+        "degree_cache",
+        "int_id",
+        "hash_",
+    )
 
-class Node(BaseNode):
     def __init__(self, metanode, identifier, name, data):
         """ """
         BaseNode.__init__(self, identifier)
         self.metanode = metanode
         self.name = name
-        self.data = data
-        self.edges = {metaedge: set() for metaedge in metanode.edges}
+        # Shared by the identifiers of incident edges, including edge_dict keys
+        self._id = metanode.identifier, identifier
+        self.hash_ = hash(self._id)
+        self._data = data
+        self.edges = IncidentEdgeDict(metanode)
+        # Tuple of (mask version, dict of metaedge to masked degree) or None
+        self.degree_cache = None
 
     def get_id(self):
-        return self.metanode.identifier, self.identifier
+        return self._id
+
+    # Hashes are computed once at construction. Nodes of the same graph are
+    # compared by identity before their identifiers.
+    def __hash__(self):
+        return self.hash_
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        return (
+            isinstance(other, Node)
+            and self.hash_ == other.hash_
+            and self._id == other._id
+        )
+
+    @property
+    def masked(self):
+        return self.mask_table.get(self.index)
+
+    @masked.setter
+    def masked(self, masked):
+        self.mask_table.set(self.index, masked, self)
+
+    def _get_compiled(self):
+        """Return the CompiledGraph to read adjacency from, or None."""
+        return self.mask_table.state.compiled
 
     def get_edges(self, metaedge, exclude_masked=True):
         """
         Returns the set of edges incident to self of the specified metaedge.
+        Reads from the CSR arrays of the compiled graph when available.
         """
-        if exclude_masked:
-            edges = set()
-            for edge in self.edges[metaedge]:
-                if edge.masked or edge.target.masked:
-                    continue
-                edges.add(edge)
-        else:
+        compiled = self._get_compiled()
+        if compiled is None:
             edges = self.edges[metaedge]
+        else:
+            edges = compiled.get_edges(self, metaedge)
+        if exclude_masked and self.mask_table.state.n_masked > 0:
+            return {edge for edge in edges if not (edge.masked or edge.target.masked)}
+        if exclude_masked or compiled is not None:
+            return set(edges)
         return edges
 
+    def get_degree(self, metaedge, exclude_masked=True):
+        """
+        Return the number of edges of the specified metaedge incident to self,
+        without creating a set. Reads from the CSR arrays of the compiled
+        graph when available. Degrees excluding masked edges and targets are
+        cached until a mask of the graph changes or an edge is added to self.
+        """
+        compiled = self._get_compiled()
+        state = self.mask_table.state
+        if not exclude_masked or state.n_masked == 0:
+            if compiled is None:
+                return len(self.edges[metaedge])
+            return compiled.get_degree(self, metaedge)
+        cache = self.degree_cache
+        if cache is None or cache[0] != state.version:
+            cache = self.degree_cache = state.version, dict()
+        degrees = cache[1]
+        degree = degrees.get(metaedge)
+        if degree is None:
+            if compiled is None:
+                edges = self.edges[metaedge]
+            else:
+                edges = compiled.get_edges(self, metaedge)
+            degree = 0
+            for edge in edges:
+                if not (edge.masked or edge.target.masked):
+                    degree += 1
+            degrees[metaedge] = degree
+        return degree
+
     def __repr__(self):
-        node_as_dict = self.__dict__.copy()
+        node_as_dict = get_slot_items(self)
         del node_as_dict["edges"]
+        del node_as_dict["_id"]
+        del node_as_dict["mask_table"]
+        del node_as_dict["degree_cache"]
+        node_as_dict["data"] = node_as_dict.pop("_data", None)
+        if type(node_as_dict["data"]) is PropertyStore:
+            node_as_dict["data"] = self.data.copy()
         return f"{self.__class__!s}({node_as_dict!r})"
 
     def _repr_pretty_(self, p, cycle):
@@ -793,15 +2772,66 @@ class Node(BaseNode):
         return "{}::{}".format(*self.get_id())
 
 
-class Edge(BaseEdge):
+class Edge(BaseEdge, ElemData):
+    __slots__ = (
+        "metaedge",
+        "_data",
+        "_inverse",
+        "inverted",
+        "index",
+        "mask_table",
+        "hash_",
+    )
+
     def __init__(self, source, target, metaedge, data):
         """source and target are Node objects. metaedge is the MetaEdge object
-        representing the edge
+        representing the edge. Edges are registered with their source node by
+        Graph.add_edge.
         """
         BaseEdge.__init__(self, source, target)
         self.metaedge = metaedge
-        self.data = data
-        self.source.edges[metaedge].add(self)
+        self._data = data
+        self._inverse = None
+        self.hash_ = hash((source._id, target._id, metaedge.kind, metaedge.direction))
+
+    @property
+    def inverse(self):
+        """
+        The inverse of this edge. In graphs with virtual inverses, the inverse
+        of a forward edge is created on each access.
+        """
+        inverse = self._inverse
+        if inverse is None:
+            inverse = Edge(self.target, self.source, self.metaedge.inverse, self._data)
+            inverse.inverted = not self.inverted
+            inverse.index = self.index
+            inverse.mask_table = self.mask_table.inverse
+            inverse._inverse = self
+        return inverse
+
+    @inverse.setter
+    def inverse(self, inverse):
+        self._inverse = inverse
+
+    @property
+    def masked(self):
+        return self.mask_table.get(self.index)
+
+    @masked.setter
+    def masked(self, masked):
+        self.mask_table.set(self.index, masked, self)
+
+    def __hash__(self):
+        return self.hash_
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        return (
+            type(other) is Edge
+            and self.hash_ == other.hash_
+            and self.get_id() == other.get_id()
+        )
 
     def get_id(self):
         edge_id = (
@@ -813,10 +2843,112 @@ class Edge(BaseEdge):
         return edge_id
 
 
+class IncidentEdgeDict(dict):
+    """
+    Dict of metaedge to the edges of that metaedge incident to a node. Sets
+    of edges are only stored once a metaedge has edges: looking up any other
+    metaedge of the node's metanode returns an empty frozenset. Iteration,
+    len and membership cover every metaedge of the metanode, like a dict
+    with a set for each.
+    """
+
+    __slots__ = ("metanode",)
+
+    def __init__(self, metanode):
+        dict.__init__(self)
+        self.metanode = metanode
+
+    def __missing__(self, metaedge):
+        if metaedge in self.metanode.edges:
+            return EMPTY_EDGES
+        raise KeyError(metaedge)
+
+    def __iter__(self):
+        return iter(self.metanode.edges)
+
+    def __len__(self):
+        return len(self.metanode.edges)
+
+    def __contains__(self, metaedge):
+        return metaedge in self.metanode.edges
+
+    def get(self, metaedge, default=None):
+        if metaedge in self.metanode.edges:
+            return self[metaedge]
+        return default
+
+    def keys(self):
+        return collections.abc.KeysView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+    def values(self):
+        return collections.abc.ValuesView(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+# Incident edges of metaedges without edges
+EMPTY_EDGES = frozenset()
+
+
+class IncidentEdgeSet(collections.abc.Set):
+    """
+    Read-only set of the edges of a single metaedge incident to node, used by
+    graphs with virtual inverses. Only forward edges are stored. Iteration
+    orients each edge away from node, creating inverse edges on demand.
+    """
+
+    __slots__ = ("node", "forward_edges")
+
+    def __init__(self, node):
+        self.node = node
+        self.forward_edges = set()
+
+    def __iter__(self):
+        node = self.node
+        for edge in self.forward_edges:
+            yield edge if edge.source is node else edge.inverse
+
+    def __len__(self):
+        return len(self.forward_edges)
+
+    def __contains__(self, edge):
+        if not isinstance(edge, Edge) or edge.source != self.node:
+            return False
+        if edge.inverted:
+            edge = edge.inverse
+        return edge in self.forward_edges
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # Results of set operations are plain sets of edges
+        return set(iterable)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({set(self)!r})"
+
+
 class Path(BasePath):
+    __slots__ = ()
+
     def __init__(self, edges):
         BasePath.__init__(self, edges)
 
+    def is_masked(self):
+        if self.edges and self.edges[0].mask_table.state.n_masked == 0:
+            return False
+        return BasePath.is_masked(self)
+
     def __repr__(self):
         s = ""
         for edge in self:
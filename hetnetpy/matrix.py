@@ -1,4 +1,5 @@
 import logging
+import operator
 from collections import OrderedDict
 
 import numpy
@@ -10,9 +11,18 @@ def get_nodes(graph, metanode):
     Return a list of nodes for a given metanode, in sorted order.
     """
     metanode = graph.metagraph.get_metanode(metanode)
-    metanode_to_nodes = graph.get_metanode_to_nodes()
-    nodes = sorted(metanode_to_nodes[metanode])
-    return nodes
+    nodes = graph.metanode_to_nodes[metanode]
+    return sorted(nodes, key=operator.attrgetter("identifier"))
+
+
+def get_sorted_indexes(graph, metanode):
+    """
+    Return the node indexes for a given metanode, ordered such that the
+    corresponding nodes are in sorted order.
+    """
+    metanode = graph.metagraph.get_metanode(metanode)
+    nodes = graph.metanode_to_nodes[metanode]
+    return sorted(range(len(nodes)), key=lambda i: nodes[i].identifier)
 
 
 def get_node_identifiers(graph, metanode):
@@ -53,21 +63,35 @@ def metaedge_to_adjacency_matrix(graph, metaedge, dtype=numpy.bool_, dense_thres
     matrix : numpy.ndarray or scipy.sparse
     """
     metaedge = graph.metagraph.get_metaedge(metaedge)
-    source_nodes = list(get_node_to_position(graph, metaedge.source))
-    target_node_to_position = get_node_to_position(graph, metaedge.target)
-    shape = len(source_nodes), len(target_node_to_position)
-    row, col, data = [], [], []
-    for i, source_node in enumerate(source_nodes):
-        for edge in source_node.edges[metaedge]:
-            row.append(i)
-            col.append(target_node_to_position[edge.target])
-            data.append(1)
-    adjacency_matrix = scipy.sparse.csc_matrix(
-        (data, (row, col)), shape=shape, dtype=dtype
-    )
+    source_nodes = graph.metanode_to_nodes[metaedge.source]
+    target_nodes = graph.metanode_to_nodes[metaedge.target]
+    shape = len(source_nodes), len(target_nodes)
+    if graph.compiled is not None:
+        # Read the adjacency from the CSR arrays without iterating over edges
+        csr = graph.compiled.get_csr(metaedge)
+        indptr = numpy.frombuffer(csr.indptr, dtype=numpy.int64)
+        indices = numpy.frombuffer(csr.indices, dtype=numpy.int64)
+        data = numpy.ones(len(indices), dtype=dtype)
+        adjacency_matrix = scipy.sparse.csr_matrix(
+            (data, indices, indptr), shape=shape, dtype=dtype
+        )
+    else:
+        row, col = [], []
+        for source_node in source_nodes:
+            for edge in source_node.edges[metaedge]:
+                row.append(source_node.index)
+                col.append(edge.target.index)
+        data = numpy.ones(len(row), dtype=dtype)
+        adjacency_matrix = scipy.sparse.csr_matrix(
+            (data, (row, col)), shape=shape, dtype=dtype
+        )
+    # Reorder rows and columns from node index order to sorted node order
+    row_order = numpy.array(get_sorted_indexes(graph, metaedge.source), dtype=int)
+    col_order = numpy.array(get_sorted_indexes(graph, metaedge.target), dtype=int)
+    adjacency_matrix = adjacency_matrix[row_order][:, col_order].tocsc()
     adjacency_matrix = sparsify_or_densify(adjacency_matrix, dense_threshold)
-    row_names = [node.identifier for node in source_nodes]
-    column_names = [node.identifier for node in target_node_to_position]
+    row_names = [source_nodes[i].identifier for i in row_order]
+    column_names = [target_nodes[i].identifier for i in col_order]
     return row_names, column_names, adjacency_matrix
 
 
@@ -111,3 +135,141 @@ def sparsify_or_densify(matrix, dense_threshold=0.3):
     if not sparse_input and not densify:
         return scipy.sparse.csc_matrix(matrix, dtype=dtype)
     return matrix
+
+
+def prune_metapaths(graph, metapaths, min_pairs=1, max_chunk_words=2**24):
+    """
+    Count the source–target node pairs connected by each metapath and drop
+    metapaths connecting fewer than min_pairs pairs. A pair is connected
+    when at least one walk follows the metapath from source to target.
+    Walks may revisit nodes, so counts are an upper bound on the number of
+    pairs with a nonzero path count or DWPC.
+
+    Reachability from every source node is stored as a bit-packed boolean
+    matrix with one row per node of the current metanode. Extending a
+    metapath by a metaedge ORs together the rows of the neighbors of each
+    node. Metapaths are processed in lexicographic order of their metaedges,
+    so that each metapath follows its prefixes and metapaths sharing a
+    prefix, of any length, extend the same reachability matrices.
+
+    Parameters
+    ==========
+    graph : hetnetpy.hetnet.Graph
+    metapaths : iterable
+        hetnetpy.hetnet.MetaPath objects or abbreviations
+    min_pairs : int
+        minimum number of connected pairs for a metapath to be retained
+    max_chunk_words : int
+        maximum number of 64-bit words gathered at once when extending a
+        reachability matrix, which bounds memory usage
+
+    Returns
+    =======
+    metapath_to_pairs : OrderedDict
+        number of connected pairs for each retained metapath, in input order
+    """
+    metagraph = graph.metagraph
+    metapaths = [metagraph.get_metapath(metapath) for metapath in metapaths]
+    metaedge_to_transpose = dict()
+    metanode_to_identity = dict()
+    metapath_to_pairs = dict()
+    # Stack of the reachability matrices of the prefixes of the last metapath
+    prefix, stack = (), list()
+    for metapath in sorted(set(metapaths), key=operator.attrgetter("edges")):
+        edges = metapath.edges
+        n_shared = 0
+        for previous, edge in zip(prefix, edges):
+            if previous != edge:
+                break
+            n_shared += 1
+        del stack[n_shared + 1 :]
+        prefix = edges
+        if n_shared == 0:
+            source = metapath.source()
+            identity = metanode_to_identity.get(source)
+            if identity is None:
+                n_sources = len(graph.metanode_to_nodes[source])
+                identity = _get_packed_identity(n_sources)
+                metanode_to_identity[source] = identity
+            stack = [identity]
+        for metaedge in edges[len(stack) - 1 :]:
+            reach = stack[-1]
+            if reach is not None:
+                transpose = metaedge_to_transpose.get(metaedge)
+                if transpose is None:
+                    transpose = metaedge_to_transpose[
+                        metaedge
+                    ] = _get_transposed_adjacency(graph, metaedge)
+                reach = _extend_reach(reach, transpose, max_chunk_words)
+            stack.append(reach)
+        reach = stack[-1]
+        metapath_to_pairs[metapath] = 0 if reach is None else _count_bits(reach)
+    return OrderedDict(
+        (metapath, metapath_to_pairs[metapath])
+        for metapath in metapaths
+        if metapath_to_pairs[metapath] >= min_pairs
+    )
+
+
+def _get_packed_identity(n_nodes):
+    """
+    Return the bit-packed reachability matrix of walks of length zero, where
+    row i has only bit i set.
+    """
+    n_words = max(1, -(-n_nodes // 64))
+    identity = numpy.zeros((n_nodes, n_words * 8), dtype=numpy.uint8)
+    positions = numpy.arange(n_nodes)
+    identity[positions, positions // 8] = numpy.left_shift(1, positions % 8)
+    return identity.view(numpy.uint64)
+
+
+def _get_transposed_adjacency(graph, metaedge):
+    """
+    Return the adjacency matrix of metaedge as a scipy.sparse.csr_matrix with
+    target nodes as rows and source nodes as columns.
+    """
+    _, _, adjacency_matrix = metaedge_to_adjacency_matrix(
+        graph, metaedge, dense_threshold=2
+    )
+    return adjacency_matrix.transpose().tocsr()
+
+
+def _extend_reach(reach, transpose, max_chunk_words):
+    """
+    Extend the bit-packed reachability matrix reach by the metaedge whose
+    transposed adjacency matrix is transpose. Returns None when no walks
+    remain.
+    """
+    n_targets = transpose.shape[0]
+    n_words = reach.shape[1]
+    extended = numpy.zeros((n_targets, n_words), dtype=numpy.uint64)
+    indptr = transpose.indptr
+    indices = transpose.indices
+    nonempty = numpy.flatnonzero(numpy.diff(indptr))
+    max_chunk_nnz = max(1, max_chunk_words // n_words)
+    start = 0
+    while start < len(nonempty):
+        # Take the rows of as many targets as fit in a chunk
+        stop = start + 1
+        limit = indptr[nonempty[start]] + max_chunk_nnz
+        stop = max(stop, numpy.searchsorted(indptr[nonempty + 1], limit, "right"))
+        rows = nonempty[start:stop]
+        first, last = indptr[rows[0]], indptr[rows[-1] + 1]
+        gathered = reach[indices[first:last]]
+        extended[rows] = numpy.bitwise_or.reduceat(
+            gathered, indptr[rows] - first, axis=0
+        )
+        start = stop
+    if not extended.any():
+        return None
+    return extended
+
+
+def _count_bits(packed):
+    """
+    Return the number of set bits in packed.
+    """
+    if hasattr(numpy, "bitwise_count"):
+        return int(numpy.bitwise_count(packed).sum())
+    table = numpy.array([bin(i).count("1") for i in range(256)], dtype=numpy.int64)
+    return int(table[packed.view(numpy.uint8)].sum())
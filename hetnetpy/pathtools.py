@@ -30,13 +30,15 @@ def path_degree_product(
     """
     degrees = list()
     for edge in path:
-        source_edges = edge.source.get_edges(edge.metaedge, exclude_masked)
-        target_edges = edge.target.get_edges(edge.metaedge.inverse, exclude_masked)
+        metaedge = edge.metaedge
         if exclude_edges:
-            source_edges -= exclude_edges
-            target_edges -= exclude_edges
-        source_degree = len(source_edges)
-        target_degree = len(target_edges)
+            source_edges = edge.source.get_edges(metaedge, exclude_masked)
+            target_edges = edge.target.get_edges(metaedge.inverse, exclude_masked)
+            source_degree = len(source_edges - exclude_edges)
+            target_degree = len(target_edges - exclude_edges)
+        else:
+            source_degree = edge.source.get_degree(metaedge, exclude_masked)
+            target_degree = edge.target.get_degree(metaedge.inverse, exclude_masked)
         degrees.append(source_degree)
         degrees.append(target_degree)
 
@@ -68,18 +70,28 @@ def paths_from(
     if masked and source.masked:
         return None
 
+    # Skip per-element mask lookups when nothing in the graph is masked
+    check_masks = not masked and graph.any_masked()
+
     if source in exclude_nodes:
         return None
 
+    # Read adjacency from CSR arrays when the graph has been compiled
+    compiled = graph.compiled
+    if compiled is None:
+        get_edges = _get_node_edges
+    else:
+        get_edges = compiled.get_edges
+
     paths = list()
 
-    for edge in source.edges[metapath[0]]:
+    for edge in get_edges(source, metapath[0]):
         edge_target = edge.target
         if edge_target in exclude_nodes:
             continue
         if edge in exclude_edges:
             continue
-        if not masked and (edge_target.masked or edge.masked):
+        if check_masks and (edge_target.masked or edge.masked):
             continue
         if not duplicates and edge_target == source:
             continue
@@ -91,14 +103,14 @@ def paths_from(
         metaedge = metapath[i]
         for path in paths:
             nodes = path.get_nodes()
-            edges = path.target().edges[metaedge]
+            edges = get_edges(path.target(), metaedge)
             for edge in edges:
                 edge_target = edge.target
                 if edge_target in exclude_nodes:
                     continue
                 if edge in exclude_edges:
                     continue
-                if not masked and (edge_target.masked or edge.masked):
+                if check_masks and (edge_target.masked or edge.masked):
                     continue
                 if not duplicates and edge_target in nodes:
                     continue
@@ -109,6 +121,10 @@ def paths_from(
     return paths
 
 
+def _get_node_edges(node, metaedge):
+    return node.edges[metaedge]
+
+
 def paths_between(
     graph,
     source,
@@ -29,8 +29,8 @@ def permute_graph(graph, multiplier=10, seed=0, metaedge_to_excluded=dict(), log
         permuted hetnets, it's recommended to increment this number, such that
         each round of permutation shuffles edges in a different order.
     metaedge_to_excluded : dict (metaedge -> set)
-        Edges to exclude. This argument has not been extensively used in
-        practice.
+        Edges to exclude, specified as (source_id, target_id) pairs of node
+        ids. This argument has not been extensively used in practice.
     log : bool
         Whether to log diagnostic INFO via python's logging module.
 
@@ -46,10 +46,18 @@ def permute_graph(graph, multiplier=10, seed=0, metaedge_to_excluded=dict(), log
 
     if log:
         logging.info("Creating permuted graph template")
-    permuted_graph = Graph(graph.metagraph)
-    for (metanode_identifier, node_identifier), node in graph.node_dict.items():
-        permuted_graph.add_node(
-            metanode_identifier, node_identifier, name=node.name, data=node.data
+    # Nodes are added in the same order, so they receive the same indexes
+    permuted_graph = Graph(
+        graph.metagraph,
+        virtual_inverses=graph.virtual_inverses,
+        columnar_data=graph.columnar_data,
+    )
+    for metanode, nodes in graph.metanode_to_nodes.items():
+        permuted_graph.add_nodes(
+            metanode.identifier,
+            identifiers=[node.identifier for node in nodes],
+            names=[node.name for node in nodes],
+            data=[node.data for node in nodes],
         )
 
     if log:
@@ -64,8 +72,21 @@ def permute_graph(graph, multiplier=10, seed=0, metaedge_to_excluded=dict(), log
         if log:
             logging.info(metaedge)
 
-        excluded_pair_set = metaedge_to_excluded.get(metaedge, set())
-        pair_list = [(edge.source.get_id(), edge.target.get_id()) for edge in edges]
+        # Represent nodes by their dense integer index. For metaedges between
+        # different metanodes, offset target indexes so that source and target
+        # indexes never collide (which would be mistaken for self-loops).
+        if metaedge.source == metaedge.target:
+            offset = 0
+        else:
+            offset = len(graph.metanode_to_nodes[metaedge.source])
+        source_index = graph.metanode_to_identifier_index[metaedge.source]
+        target_index = graph.metanode_to_identifier_index[metaedge.target]
+        excluded_pair_set = set()
+        for source_id, target_id in metaedge_to_excluded.get(metaedge, set()):
+            if source_id[1] in source_index and target_id[1] in target_index:
+                pair = source_index[source_id[1]], target_index[target_id[1]] + offset
+                excluded_pair_set.add(pair)
+        pair_list = [(edge.source.index, edge.target.index + offset) for edge in edges]
         directed = metaedge.direction != "both"
         permuted_pair_list, stats = permute_pair_list(
             pair_list,
@@ -80,8 +101,15 @@ def permute_graph(graph, multiplier=10, seed=0, metaedge_to_excluded=dict(), log
             stat["abbrev"] = metaedge.abbrev
         all_stats.extend(stats)
 
-        for pair in permuted_pair_list:
-            permuted_graph.add_edge(pair[0], pair[1], metaedge.kind, metaedge.direction)
+        source_nodes = graph.metanode_to_nodes[metaedge.source]
+        target_nodes = graph.metanode_to_nodes[metaedge.target]
+        permuted_graph.add_edges(
+            metaedge,
+            source_ids=[source_nodes[s].identifier for s, _ in permuted_pair_list],
+            target_ids=[
+                target_nodes[t - offset].identifier for _, t in permuted_pair_list
+            ],
+        )
 
     return permuted_graph, all_stats
 
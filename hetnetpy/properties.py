@@ -0,0 +1,292 @@
+import array
+import collections.abc
+import functools
+import itertools
+import operator
+
+
+def get_value_kind(value):
+    """
+    Return the column kind for storing value: bool, int, float, str or object.
+    """
+    value_type = type(value)
+    if value_type is bool:
+        return "bool"
+    if value_type is int:
+        return "int"
+    if value_type is float:
+        return "float"
+    if value_type is str:
+        return "str"
+    return "object"
+
+
+class PropertyColumn:
+    """
+    Values of a single property for the rows of a PropertyStore. Booleans and
+    integers are stored in an int64 array, floats in a float64 array and
+    strings as int64 codes into a list of categories (dictionary encoding).
+    Other values, or columns with values of mixed kinds, are stored in a
+    list. present records which rows have a value. Storage only grows to the
+    highest row that has been set.
+    """
+
+    __slots__ = ("kind", "values", "present", "categories", "category_to_code")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.present = bytearray()
+        self.categories = None
+        self.category_to_code = None
+        if kind == "object":
+            self.values = list()
+        elif kind == "float":
+            self.values = array.array("d")
+        else:
+            self.values = array.array("q")
+        if kind == "str":
+            self.categories = list()
+            self.category_to_code = dict()
+
+    def __len__(self):
+        return len(self.present)
+
+    def has(self, row):
+        present = self.present
+        return row < len(present) and present[row] == 1
+
+    def get(self, row):
+        """Return the value at row, which must be present."""
+        value = self.values[row]
+        kind = self.kind
+        if kind == "str":
+            return self.categories[value]
+        if kind == "bool":
+            return bool(value)
+        return value
+
+    def set(self, row, value):
+        kind = get_value_kind(value)
+        if kind != self.kind and self.kind != "object":
+            self.to_object()
+        self._extend(row + 1)
+        if self.kind == "str":
+            code = self.category_to_code.get(value)
+            if code is None:
+                code = self.category_to_code[value] = len(self.categories)
+                self.categories.append(value)
+            value = code
+        try:
+            self.values[row] = value
+        except OverflowError:
+            # Integers beyond int64
+            self.to_object()
+            self.values[row] = value
+        self.present[row] = 1
+
+    def delete(self, row):
+        if not self.has(row):
+            raise KeyError(row)
+        self.present[row] = 0
+        if self.kind == "object":
+            self.values[row] = None
+
+    def truncate(self, length):
+        """Remove rows from length onwards."""
+        del self.present[length:]
+        del self.values[length:]
+
+    def _extend(self, length):
+        n_missing = length - len(self.present)
+        if n_missing <= 0:
+            return
+        self.present.extend(bytes(n_missing))
+        values = self.values
+        if self.kind == "object":
+            values.extend(itertools.repeat(None, n_missing))
+        else:
+            values.frombytes(bytes(n_missing * values.itemsize))
+
+    def to_object(self):
+        """Convert to a column that stores values in a list."""
+        values = [
+            self.get(row) if present else None
+            for row, present in enumerate(self.present)
+        ]
+        self.kind = "object"
+        self.values = values
+        self.categories = None
+        self.category_to_code = None
+
+    def to_list(self, default=None):
+        """Return a list with the value of each row, or default if missing."""
+        return [
+            self.get(row) if present else default
+            for row, present in enumerate(self.present)
+        ]
+
+    def select(self, value=None, predicate=None):
+        """
+        Return a list of the rows whose value equals value, or satisfies
+        predicate if predicate is not None. Rows without a value are never
+        selected. String columns evaluate predicate once per category.
+        """
+        present = self.present
+        rows = itertools.compress(range(len(present)), present)
+        values = itertools.compress(self.values, present)
+        if self.kind == "str":
+            if predicate is None:
+                codes = {self.category_to_code.get(value)}
+            else:
+                codes = {
+                    code
+                    for code, category in enumerate(self.categories)
+                    if predicate(category)
+                }
+            matches = map(codes.__contains__, values)
+        else:
+            if self.kind == "bool":
+                values = map(bool, values)
+            if predicate is None:
+                predicate = functools.partial(operator.eq, value)
+            matches = map(predicate, values)
+        return list(itertools.compress(rows, matches))
+
+
+class PropertyStore:
+    """
+    Columnar storage for the data of the nodes of a metanode or the edges of
+    a metaedge. Row i holds the data of the element with index i, exposed as
+    a dict-like PropertyView through element.data.
+    """
+
+    __slots__ = ("n_rows", "columns")
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns = dict()
+
+    def __len__(self):
+        return self.n_rows
+
+    def append(self, data):
+        """Add a row with the items of data and return its index."""
+        row = self.n_rows
+        self.n_rows += 1
+        for key, value in data.items():
+            self.set(row, key, value)
+        return row
+
+    def get(self, row, key):
+        column = self.columns.get(key)
+        if column is None or not column.has(row):
+            raise KeyError(key)
+        return column.get(row)
+
+    def set(self, row, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = PropertyColumn(get_value_kind(value))
+        column.set(row, value)
+
+    def delete(self, row, key):
+        column = self.columns.get(key)
+        if column is None or not column.has(row):
+            raise KeyError(key)
+        column.delete(row)
+
+    def keys(self, row):
+        """Return a list of the keys present in row."""
+        return [key for key, column in self.columns.items() if column.has(row)]
+
+    def get_row(self, row):
+        """Return the data of row as a dict."""
+        return {
+            key: column.get(row)
+            for key, column in self.columns.items()
+            if column.has(row)
+        }
+
+    def set_row(self, row, data):
+        """Replace the data of row with the items of data."""
+        for key in self.keys(row):
+            self.delete(row, key)
+        for key, value in data.items():
+            self.set(row, key, value)
+
+    def move_row(self, from_row, to_row):
+        """
+        Replace the data of to_row with the data of from_row, leaving
+        from_row empty.
+        """
+        for column in self.columns.values():
+            if column.has(from_row):
+                column.set(to_row, column.get(from_row))
+                column.delete(from_row)
+            elif column.has(to_row):
+                column.delete(to_row)
+
+    def pop_row(self):
+        """Remove the last row and return its data as a dict."""
+        self.n_rows -= 1
+        row = self.n_rows
+        data = self.get_row(row)
+        for column in self.columns.values():
+            column.truncate(row)
+        return data
+
+    def get_column(self, key, default=None):
+        """
+        Return a list with the value of key for every row, using default for
+        rows without a value.
+        """
+        column = self.columns.get(key)
+        if column is None:
+            return [default] * self.n_rows
+        values = column.to_list(default)
+        values.extend(itertools.repeat(default, self.n_rows - len(values)))
+        return values
+
+    def select(self, key, value=None, predicate=None):
+        """
+        Return a list of the rows whose value of key equals value, or
+        satisfies predicate if predicate is not None.
+        """
+        column = self.columns.get(key)
+        if column is None:
+            return list()
+        return column.select(value, predicate)
+
+
+class PropertyView(collections.abc.MutableMapping):
+    """
+    Dict-like view of a single row of a PropertyStore.
+    """
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.store.get(self.row, key)
+
+    def __setitem__(self, key, value):
+        self.store.set(self.row, key, value)
+
+    def __delitem__(self, key):
+        self.store.delete(self.row, key)
+
+    def __iter__(self):
+        return iter(self.store.keys(self.row))
+
+    def __len__(self):
+        return len(self.store.keys(self.row))
+
+    def copy(self):
+        """Return the data as a dict."""
+        return self.store.get_row(self.row)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.copy()!r})"
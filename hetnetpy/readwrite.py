@@ -19,10 +19,15 @@ except ImportError:
 from hetnetpy.hetnet import Graph, MetaGraph
 
 
-def read_graph(path, formatting=None):
-    """Read a graph from a path"""
+def read_graph(path, formatting=None, virtual_inverses=False, columnar_data=False):
+    """
+    Read a graph from a path. See hetnetpy.hetnet.Graph for virtual_inverses
+    and columnar_data.
+    """
     writable = extract_writable(path, formatting)
-    graph = graph_from_writable(writable)
+    graph = graph_from_writable(
+        writable, virtual_inverses=virtual_inverses, columnar_data=columnar_data
+    )
     return graph
 
 
@@ -169,20 +174,57 @@ def metagraph_from_writable(writable):
     return metagraph
 
 
-def graph_from_writable(writable):
+def graph_from_writable(writable, virtual_inverses=False, columnar_data=False):
     """Create a graph from a writable"""
     metagraph = metagraph_from_writable(writable)
-    graph = Graph(metagraph)
-
-    nodes = writable["nodes"]
-    for node in nodes:
-        graph.add_node(**node)
-
-    edges = writable["edges"]
-    for edge in edges:
-        for key in "source_id", "target_id":
-            edge[key] = tuple(edge[key])
-        graph.add_edge(**edge)
+    graph = Graph(
+        metagraph, virtual_inverses=virtual_inverses, columnar_data=columnar_data
+    )
+
+    # Add nodes in bulk, one metanode at a time, recording their positions
+    # in the writable to restore its order in node_dict
+    kind_to_nodes = dict()
+    for position, node in enumerate(writable["nodes"]):
+        kind_to_nodes.setdefault(node["kind"], list()).append((position, node))
+    ordered_nodes = [None] * len(writable["nodes"])
+    for kind, nodes in kind_to_nodes.items():
+        created = graph.add_nodes(
+            kind,
+            identifiers=[node["identifier"] for _, node in nodes],
+            names=[node.get("name") for _, node in nodes],
+            data=[node.get("data", {}) for _, node in nodes],
+        )
+        for (position, _), node in zip(nodes, created):
+            ordered_nodes[position] = node
+    graph.node_dict.clear()
+    graph.node_dict.update((node.get_id(), node) for node in ordered_nodes)
+
+    # Add edges in bulk, one metaedge at a time, likewise restoring the order
+    # of the writable in edge_dict
+    metaedge_to_edges = dict()
+    for position, edge in enumerate(writable["edges"]):
+        source_kind, _ = edge["source_id"]
+        target_kind, _ = edge["target_id"]
+        metaedge_id = source_kind, target_kind, edge["kind"], edge["direction"]
+        metaedge_to_edges.setdefault(metaedge_id, list()).append((position, edge))
+    ordered_edges = [None] * len(writable["edges"])
+    for metaedge_id, edges in metaedge_to_edges.items():
+        created = graph.add_edges(
+            metaedge_id,
+            source_ids=[edge["source_id"][1] for _, edge in edges],
+            target_ids=[edge["target_id"][1] for _, edge in edges],
+            data=[edge.get("data", {}) for _, edge in edges],
+        )
+        for (position, _), edge in zip(edges, created):
+            ordered_edges[position] = edge
+    graph.edge_dict.clear()
+    for edge in ordered_edges:
+        # Graphs with virtual inverses only store forward edges
+        if virtual_inverses and edge.inverted:
+            edge = edge.inverse
+        graph.edge_dict[edge.get_id()] = edge
+        if not virtual_inverses and edge.inverse is not edge:
+            graph.edge_dict[edge.inverse.get_id()] = edge.inverse
 
     return graph
 
@@ -213,7 +255,7 @@ def writable_from_graph(graph, int_id=False, masked=True):
         node_as_dict["kind"] = node.metanode.identifier
         node_as_dict["identifier"] = node.identifier
         node_as_dict["name"] = node.name
-        node_as_dict["data"] = node.data
+        node_as_dict["data"] = _data_as_dict(node.data)
         if int_id:
             node_as_dict["int_id"] = i
             node.int_id = i
@@ -228,7 +270,7 @@ def writable_from_graph(graph, int_id=False, masked=True):
         edge_id = edge.get_id()
         edge_items = list(zip(edge_id_keys, edge_id))
         edge_as_dict = collections.OrderedDict(edge_items)
-        edge_as_dict["data"] = edge.data
+        edge_as_dict["data"] = _data_as_dict(edge.data)
         if int_id:
             edge_as_dict["source_int"] = edge.source.int_id
             edge_as_dict["target_int"] = edge.target.int_id
@@ -238,6 +280,13 @@ def writable_from_graph(graph, int_id=False, masked=True):
     return writable
 
 
+def _data_as_dict(data):
+    """Convert columnar data (a PropertyView) to a dict."""
+    if isinstance(data, dict):
+        return data
+    return data.copy()
+
+
 class Encoder(json.JSONEncoder):
     """
     A JSONEncoder that supports numpy types by converting them
@@ -0,0 +1,408 @@
+import collections.abc
+import json
+import mmap
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import hetnetpy.compiled
+from hetnetpy.hetnet import Edge, GraphState, MaskTable, Node
+from hetnetpy.readwrite import metagraph_from_writable, writable_from_metagraph
+
+# A snapshot buffer starts with MAGIC and the length of its JSON header,
+# followed by the header and 8-byte aligned int64 / uint8 arrays.
+MAGIC = b"HETSNAP1"
+PREFIX = struct.Struct("<8sQ")
+
+# Names of the shared memory blocks created by this process
+_created_names = set()
+
+
+def serialize_graph(graph):
+    """
+    Return a bytearray encoding the nodes and adjacency of graph as a
+    snapshot buffer. Node and edge data, masks and graph.data are not
+    included. Node identifiers and names must be JSON serializable, and
+    identifiers must be str or int to survive the round trip.
+    """
+    compiled = graph.compiled
+    if compiled is None:
+        compiled = hetnetpy.compiled.CompiledGraph(graph)
+    header = {
+        "metagraph": writable_from_metagraph(graph.metagraph),
+        "n_nodes": graph.n_nodes,
+        "n_edges": graph.n_edges,
+        "n_inverts": graph.n_inverts,
+        "nodes": dict(),
+        "metaedges": list(),
+    }
+    for metanode, nodes in compiled.metanode_to_nodes.items():
+        header["nodes"][metanode.identifier] = {
+            "identifiers": [node.identifier for node in nodes],
+            "names": [node.name for node in nodes],
+        }
+    arrays = list()
+    for metaedge, csr in compiled.metaedge_to_csr.items():
+        inverted = bytes(edge.inverted for edge in csr.edges)
+        arrays.extend([csr.indptr.tobytes(), csr.indices.tobytes(), inverted])
+        header["metaedges"].append(
+            {"id": list(metaedge.get_id()), "n_edges": csr.n_edges}
+        )
+
+    # Compute 8-byte aligned array offsets, which depend on the header size
+    header_bytes = b""
+    while True:
+        offset = _align(PREFIX.size + len(header_bytes))
+        offsets = list()
+        for array in arrays:
+            offsets.append(offset)
+            offset = _align(offset + len(array))
+        for i, metaedge_header in enumerate(header["metaedges"]):
+            metaedge_header["offsets"] = offsets[3 * i : 3 * i + 3]
+        encoded = json.dumps(header).encode()
+        if encoded == header_bytes:
+            break
+        header_bytes = encoded
+
+    buffer = bytearray(offset)
+    PREFIX.pack_into(buffer, 0, MAGIC, len(header_bytes))
+    buffer[PREFIX.size : PREFIX.size + len(header_bytes)] = header_bytes
+    for array, array_offset in zip(arrays, offsets):
+        buffer[array_offset : array_offset + len(array)] = array
+    return buffer
+
+
+def create_snapshot(graph, path=None):
+    """
+    Create a read-only snapshot of graph, stored in shared memory or, if path
+    is specified, in a file that is then memory-mapped. Pass the returned
+    GraphSnapshot (which pickles to its shared memory name or path) to worker
+    processes, which attach to the same memory without copying it. The
+    creator of a shared memory snapshot should call unlink once all
+    processes are done with it.
+    """
+    buffer = serialize_graph(graph)
+    if path is not None:
+        with open(path, "wb") as write_file:
+            write_file.write(buffer)
+        return GraphSnapshot.open(path)
+    memory = shared_memory.SharedMemory(create=True, size=len(buffer))
+    memory.buf[: len(buffer)] = buffer
+    _created_names.add(memory.name)
+    return GraphSnapshot(memory.buf, shared_memory=memory, creator=True)
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+class GraphSnapshot:
+    def __init__(self, buffer, shared_memory=None, path=None, mmap=None, creator=False):
+        """
+        Frozen view of a graph backed by a snapshot buffer. Use
+        create_snapshot, GraphSnapshot.attach or GraphSnapshot.open rather
+        than calling the constructor. A snapshot supports the read-only
+        graph interface used by hetnetpy.pathtools and hetnetpy.matrix.
+        Node and Edge objects are created on demand in each process, so
+        edges are compared by identifier rather than identity. creator
+        records whether this process created the shared memory block.
+        """
+        self.shared_memory = shared_memory
+        self.creator = creator
+        self.path = path
+        self.mmap = mmap
+        self.buffer = memoryview(buffer)
+        magic, header_size = PREFIX.unpack_from(self.buffer, 0)
+        assert magic == MAGIC, "not a hetnetpy graph snapshot"
+        header_bytes = self.buffer[PREFIX.size : PREFIX.size + header_size]
+        header = json.loads(bytes(header_bytes))
+        self.metagraph = metagraph_from_writable(header["metagraph"])
+        self.data = dict()
+        self.n_nodes = header["n_nodes"]
+        self.n_edges = header["n_edges"]
+        self.n_inverts = header["n_inverts"]
+        self.virtual_inverses = False
+        # Masks are not part of snapshots. The inverse of the empty table is
+        # itself, so that inverse edges read as unmasked too.
+        self.mask_table = MaskTable(GraphState())
+        self.mask_table.inverse = self.mask_table
+        self.metanode_to_nodes = dict()
+        for kind, nodes in header["nodes"].items():
+            metanode = self.metagraph.get_metanode(kind)
+            self.metanode_to_nodes[metanode] = SnapshotNodes(
+                self, metanode, nodes["identifiers"], nodes["names"]
+            )
+        self.node_dict = SnapshotNodeDict(self)
+        self.metaedge_to_csr = dict()
+        for metaedge_header in header["metaedges"]:
+            metaedge = self.metagraph.get_metaedge(tuple(metaedge_header["id"]))
+            n_rows = len(self.metanode_to_nodes[metaedge.source])
+            n_edges = metaedge_header["n_edges"]
+            indptr, indices, inverted = metaedge_header["offsets"]
+            csr = SnapshotMetaEdge(
+                metaedge,
+                indptr=self._get_array(indptr, n_rows + 1, "q"),
+                indices=self._get_array(indices, n_edges, "q"),
+                inverted=self._get_array(inverted, n_edges, "B"),
+            )
+            self.metaedge_to_csr[metaedge] = csr
+        # Read adjacency from the snapshot arrays, like a compiled graph
+        self.compiled = SnapshotAdjacency(self)
+
+    def _get_array(self, offset, length, typecode):
+        itemsize = struct.calcsize(typecode)
+        return self.buffer[offset : offset + length * itemsize].cast(typecode)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a snapshot in the shared memory block called name."""
+        creator = name in _created_names
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 registers attached blocks with the resource
+            # tracker, which would unlink them when this process exits. The
+            # creating process keeps its registration, which unlink removes.
+            memory = shared_memory.SharedMemory(name=name)
+            if not creator:
+                resource_tracker.unregister(memory._name, "shared_memory")
+        return cls(memory.buf, shared_memory=memory, creator=creator)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a snapshot file created by create_snapshot."""
+        with open(path, "rb") as read_file:
+            mapped = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, path=path, mmap=mapped)
+
+    @property
+    def name(self):
+        """Name of the shared memory block, or None for file snapshots."""
+        if self.shared_memory is None:
+            return None
+        return self.shared_memory.name
+
+    def __reduce__(self):
+        if self.shared_memory is not None:
+            return GraphSnapshot.attach, (self.shared_memory.name,)
+        return GraphSnapshot.open, (self.path,)
+
+    def close(self):
+        """
+        Release this process's mapping of the snapshot. Nodes, edges and
+        arrays obtained from the snapshot must no longer be used.
+        """
+        for csr in self.metaedge_to_csr.values():
+            for array in csr.indptr, csr.indices, csr.inverted:
+                array.release()
+        self.buffer.release()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+        if self.mmap is not None:
+            self.mmap.close()
+
+    def unlink(self):
+        """Free the shared memory block, once all processes have closed it."""
+        if self.shared_memory is not None:
+            self.shared_memory.unlink()
+            _created_names.discard(self.shared_memory.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_node(self, node_id):
+        return self.node_dict[node_id]
+
+    def get_nodes(self):
+        for nodes in self.metanode_to_nodes.values():
+            yield from nodes
+
+    def __iter__(self):
+        return self.get_nodes()
+
+    def __contains__(self, node_id):
+        return node_id in self.node_dict
+
+    def count_nodes(self, metanode):
+        metanode = self.metagraph.get_metanode(metanode)
+        return len(self.metanode_to_nodes[metanode])
+
+    def any_masked(self):
+        return False
+
+    def get_edges(self, exclude_inverts=True):
+        """
+        Generate the edges of the snapshot. exclude_inverts excludes inverted
+        edges, as in Graph.get_edges.
+        """
+        get_edges = self.compiled.get_edges
+        for metaedge in self.metagraph.get_edges(exclude_inverts=False):
+            for node in self.metanode_to_nodes[metaedge.source]:
+                for edge in get_edges(node, metaedge):
+                    if exclude_inverts and edge.inverted:
+                        continue
+                    yield edge
+
+
+class SnapshotAdjacency:
+    def __init__(self, snapshot):
+        """
+        Adjacency of a GraphSnapshot, stored as snapshot.compiled, with the
+        interface of hetnetpy.compiled.CompiledGraph that hetnetpy.pathtools
+        and hetnetpy.matrix read from.
+        """
+        self.snapshot = snapshot
+
+    def get_nodes(self, metanode):
+        """Return the nodes of metanode, ordered by index."""
+        return self.snapshot.metanode_to_nodes[metanode]
+
+    def get_csr(self, metaedge):
+        """Return the SnapshotMetaEdge for metaedge."""
+        return self.snapshot.metaedge_to_csr[metaedge]
+
+    def get_degree(self, node, metaedge):
+        return self.snapshot.metaedge_to_csr[metaedge].get_degree(node.index)
+
+    def get_edges(self, node, metaedge):
+        """Return a tuple of the edges of metaedge incident to node."""
+        snapshot = self.snapshot
+        csr = snapshot.metaedge_to_csr[metaedge]
+        targets = snapshot.metanode_to_nodes[metaedge.target]
+        indices = csr.indices
+        inverted = csr.inverted
+        mask_table = snapshot.mask_table
+        edges = list()
+        for position in range(csr.indptr[node.index], csr.indptr[node.index + 1]):
+            edge = Edge(node, targets[indices[position]], metaedge, dict())
+            edge.inverted = bool(inverted[position])
+            edge.index = position
+            edge.mask_table = mask_table
+            edges.append(edge)
+        return tuple(edges)
+
+
+class SnapshotMetaEdge(hetnetpy.compiled.CompiledMetaEdge):
+    def __init__(self, metaedge, indptr, indices, inverted):
+        """
+        CSR adjacency of a metaedge stored in a snapshot buffer. inverted
+        records edge.inverted for each entry of indices. Edge objects are
+        created by SnapshotAdjacency.get_edges rather than stored.
+        """
+        hetnetpy.compiled.CompiledMetaEdge.__init__(
+            self, metaedge, indptr, indices, edges=None
+        )
+        self.inverted = inverted
+
+
+class SnapshotNode(Node):
+    __slots__ = ()
+
+    def __init__(self, snapshot, metanode, index, identifier, name):
+        """
+        Node of a GraphSnapshot. node.edges maps each metaedge to a tuple of
+        incident edges, which are created on access. Snapshot nodes have no
+        data.
+        """
+        self.identifier = identifier
+        self.metanode = metanode
+        self.name = name
+        self._id = metanode.identifier, identifier
+        self.hash_ = hash(self._id)
+        self._data = dict()
+        self.index = index
+        self.mask_table = snapshot.mask_table
+        self.degree_cache = None
+        self.edges = SnapshotIncidentEdges(snapshot, self)
+
+    def get_degree(self, metaedge, exclude_masked=True):
+        return self.edges.snapshot.compiled.get_degree(self, metaedge)
+
+
+class SnapshotIncidentEdges(collections.abc.Mapping):
+    """
+    Read-only mapping of metaedge to the edges incident to a SnapshotNode.
+    """
+
+    __slots__ = ("snapshot", "node")
+
+    def __init__(self, snapshot, node):
+        self.snapshot = snapshot
+        self.node = node
+
+    def __getitem__(self, metaedge):
+        if metaedge not in self.node.metanode.edges:
+            raise KeyError(metaedge)
+        return self.snapshot.compiled.get_edges(self.node, metaedge)
+
+    def __iter__(self):
+        return iter(self.node.metanode.edges)
+
+    def __len__(self):
+        return len(self.node.metanode.edges)
+
+
+class SnapshotNodes(collections.abc.Sequence):
+    """
+    Nodes of a metanode in a GraphSnapshot, ordered by index. Nodes are
+    created on first access and then reused.
+    """
+
+    def __init__(self, snapshot, metanode, identifiers, names):
+        self.snapshot = snapshot
+        self.metanode = metanode
+        self.identifiers = identifiers
+        self.names = names
+        self.identifier_to_index = {
+            identifier: index for index, identifier in enumerate(identifiers)
+        }
+        self.nodes = [None] * len(identifiers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        node = self.nodes[index]
+        if node is None:
+            index = range(len(self))[index]
+            node = SnapshotNode(
+                self.snapshot,
+                self.metanode,
+                index,
+                self.identifiers[index],
+                self.names[index],
+            )
+            self.nodes[index] = node
+        return node
+
+    def __len__(self):
+        return len(self.identifiers)
+
+
+class SnapshotNodeDict(collections.abc.Mapping):
+    """
+    Mapping of (metanode, node) identifiers to the nodes of a GraphSnapshot.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, node_id):
+        kind, identifier = node_id
+        metanode = self.snapshot.metagraph.node_dict.get(kind)
+        if metanode is None:
+            raise KeyError(node_id)
+        nodes = self.snapshot.metanode_to_nodes[metanode]
+        index = nodes.identifier_to_index.get(identifier)
+        if index is None:
+            raise KeyError(node_id)
+        return nodes[index]
+
+    def __iter__(self):
+        for metanode, nodes in self.snapshot.metanode_to_nodes.items():
+            for identifier in nodes.identifiers:
+                yield metanode.identifier, identifier
+
+    def __len__(self):
+        return self.snapshot.n_nodes
@@ -9,8 +9,8 @@ def get_degrees_for_metanode(graph, metanode):
     Return a dataframe that reports the degree of each metaedge for
     each node of kind metanode.
     """
-    metanode_to_nodes = graph.get_metanode_to_nodes()
-    nodes = metanode_to_nodes.get(metanode, [])
+    metanode = graph.metagraph.get_metanode(metanode)
+    nodes = graph.metanode_to_nodes[metanode]
     rows = list()
     for node in nodes:
         for metaedge, edges in node.edges.items():
@@ -0,0 +1,291 @@
+import array
+import collections.abc
+
+import hetnetpy.compiled
+from hetnetpy.hetnet import Edge, Node
+
+
+class GraphView:
+    def __init__(self, parent, metagraph, metanode_to_nodes, metanode_to_positions):
+        """
+        Read-only subgraph of parent, created by
+        Graph.get_subgraph(view=True). A view shares the data and masks of
+        the nodes and edges of parent, and reads adjacency from parent on
+        demand, dropping edges to nodes outside the view. Node and Edge
+        objects of the view are created on access and are equal to the
+        corresponding objects of parent. Adding or removing nodes or edges
+        of parent invalidates the view, after which accessing it raises an
+        AssertionError. Masking does not invalidate the view.
+
+        Parameters
+        ----------
+        parent : hetnetpy.hetnet.Graph
+            the graph being viewed
+        metagraph : hetnetpy.hetnet.MetaGraph
+            metagraph of the view, whose metanodes and metaedges are a subset
+            of those of parent
+        metanode_to_nodes : dict
+            retained nodes of parent by metanode of parent
+        metanode_to_positions : dict
+            list by metanode of parent mapping the index of each node of
+            parent to its position in the view, or None if it is not retained
+        """
+        self.parent = parent
+        self.metagraph = metagraph
+        self.data = parent.data
+        self.virtual_inverses = parent.virtual_inverses
+        self.metanode_to_nodes = dict()
+        self.metanode_to_positions = dict()
+        for metanode in metagraph.get_nodes():
+            parent_metanode = parent.metagraph.node_dict[metanode.identifier]
+            nodes = ViewNodes(self, metanode, metanode_to_nodes[parent_metanode])
+            self.metanode_to_nodes[metanode] = nodes
+            self.metanode_to_positions[metanode] = metanode_to_positions[
+                parent_metanode
+            ]
+        self.n_nodes = sum(len(nodes) for nodes in self.metanode_to_nodes.values())
+        self.metaedge_to_parent = {
+            metaedge: parent.metagraph.get_metaedge(metaedge.get_id())
+            for metaedge in metagraph.get_edges(exclude_inverts=False)
+        }
+        self.node_dict = ViewNodeDict(self)
+        self.structure_version = parent.state.structure_version
+        # Adjacency is filtered by the view, so traversals go through it
+        self.compiled = ViewAdjacency(self)
+
+    def check_valid(self):
+        """Assert that the parent has not changed since creating the view."""
+        assert (
+            self.structure_version == self.parent.state.structure_version
+        ), "view is invalid because nodes or edges of its parent have changed"
+
+    def get_node(self, node_id):
+        return self.node_dict[node_id]
+
+    def get_nodes(self):
+        self.check_valid()
+        for nodes in self.metanode_to_nodes.values():
+            yield from nodes
+
+    def get_edges(self, exclude_inverts=True):
+        """
+        Generate the edges of the view. exclude_inverts excludes inverted
+        edges, as in Graph.get_edges.
+        """
+        get_edges = self.compiled.get_edges
+        for metaedge in self.metagraph.get_edges(exclude_inverts=False):
+            for node in self.metanode_to_nodes[metaedge.source]:
+                for edge in get_edges(node, metaedge):
+                    if exclude_inverts and edge.inverted:
+                        continue
+                    yield edge
+
+    def __iter__(self):
+        return self.get_nodes()
+
+    def __contains__(self, node_id):
+        return node_id in self.node_dict
+
+    def count_nodes(self, metanode):
+        self.check_valid()
+        metanode = self.metagraph.get_metanode(metanode)
+        return len(self.metanode_to_nodes[metanode])
+
+    def any_masked(self):
+        return self.parent.any_masked()
+
+
+class ViewAdjacency:
+    def __init__(self, view):
+        """
+        Adjacency of a GraphView, stored as view.compiled, with the interface
+        of hetnetpy.compiled.CompiledGraph that hetnetpy.pathtools and
+        hetnetpy.matrix read from. CSR arrays are created on first access.
+        """
+        self.view = view
+        self.metaedge_to_csr = dict()
+
+    def get_nodes(self, metanode):
+        """Return the nodes of metanode, ordered by position."""
+        self.view.check_valid()
+        return self.view.metanode_to_nodes[metanode]
+
+    def get_edges(self, node, metaedge):
+        """Return a tuple of the edges of metaedge incident to node."""
+        view = self.view
+        view.check_valid()
+        parent_node = node.edges.parent_node
+        positions = view.metanode_to_positions[metaedge.target]
+        targets = view.metanode_to_nodes[metaedge.target]
+        edges = list()
+        for parent_edge in parent_node.edges[view.metaedge_to_parent[metaedge]]:
+            position = positions[parent_edge.target.index]
+            if position is None:
+                continue
+            edge = Edge(node, targets[position], metaedge, parent_edge._data)
+            edge.inverted = parent_edge.inverted
+            edge.index = parent_edge.index
+            edge.mask_table = parent_edge.mask_table
+            edges.append(edge)
+        return tuple(edges)
+
+    def get_degree(self, node, metaedge):
+        """Return the (unmasked) degree of node for metaedge."""
+        return self.get_csr(metaedge).get_degree(
+            self.view.metanode_to_positions[metaedge.source][node.index]
+        )
+
+    def get_csr(self, metaedge):
+        """
+        Return a CompiledMetaEdge for metaedge, whose rows and columns are
+        positions in view.metanode_to_nodes. Its edges are None.
+        """
+        view = self.view
+        view.check_valid()
+        csr = self.metaedge_to_csr.get(metaedge)
+        if csr is not None:
+            return csr
+        parent_metaedge = view.metaedge_to_parent[metaedge]
+        positions = view.metanode_to_positions[metaedge.target]
+        indptr = array.array("q", [0])
+        indices = array.array("q")
+        for node in view.metanode_to_nodes[metaedge.source].parent_nodes:
+            row = list()
+            for edge in node.edges[parent_metaedge]:
+                position = positions[edge.target.index]
+                if position is not None:
+                    row.append(position)
+            row.sort()
+            indices.extend(row)
+            indptr.append(len(indices))
+        csr = hetnetpy.compiled.CompiledMetaEdge(metaedge, indptr, indices, None)
+        self.metaedge_to_csr[metaedge] = csr
+        return csr
+
+
+class ViewNode(Node):
+    __slots__ = ()
+
+    def __init__(self, view, metanode, parent_node):
+        """
+        Node of a GraphView, sharing the identifier, data and mask of
+        parent_node. node.edges maps each metaedge of the view to a tuple of
+        incident edges, which are created on access.
+        """
+        self.identifier = parent_node.identifier
+        self.metanode = metanode
+        self.name = parent_node.name
+        self._id = parent_node._id
+        self.hash_ = parent_node.hash_
+        self._data = parent_node._data
+        self.index = parent_node.index
+        self.mask_table = parent_node.mask_table
+        self.degree_cache = None
+        self.edges = ViewIncidentEdges(view, self, parent_node)
+
+    def _get_compiled(self):
+        # The compiled graph of the parent does not cover the view's metaedges
+        return None
+
+    def get_degree(self, metaedge, exclude_masked=True):
+        """
+        Return the number of edges of the specified metaedge incident to self
+        in the view. Degrees are cached until the parent graph changes.
+        """
+        self.edges.view.check_valid()
+        state = self.mask_table.state
+        cache = self.degree_cache
+        if cache is None or cache[0] != state.version:
+            cache = self.degree_cache = state.version, dict()
+        degrees = cache[1]
+        key = metaedge, exclude_masked and state.n_masked > 0
+        degree = degrees.get(key)
+        if degree is None:
+            degree = 0
+            for edge in self.edges[metaedge]:
+                if key[1] and (edge.masked or edge.target.masked):
+                    continue
+                degree += 1
+            degrees[key] = degree
+        return degree
+
+
+class ViewIncidentEdges(collections.abc.Mapping):
+    """
+    Read-only mapping of metaedge to the edges incident to a ViewNode.
+    """
+
+    __slots__ = ("view", "node", "parent_node")
+
+    def __init__(self, view, node, parent_node):
+        self.view = view
+        self.node = node
+        self.parent_node = parent_node
+
+    def __getitem__(self, metaedge):
+        if metaedge not in self.node.metanode.edges:
+            raise KeyError(metaedge)
+        return self.view.compiled.get_edges(self.node, metaedge)
+
+    def __iter__(self):
+        return iter(self.node.metanode.edges)
+
+    def __len__(self):
+        return len(self.node.metanode.edges)
+
+
+class ViewNodes(collections.abc.Sequence):
+    """
+    Nodes of a metanode in a GraphView, ordered by position. Nodes are
+    created on first access and then reused.
+    """
+
+    def __init__(self, view, metanode, parent_nodes):
+        self.view = view
+        self.metanode = metanode
+        self.parent_nodes = parent_nodes
+        self.nodes = [None] * len(parent_nodes)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        self.view.check_valid()
+        node = self.nodes[position]
+        if node is None:
+            parent_node = self.parent_nodes[position]
+            node = ViewNode(self.view, self.metanode, parent_node)
+            self.nodes[position] = node
+        return node
+
+    def __len__(self):
+        return len(self.parent_nodes)
+
+
+class ViewNodeDict(collections.abc.Mapping):
+    """
+    Mapping of (metanode, node) identifiers to the nodes of a GraphView.
+    """
+
+    def __init__(self, view):
+        self.view = view
+
+    def __getitem__(self, node_id):
+        self.view.check_valid()
+        kind, identifier = node_id
+        metanode = self.view.metagraph.node_dict.get(kind)
+        if metanode is None:
+            raise KeyError(node_id)
+        parent_node = self.view.parent.node_dict[node_id]
+        position = self.view.metanode_to_positions[metanode][parent_node.index]
+        if position is None:
+            raise KeyError(node_id)
+        return self.view.metanode_to_nodes[metanode][position]
+
+    def __iter__(self):
+        self.view.check_valid()
+        for nodes in self.view.metanode_to_nodes.values():
+            for node in nodes.parent_nodes:
+                yield node.get_id()
+
+    def __len__(self):
+        return self.view.n_nodes
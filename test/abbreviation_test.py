@@ -1,4 +1,9 @@
+import pathlib
+
+import pytest
+
 import hetnetpy.abbreviation
+import hetnetpy.readwrite
 
 
 def test__get_duplicates():
@@ -38,3 +43,38 @@ def test__metaedges_from_metapath():
     for metapath in metapath_to_metaedge:
         result = hetnetpy.abbreviation.metaedges_from_metapath(metapath)
         assert result == metapath_to_metaedge[metapath]
+
+
+def test_metaedge_id_from_abbreviation():
+    """
+    Test that metaedge abbreviations resolve to their metaedges, including
+    inverses, and that unknown abbreviations raise a KeyError.
+    """
+    path = pathlib.Path(__file__).parent.joinpath("data/hetionet-v1.0-metagraph.json")
+    metagraph = hetnetpy.readwrite.read_metagraph(path)
+    for metaedge in metagraph.get_edges(exclude_inverts=False):
+        metaedge_id = hetnetpy.abbreviation.metaedge_id_from_abbreviation(
+            metagraph, metaedge.abbrev
+        )
+        assert metaedge_id == metaedge.get_id()
+        assert metagraph.get_metaedge(metaedge.abbrev) is metaedge
+    with pytest.raises(KeyError):
+        hetnetpy.abbreviation.metaedge_id_from_abbreviation(metagraph, "GxD")
+
+
+def test_metapath_abbreviation_cache():
+    """
+    Test that metapaths looked up by abbreviation are cached, evicting the
+    least recently used abbreviation.
+    """
+    path = pathlib.Path(__file__).parent.joinpath("data/hetionet-v1.0-metagraph.json")
+    metagraph = hetnetpy.readwrite.read_metagraph(path)
+    metagraph.metapath_cache_size = 2
+    metapath = metagraph.get_metapath("CbGpPWpGaD")
+    assert [edge.abbrev for edge in metapath] == ["CbG", "GpPW", "PWpG", "GaD"]
+    assert metagraph.get_metapath("CbGpPWpGaD") is metapath
+    assert metagraph.get_metapath("DaGpPWpGbC") is metapath.inverse
+    metagraph.get_metapath("CbGpPWpGaD")
+    metagraph.get_metapath("CtD")
+    assert list(metagraph.abbrev_to_metapath) == ["CbGpPWpGaD", "CtD"]
+    assert metagraph.get_metapath("DaGpPWpGbC") is metapath.inverse
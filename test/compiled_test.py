@@ -0,0 +1,111 @@
+import os
+
+import numpy
+import pytest
+
+import hetnetpy.compiled
+import hetnetpy.readwrite
+from hetnetpy.matrix import metaedge_to_adjacency_matrix
+from hetnetpy.pathtools import DWPC, paths_between
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_disease_gene_example_hetnet():
+    path = os.path.join(directory, "data", "disease-gene-example-graph.json")
+    return hetnetpy.readwrite.read_graph(path)
+
+
+def test_compiled_csr_matches_node_edges():
+    graph = get_disease_gene_example_hetnet()
+    compiled = graph.compile()
+    assert graph.compiled is compiled
+    for metaedge in graph.metagraph.get_edges(exclude_inverts=False):
+        csr = compiled.get_csr(metaedge)
+        source_nodes = compiled.get_nodes(metaedge.source)
+        target_nodes = compiled.get_nodes(metaedge.target)
+        assert len(csr.indptr) == len(source_nodes) + 1
+        for position, node in enumerate(source_nodes):
+            assert set(csr.get_edges(position)) == node.edges[metaedge]
+            assert csr.get_degree(position) == len(node.edges[metaedge])
+            targets = [target_nodes[i] for i in csr.get_targets(position)]
+            expected = sorted(edge.target.index for edge in node.edges[metaedge])
+            assert [target.index for target in targets] == expected
+
+
+def test_compiled_discarded_on_modification():
+    graph = get_disease_gene_example_hetnet()
+    graph.compile()
+    graph.add_edge(("Gene", "ITCH"), ("Gene", "STAT3"), "interaction", "both")
+    assert graph.compiled is None
+    graph.compile()
+    graph.add_node("Gene", "IL7R")
+    assert graph.compiled is None
+
+
+@pytest.mark.parametrize("metaedge", ["GiG", "GaD", "DlT", "TlD"])
+@pytest.mark.parametrize("dense_threshold", [0, 1])
+def test_compiled_adjacency_matrix(metaedge, dense_threshold):
+    graph = get_disease_gene_example_hetnet()
+    expected = metaedge_to_adjacency_matrix(
+        graph, metaedge, dtype=numpy.int64, dense_threshold=dense_threshold
+    )
+    graph.compile()
+    observed = metaedge_to_adjacency_matrix(
+        graph, metaedge, dtype=numpy.int64, dense_threshold=dense_threshold
+    )
+    assert observed[0] == expected[0]
+    assert observed[1] == expected[1]
+    assert type(observed[2]) is type(expected[2])
+    assert (observed[2] != expected[2]).sum() == 0
+
+
+@pytest.mark.parametrize("abbrev", ["GeTlD", "GiGaD", "GaDaG"])
+def test_compiled_paths_between(abbrev):
+    graph = get_disease_gene_example_hetnet()
+    metapath = graph.metagraph.metapath_from_abbrev(abbrev)
+    source_id = "Gene", "IRF1"
+    target_id = metapath.target().identifier, "Multiple Sclerosis"
+    if metapath.target().identifier == "Gene":
+        target_id = "Gene", "STAT3"
+    expected = paths_between(graph, source_id, target_id, metapath)
+    graph.compile()
+    observed = paths_between(graph, source_id, target_id, metapath)
+    assert set(observed) == set(expected)
+    assert DWPC(observed, 0.4) == pytest.approx(DWPC(expected, 0.4))
+
+
+@pytest.mark.parametrize("masked", [False, True])
+def test_compiled_node_edges(masked, monkeypatch):
+    """
+    Test that Node.get_edges and Node.get_degree read from the compiled graph.
+    """
+    graph = get_disease_gene_example_hetnet()
+    if masked:
+        graph.get_node(("Gene", "STAT3")).mask()
+    nodes = list(graph.get_nodes())
+    expected = {
+        (node, metaedge, exclude_masked): (
+            set(node.get_edges(metaedge, exclude_masked)),
+            node.get_degree(metaedge, exclude_masked),
+        )
+        for node in nodes
+        for metaedge in node.metanode.edges
+        for exclude_masked in (True, False)
+    }
+    compiled = graph.compile()
+    calls = list()
+    get_csr_edges = hetnetpy.compiled.CompiledMetaEdge.get_edges
+
+    def record_get_edges(csr, index):
+        calls.append(index)
+        return get_csr_edges(csr, index)
+
+    monkeypatch.setattr(
+        hetnetpy.compiled.CompiledMetaEdge, "get_edges", record_get_edges
+    )
+    for (node, metaedge, exclude_masked), (edges, degree) in expected.items():
+        assert node.get_edges(metaedge, exclude_masked) == edges
+        assert node.get_degree(metaedge, exclude_masked) == degree
+    assert calls
+    assert graph.state.compiled is compiled
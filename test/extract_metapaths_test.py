@@ -1,7 +1,9 @@
+import gc
 import pathlib
 
 import pytest
 
+import hetnetpy.hetnet
 import hetnetpy.readwrite
 
 
@@ -77,3 +79,94 @@ def test_extract_all_metapaths(max_length, exclude_inverts, n_metapaths):
     metagraph = get_hetionet_metagraph()
     metapaths = metagraph.extract_all_metapaths(max_length, exclude_inverts)
     assert len(metapaths) == n_metapaths
+    assert metapaths == sorted(metapaths)
+    if exclude_inverts:
+        metapath_set = set(metapaths)
+        for metapath in metapaths:
+            assert not metapath.inverse < metapath
+            assert metapath.is_symmetric() or metapath.inverse not in metapath_set
+
+
+@pytest.mark.parametrize("target", ["Disease", "Gene", None])
+@pytest.mark.parametrize("max_repeats", [None, 0, 1])
+@pytest.mark.parametrize(
+    "exclude_consecutive", [None, [("CrC", "CrC"), ("GaD", "DaG")]]
+)
+def test_iter_and_count_metapaths(target, max_repeats, exclude_consecutive):
+    """
+    Test that pruned metapath generation and counting match filtering all
+    metapaths.
+    """
+    metagraph = get_hetionet_metagraph()
+    all_metapaths = metagraph.extract_metapaths("Compound", target, max_length=3)
+    excluded = {
+        (metagraph.get_metaedge(first), metagraph.get_metaedge(second))
+        for first, second in exclude_consecutive or []
+    }
+    expected = list()
+    for metapath in all_metapaths:
+        metanodes = [metapath.source()] + [edge.target for edge in metapath]
+        if max_repeats is not None and any(
+            metanodes.count(metanode) > max_repeats + 1 for metanode in metanodes
+        ):
+            continue
+        if excluded & set(zip(metapath.edges, metapath.edges[1:])):
+            continue
+        expected.append(metapath)
+    kwargs = {
+        "target": target,
+        "max_length": 3,
+        "max_repeats": max_repeats,
+        "exclude_consecutive": exclude_consecutive,
+    }
+    metapaths = list(metagraph.iter_metapaths("Compound", **kwargs))
+    assert metapaths == expected
+    assert metagraph.count_metapaths("Compound", **kwargs) == len(expected)
+
+
+@pytest.mark.parametrize("max_size", [None, 0, 10])
+def test_metapath_registry(max_size):
+    """
+    Test that the metapath registry returns the same metapath for the same
+    metaedges while it is referenced, and only keeps unreferenced metapaths
+    up to max_size.
+    """
+    metagraph = get_hetionet_metagraph()
+    metagraph.path_dict = hetnetpy.hetnet.MetaPathRegistry(max_size)
+    metapaths = metagraph.extract_metapaths("Compound", "Disease", max_length=3)
+    n_metapaths = len(metagraph.path_dict)
+    for metapath in metapaths:
+        assert metagraph.get_metapath_from_edges(metapath.edges) is metapath
+        assert metagraph.get_metapath(str(metapath)) is metapath
+        assert metagraph.metapath_from_abbrev(metapath.abbrev) is metapath
+        assert metagraph.path_dict[metapath.inverse_edges()] is metapath.inverse
+    stats = metagraph.path_dict.get_stats()
+    assert stats["size"] == n_metapaths
+    assert stats["hits"] >= 3 * len(metapaths)
+    assert 0 < stats["hit_rate"] < 1
+
+    # Unreferenced metapaths beyond max_size are discarded
+    metapath = metapaths[-1]
+    edges = metapath.edges
+    del metapaths
+    gc.collect()
+    registry = metagraph.path_dict
+    if max_size is None:
+        assert len(registry) == n_metapaths
+    else:
+        # The abbreviation cache is bounded by the registry
+        cached = list(metagraph.abbrev_to_metapath.values())
+        assert len(cached) <= max_size
+        # Retained metapaths reference their inverses and suffixes
+        referenced = set()
+        stack = [metapath, *registry.recent.values(), *cached]
+        while stack:
+            retained = stack.pop()
+            if retained is None or retained.edges in referenced:
+                continue
+            referenced.add(retained.edges)
+            stack.extend([retained.inverse, retained.sub])
+        assert set(registry) == referenced
+        assert len(registry) < n_metapaths
+        assert registry.get_stats()["n_retained"] <= max_size
+    assert metagraph.get_metapath_from_edges(edges) is metapath
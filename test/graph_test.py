@@ -1,5 +1,7 @@
 import os
 import pathlib
+import pickle
+import sys
 
 import pytest
 
@@ -205,6 +207,23 @@ def get_hetionet_metagraph():
     return hetnetpy.readwrite.read_metagraph(path)
 
 
+def get_disease_gene_example_writable():
+    """
+    Return the writable of the disease gene example hetnet
+    """
+    path = pathlib.Path(__file__).parent / "data/disease-gene-example-graph.json"
+    return hetnetpy.readwrite.extract_writable(path)
+
+
+def get_disease_gene_example_hetnet(virtual_inverses=False):
+    """
+    Return the disease gene example hetnet
+    """
+    return hetnetpy.readwrite.graph_from_writable(
+        get_disease_gene_example_writable(), virtual_inverses=virtual_inverses
+    )
+
+
 @pytest.mark.parametrize(
     ["metapath", "symmetry"],
     [
@@ -233,3 +252,702 @@ def test_metapath_symmetry(metapath, symmetry):
         # Test only single metapath object is created
         # https://github.com/hetio/hetnetpy/issues/38
         assert metapath is metapath.inverse
+
+
+def test_slotted_elements():
+    """
+    Nodes, edges and paths use __slots__ rather than a per-instance __dict__.
+    """
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    source = graph.add_node("Gene", 3575, "IL7R")
+    target = graph.add_node("Gene", 6688, "SPI1")
+    edge, inverse = graph.add_edge(source, target, "regulates", "forward")
+    path = hetnetpy.hetnet.Path((edge,))
+    metapath = metagraph.get_metapath("Gr>G")
+    for element in source, edge, inverse, path, metapath, metapath[0]:
+        assert not hasattr(element, "__dict__")
+    with pytest.raises(AttributeError):
+        source.custom_attribute = True
+    # int_id is reserved for readwrite.writable_from_graph
+    hetnetpy.readwrite.writable_from_graph(graph, int_id=True)
+    assert (source.int_id, target.int_id) == (0, 1)
+    assert "metanode" in repr(source)
+
+
+def test_node_indexes():
+    """
+    Nodes receive dense integer indexes within their metanode.
+    """
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    genes = [graph.add_node("Gene", symbol) for symbol in ["IL7R", "SPI1", "CD4"]]
+    disease = graph.add_node("Disease", "DOID:2377", "multiple sclerosis")
+    assert [gene.index for gene in genes] == [0, 1, 2]
+    assert disease.index == 0
+    for gene in genes:
+        assert graph.get_node_by_index("Gene", gene.index) is gene
+        assert graph.get_node_index("G", gene.identifier) == gene.index
+    assert graph.get_node_index("Disease", "DOID:2377") == 0
+    with pytest.raises(KeyError):
+        graph.get_node_index("Gene", "DOID:2377")
+
+
+def test_bulk_add_nodes_and_edges():
+    """
+    Test columnar ingestion with Graph.add_nodes and Graph.add_edges.
+    """
+    numpy = pytest.importorskip("numpy")
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    genes = graph.add_nodes("Gene", numpy.array([1, 2, 3]), names=["A", None, "C"])
+    assert [gene.name for gene in genes] == ["A", 2, "C"]
+    graph.add_nodes("Disease", ["DOID:1", "DOID:2"], data={"n": [5, 6]})
+    assert graph.node_dict["Disease", "DOID:2"].data == {"n": 6}
+    assert graph.n_nodes == 5
+
+    with pytest.raises(AssertionError, match="node already exists"):
+        graph.add_nodes("Gene", [4, 3])
+    with pytest.raises(AssertionError, match="duplicate nodes"):
+        graph.add_nodes("Gene", [4, 4])
+
+    edges = graph.add_edges("GaD", [1, 1, 3], ["DOID:1", "DOID:2", "DOID:2"])
+    assert len(edges) == 3
+    assert graph.n_edges == graph.n_inverts == 3
+    assert graph.node_dict["Gene", 1].get_edges(metagraph.get_metaedge("GaD")) == set(
+        edges[:2]
+    )
+    graph.add_edges("GiG", [1, 2], [2, 2], data=[{"x": 1}, {"x": 2}])
+    assert graph.n_edges == 5
+    # self loop of a bidirectional metaedge has no separate inverse
+    assert graph.n_inverts == 4
+
+    # Bidirectional edges between the same metanode are unordered
+    with pytest.raises(AssertionError, match="edge already exists"):
+        graph.add_edges("GiG", [3, 2], [2, 1])
+    with pytest.raises(AssertionError, match="duplicate edges"):
+        graph.add_edges("GiG", [1, 3], [3, 1])
+    with pytest.raises(AssertionError, match="edge already exists"):
+        graph.add_edges("DaG", ["DOID:1"], [1])
+    # Directed metaedges distinguish orientation
+    graph.add_edges("Gr>G", [1, 2], [2, 1])
+    with pytest.raises(AssertionError, match="edge already exists"):
+        graph.add_edges("G<rG", [2], [1])
+    assert graph.n_edges == 7
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+@pytest.mark.parametrize("columnar_data", [False, True])
+def test_bulk_add_edges_matches_add_edge(virtual_inverses, columnar_data):
+    """
+    Test that Graph.add_edges creates the same graph as Graph.add_edge,
+    including inverted metaedges and self loops.
+    """
+    metagraph = get_hetionet_metagraph()
+    kwargs = {"virtual_inverses": virtual_inverses, "columnar_data": columnar_data}
+    graphs = [hetnetpy.hetnet.Graph(metagraph, **kwargs) for _ in range(2)]
+    batches = [
+        ("GiG", [1, 2, 3, 3], [2, 2, 1, 3]),
+        ("G<rG", [1, 2, 3], [2, 3, 3]),
+        ("DaG", ["DOID:1", "DOID:2"], [1, 1]),
+        ("GaD", [2], ["DOID:2"]),
+    ]
+    for graph in graphs:
+        graph.enable_change_log(100)
+        graph.add_nodes("Gene", [1, 2, 3])
+        graph.add_nodes("Disease", ["DOID:1", "DOID:2"])
+    bulk_graph, graph = graphs
+    for abbrev, source_ids, target_ids in batches:
+        metaedge = metagraph.get_metaedge(abbrev)
+        data = [{"i": i} for i in range(len(source_ids))]
+        edges = bulk_graph.add_edges(metaedge, source_ids, target_ids, data)
+        expected = [
+            graph.add_edge(
+                (metaedge.source.identifier, source_id),
+                (metaedge.target.identifier, target_id),
+                metaedge.kind,
+                metaedge.direction,
+                edge_data,
+            )[0]
+            for source_id, target_id, edge_data in zip(source_ids, target_ids, data)
+        ]
+        assert [edge.get_id() for edge in edges] == [edge.get_id() for edge in expected]
+        assert [edge.inverted for edge in edges] == [edge.inverted for edge in expected]
+        assert [edge.data for edge in edges] == data
+    assert bulk_graph.n_edges == graph.n_edges
+    assert bulk_graph.n_inverts == graph.n_inverts
+    assert bulk_graph.state.version == graph.state.version
+    assert [change for _, change, _ in bulk_graph.state.change_log] == [
+        change for _, change, _ in graph.state.change_log
+    ]
+    assert hetnetpy.readwrite.writable_from_graph(
+        bulk_graph
+    ) == hetnetpy.readwrite.writable_from_graph(graph)
+    for metaedge, edges in graph.metaedge_to_edges.items():
+        bulk_edges = bulk_graph.metaedge_to_edges[metaedge]
+        assert [edge.get_id() for edge in bulk_edges] == [
+            edge.get_id() for edge in edges
+        ]
+        assert [edge.index for edge in bulk_edges] == list(range(len(edges)))
+    for node_id, node in graph.node_dict.items():
+        bulk_node = bulk_graph.node_dict[node_id]
+        for metaedge, edges in node.edges.items():
+            assert bulk_node.edges[metaedge] == edges
+            assert bulk_node.get_degree(metaedge) == len(edges)
+            for edge in bulk_node.edges[metaedge]:
+                assert edge.inverse.inverse == edge
+                assert bulk_graph.get_edge(edge.get_id()) == edge
+                assert bulk_graph.has_edge(edge.source, edge.target, metaedge)
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_incremental_indexes(virtual_inverses):
+    """
+    Metanode to nodes and metaedge to edges indexes are maintained as nodes
+    and edges are added.
+    """
+    graph = get_disease_gene_example_hetnet(virtual_inverses=virtual_inverses)
+    graph.add_edge(("Gene", "STAT3"), ("Gene", "STAT3"), "interaction", "both")
+    graph.add_edge(
+        ("Tissue", "Lung"), ("Disease", "Crohn's Disease"), "localization", "both"
+    )
+    for exclude_inverts in True, False:
+        expected = {
+            metaedge: list() for metaedge in graph.metagraph.get_edges(exclude_inverts)
+        }
+        for edge in graph.get_edges(exclude_inverts):
+            expected[edge.metaedge].append(edge)
+        observed = graph.get_metaedge_to_edges(exclude_inverts)
+        assert list(observed) == list(expected)
+        for metaedge, edges in expected.items():
+            assert set(observed[metaedge]) == set(edges)
+            assert len(observed[metaedge]) == len(edges)
+    metanode_to_nodes = graph.get_metanode_to_nodes()
+    for metanode in graph.metagraph.get_nodes():
+        nodes = [node for node in graph.get_nodes() if node.metanode == metanode]
+        assert metanode_to_nodes[metanode] == nodes
+        assert graph.count_nodes(metanode) == len(nodes)
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_masking(virtual_inverses):
+    """
+    Node and edge masks are stored in per-metanode and per-metaedge tables and
+    Graph.unmask clears all of them at once.
+    """
+    from hetnetpy.pathtools import paths_from
+
+    graph = get_disease_gene_example_hetnet(virtual_inverses=virtual_inverses)
+    metapath = graph.metagraph.metapath_from_abbrev("GaD")
+    source = graph.get_node(("Gene", "IRF1"))
+    n_paths = len(paths_from(graph, source, metapath, masked=False))
+    assert not graph.any_masked()
+
+    edge = min(source.edges[metapath[0]])
+    edge.mask()
+    assert edge.is_masked()
+    assert not edge.inverse.is_masked()
+    assert graph.any_masked()
+    assert edge not in source.get_edges(edge.metaedge)
+    assert edge in source.get_edges(edge.metaedge, exclude_masked=False)
+    assert len(paths_from(graph, source, metapath, masked=False)) == n_paths - 1
+    assert len(paths_from(graph, source, metapath)) == n_paths
+
+    node = edge.target
+    node.mask()
+    assert node.is_masked()
+    assert graph.state.n_masked == 2
+    assert graph.metanode_to_mask_table[node.metanode].get_masked_indexes() == [
+        node.index
+    ]
+
+    graph.unmask()
+    assert not graph.any_masked()
+    assert not node.is_masked()
+    assert not edge.is_masked()
+    assert len(paths_from(graph, source, metapath, masked=False)) == n_paths
+
+    # Tables from an earlier generation are reset when masked again
+    edge.inverse.mask()
+    assert edge.inverse.is_masked()
+    assert not edge.is_masked()
+    assert not node.is_masked()
+    edge.inverse.unmask()
+    assert not graph.any_masked()
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_has_edge(virtual_inverses):
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph, virtual_inverses=virtual_inverses)
+    graph.add_nodes("Gene", [1, 2, 3])
+    graph.add_nodes("Disease", ["DOID:1"])
+    graph.add_edge(("Gene", 1), ("Disease", "DOID:1"), "associates", "both")
+    graph.add_edge(("Gene", 2), ("Gene", 1), "interacts", "both")
+    graph.add_edge(("Gene", 3), ("Gene", 2), "regulates", "backward")
+    gene_1 = graph.get_node(("Gene", 1))
+    assert graph.has_edge(gene_1, ("Disease", "DOID:1"), "GaD")
+    assert graph.has_edge(("Disease", "DOID:1"), gene_1, "DaG")
+    assert not graph.has_edge(("Gene", 2), ("Disease", "DOID:1"), "GaD")
+    # Bidirectional metaedges between a metanode and itself are unordered
+    assert graph.has_edge(gene_1, ("Gene", 2), "GiG")
+    assert graph.has_edge(("Gene", 2), gene_1, "GiG")
+    assert not graph.has_edge(gene_1, ("Gene", 3), "GiG")
+    # Directed metaedges are not
+    assert graph.has_edge(("Gene", 2), ("Gene", 3), "Gr>G")
+    assert graph.has_edge(("Gene", 3), ("Gene", 2), "G<rG")
+    assert not graph.has_edge(("Gene", 3), ("Gene", 2), "Gr>G")
+    # Metanodes that do not match the metaedge
+    assert not graph.has_edge(gene_1, ("Disease", "DOID:1"), "GiG")
+    # Nodes that are not in the graph
+    assert not graph.has_edge(gene_1, ("Gene", "nope"), "GiG")
+    assert not graph.has_edge(("Gene", "nope"), gene_1, "GiG")
+    with pytest.raises(AssertionError, match="edge already exists"):
+        graph.add_edge(gene_1, ("Gene", 2), "interacts", "both")
+    with pytest.raises(AssertionError, match="edge already exists"):
+        graph.add_edge(("Gene", 2), ("Gene", 3), "regulates", "forward")
+
+
+def check_graph_indexes(graph):
+    """
+    Assert that the derived indexes of graph are consistent with node_dict
+    and edge_dict.
+    """
+    assert graph.n_nodes == len(graph.node_dict)
+    for metanode, nodes in graph.metanode_to_nodes.items():
+        identifier_index = graph.metanode_to_identifier_index[metanode]
+        assert len(identifier_index) == len(nodes)
+        for index, node in enumerate(nodes):
+            assert node.index == index
+            assert identifier_index[node.identifier] == index
+            assert graph.node_dict[node.get_id()] is node
+        if graph.columnar_data:
+            assert len(graph.metanode_to_properties[metanode]) == len(nodes)
+    n_edges = 0
+    for metaedge, edges in graph.metaedge_to_edges.items():
+        assert len(graph.edge_key_index[metaedge]) == len(edges)
+        n_edges += len(edges)
+        for index, edge in enumerate(edges):
+            assert edge.index == index
+            assert edge.inverse.index == index
+            assert graph.has_edge(edge.source, edge.target, metaedge)
+            assert graph.get_edge(edge.get_id()) == edge
+            assert edge in edge.source.edges[metaedge]
+            assert edge.inverse in edge.target.edges[metaedge.inverse]
+        if graph.columnar_data:
+            assert len(graph.metaedge_to_properties[metaedge]) == len(edges)
+    assert graph.n_edges == n_edges
+    assert len(list(graph.get_edges(exclude_inverts=False))) == (
+        graph.n_edges + graph.n_inverts
+    )
+
+
+@pytest.mark.parametrize("columnar_data", [False, True])
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_remove_edge_and_node(virtual_inverses, columnar_data):
+    writable = get_disease_gene_example_writable()
+    for i, node in enumerate(writable["nodes"]):
+        node["data"] = {"i": i}
+    for i, edge in enumerate(writable["edges"]):
+        edge["data"] = {"i": i}
+    graph = hetnetpy.readwrite.graph_from_writable(
+        writable, virtual_inverses=virtual_inverses, columnar_data=columnar_data
+    )
+    graph.add_edge(("Gene", "STAT3"), ("Gene", "STAT3"), "interaction", "both")
+    check_graph_indexes(graph)
+    data = {edge.get_id(): dict(edge.data) for edge in graph.get_edges()}
+
+    # Remove an edge through its inverse, keeping a masked edge that moves
+    gad = graph.metagraph.get_metaedge("GaD")
+    removed, moved = graph.metaedge_to_edges[gad][0], graph.metaedge_to_edges[gad][-1]
+    moved.mask()
+    graph.remove_edge(removed.inverse.get_id())
+    assert moved.index == 0 and moved.masked and not moved.inverse.masked
+    assert graph.state.n_masked == 1
+    assert not graph.has_edge(removed.source, removed.target, gad)
+    with pytest.raises(KeyError, match="edge does not exist"):
+        graph.remove_edge(removed)
+    # Equal elements of another graph are not removed
+    copy = graph.get_subgraph()
+    n_edges = graph.n_edges
+    with pytest.raises(KeyError, match="edge does not exist"):
+        graph.remove_edge(next(copy.get_edges()))
+    with pytest.raises(KeyError, match="node does not exist"):
+        graph.remove_node(copy.get_node(("Gene", "IRF1")))
+    assert graph.n_edges == n_edges
+    check_graph_indexes(graph)
+
+    # Remove a self loop and a node with a moved replacement
+    graph.remove_edge(
+        graph.get_edge((("Gene", "STAT3"), ("Gene", "STAT3"), "interaction", "both"))
+    )
+    node = graph.get_node(("Gene", "IRF1"))
+    moved_node = graph.metanode_to_nodes[node.metanode][-1]
+    moved_node.mask()
+    graph.enable_change_log()
+    version = graph.version
+    graph.remove_node(node)
+    assert ("Gene", "IRF1") not in graph
+    assert moved_node.index == node.index and moved_node.masked
+    # Index moves are reported in the change log
+    changes = graph.get_changes(version)
+    assert changes[-2:] == [
+        (graph.version - 1, "remove_node", node),
+        (graph.version, "move_node", moved_node),
+    ]
+    assert {change for _, change, _ in changes} == {
+        "remove_edge",
+        "move_edge",
+        "remove_node",
+        "move_node",
+    }
+    graph.enable_change_log(None)
+    assert not any(
+        edge.source == node for edge in graph.get_edges(exclude_inverts=False)
+    )
+    check_graph_indexes(graph)
+    for edge in graph.get_edges():
+        assert edge.data == data[edge.get_id()]
+
+    # Removed elements keep their data and are no longer masked
+    assert removed.data == data[removed.get_id()]
+    assert not removed.masked
+
+    # The graph matches one created without the removed elements
+    expected = hetnetpy.readwrite.writable_from_graph(graph)
+    graph.unmask()
+    graph.add_node("Gene", "IRF1")
+    graph.add_edge(
+        removed.source.get_id(), removed.target.get_id(), "association", "both"
+    )
+    check_graph_indexes(graph)
+    graph.remove_node(("Gene", "IRF1"))
+    observed = hetnetpy.readwrite.writable_from_graph(graph)
+    assert sorted(map(str, observed["edges"])) == sorted(map(str, expected["edges"]))
+
+
+def test_version_and_change_log():
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph)
+    assert graph.version == 0
+    graph.add_nodes("Gene", [1, 2])
+    assert graph.version == 2
+    assert graph.get_changes(2) == []
+    assert graph.get_changes(0) is None
+
+    graph.enable_change_log(maxlen=4)
+    version = graph.version
+    edge, _ = graph.add_edge(("Gene", 1), ("Gene", 2), "interacts", "both")
+    edge.inverse.mask()
+    edge.inverse.mask()  # already masked, so not a change
+    graph.unmask()
+    assert graph.version == version + 3
+    assert graph.get_changes(version) == [
+        (version + 1, "add_edge", edge),
+        (version + 2, "mask", edge.inverse),
+        (version + 3, "unmask_all", None),
+    ]
+    assert graph.get_changes(version + 2) == [(version + 3, "unmask_all", None)]
+
+    node = graph.get_node(("Gene", 1))
+    graph.remove_node(node)
+    assert graph.get_changes(version + 2) == [
+        (version + 3, "unmask_all", None),
+        (version + 4, "remove_edge", edge),
+        (version + 5, "remove_node", node),
+        (version + 6, "move_node", graph.get_node(("Gene", 2))),
+    ]
+    # The oldest changes have been discarded
+    assert graph.get_changes(version) is None
+    graph.enable_change_log(None)
+    assert graph.get_changes(version + 2) is None
+    assert graph.get_changes(graph.version) == []
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_union(virtual_inverses):
+    writable = get_disease_gene_example_writable()
+    for i, edge in enumerate(writable["edges"]):
+        edge["data"] = {"i": i}
+    graph = hetnetpy.readwrite.graph_from_writable(
+        writable, virtual_inverses=virtual_inverses
+    )
+    # Split graph into overlapping parts, one with a reversed metaedge
+    get_metaedge = graph.metagraph.get_metaedge
+    parts = [
+        graph.get_subgraph(metaedges=[get_metaedge("GiG"), get_metaedge("GaD")]),
+        graph.get_subgraph(metaedges=[get_metaedge("DaG"), get_metaedge("TlD")]),
+        graph.get_subgraph(metaedges=[get_metaedge("GeT")]),
+    ]
+    for part in parts:
+        for edge in part.get_edges():
+            edge.data["i"] = graph.get_edge(edge.get_id()).data["i"]
+    reversed_part = hetnetpy.readwrite.writable_from_graph(parts[1])
+    reversed_part["metaedge_tuples"] = [
+        ["Disease", "Gene", "association", "both"]
+        if kind == "association"
+        else [source, target, kind, direction]
+        for source, target, kind, direction in reversed_part["metaedge_tuples"]
+    ]
+    for edge in reversed_part["edges"]:
+        if edge["kind"] == "association":
+            edge["source_id"], edge["target_id"] = edge["target_id"], edge["source_id"]
+    parts[1] = hetnetpy.readwrite.graph_from_writable(reversed_part)
+    assert parts[1].metagraph.get_metaedge("DaG").inverted is False
+    union = hetnetpy.hetnet.Graph.union(parts, on_conflict="first")
+    check_graph_indexes(union)
+    assert union.virtual_inverses == virtual_inverses
+    assert union.metagraph == graph.metagraph
+    assert union.metagraph.kind_to_abbrev == graph.metagraph.kind_to_abbrev
+    assert union == graph
+    for edge in graph.get_edges(exclude_inverts=False):
+        assert union.get_edge(edge.get_id()).data == edge.data
+
+    # Duplicate nodes and edges
+    with pytest.raises(AssertionError, match="multiple graphs"):
+        parts[0].merge(parts[1])
+    other = parts[0].get_subgraph()
+    other.get_node(("Gene", "IRF1")).data["symbol"] = "IRF-1"
+    for edge in other.get_edges():
+        edge.data = {"i": -1}
+    with pytest.raises(AssertionError, match="multiple graphs"):
+        parts[0].merge(other)
+    first = parts[0].merge(other, on_conflict="first")
+    assert first == parts[0]
+    assert first.n_edges == parts[0].n_edges
+    assert "symbol" not in first.get_node(("Gene", "IRF1")).data
+    last = parts[0].merge(other, on_conflict="last")
+    assert last.get_node(("Gene", "IRF1")).data["symbol"] == "IRF-1"
+    assert {edge.data["i"] for edge in last.get_edges()} == {-1}
+    update = other.merge(parts[0], on_conflict="update")
+    assert update.get_node(("Gene", "IRF1")).data["symbol"] == "IRF-1"
+    assert {edge.data["i"] for edge in update.get_edges()} != {-1}
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+@pytest.mark.parametrize("columnar_data", [False, True])
+def test_pickle(virtual_inverses, columnar_data):
+    writable = get_disease_gene_example_writable()
+    for i, edge in enumerate(writable["edges"]):
+        edge["data"] = {"i": i, "source": "ab"[i % 2]}
+    graph = hetnetpy.readwrite.graph_from_writable(
+        writable, virtual_inverses=virtual_inverses, columnar_data=columnar_data
+    )
+    graph.get_node(("Gene", "IRF1")).mask()
+    masked_edge = next(graph.get_edges()).inverse
+    masked_edge.mask()
+    graph.compile()
+    graph.metagraph.metapath_cache_size = 5
+    graph.metagraph.path_dict = hetnetpy.hetnet.MetaPathRegistry(10)
+
+    unpickled = pickle.loads(pickle.dumps(graph))
+    check_graph_indexes(unpickled)
+    assert unpickled.metagraph.metapath_cache_size == 5
+    assert unpickled.metagraph.path_dict.max_size == 10
+    assert unpickled.virtual_inverses == virtual_inverses
+    assert unpickled.columnar_data == columnar_data
+    assert unpickled.compiled is None
+    assert unpickled.metagraph.kind_to_abbrev == graph.metagraph.kind_to_abbrev
+    expected = hetnetpy.readwrite.writable_from_graph(graph)
+    observed = hetnetpy.readwrite.writable_from_graph(unpickled)
+    for key in "nodes", "edges":
+        assert sorted(map(str, observed[key])) == sorted(map(str, expected[key]))
+    for metanode, nodes in graph.metanode_to_nodes.items():
+        assert [node.get_id() for node in nodes] == [
+            node.get_id() for node in unpickled.metanode_to_nodes[metanode]
+        ]
+    assert unpickled.get_node(("Gene", "IRF1")).masked
+    unpickled_edge = unpickled.get_edge(masked_edge.get_id())
+    assert unpickled_edge.masked
+    assert not unpickled_edge.inverse.masked
+    if columnar_data:
+        assert unpickled.filter_edges("GaD", "source", "a") == graph.filter_edges(
+            "GaD", "source", "a"
+        )
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+@pytest.mark.parametrize("columnar_data", [False, True])
+def test_memory_usage(virtual_inverses, columnar_data):
+    writable = get_disease_gene_example_writable()
+    for i, edge in enumerate(writable["edges"]):
+        edge["data"] = {"i": i * 0.5, "source": "ab"[i % 2]}
+    kwargs = {"virtual_inverses": virtual_inverses, "columnar_data": columnar_data}
+    graph = hetnetpy.readwrite.graph_from_writable(writable, **kwargs)
+
+    usage = graph.memory_usage()
+    shallow = graph.memory_usage(deep=False)
+    assert usage.keys() == shallow.keys()
+    assert all(usage[key] >= shallow[key] >= 0 for key in usage)
+
+    # Every metanode and metaedge orientation has its components
+    metagraph = graph.metagraph
+    keys = {
+        (structure, None)
+        for structure in [
+            "node_dict",
+            "edge_dict",
+            "indexes",
+            "masks",
+            "compiled",
+            "change_log",
+            "path_dict",
+        ]
+    }
+    for kind in metagraph.node_dict:
+        keys.update([("nodes", kind), ("node_data", kind)])
+    for metaedge in metagraph.get_edges(exclude_inverts=False):
+        keys.update([("node_edges", metaedge.abbrev), ("edges", metaedge.abbrev)])
+    for metaedge in metagraph.get_edges(exclude_inverts=True):
+        keys.add(("edge_data", metaedge.abbrev))
+    assert usage.keys() == keys
+
+    # Each node and stored edge is counted once
+    for metanode, nodes in graph.metanode_to_nodes.items():
+        node_size = sys.getsizeof(nodes[0])
+        assert usage["nodes", metanode.identifier] > len(nodes) * node_size
+    edge_size = sys.getsizeof(next(graph.get_edges()))
+    n_stored_edges = graph.n_edges
+    if not virtual_inverses:
+        n_stored_edges += graph.n_inverts
+    edges_size = sum(
+        size for (structure, _), size in usage.items() if structure == "edges"
+    )
+    assert edges_size == n_stored_edges * edge_size + sum(
+        map(sys.getsizeof, graph.metaedge_to_edges.values())
+    )
+    assert usage["nodes", "Gene"] > usage["nodes", "Tissue"] > 0
+    assert usage["edge_data", "GaD"] > 0
+    assert ("edge_data", "DaG") not in usage
+    if virtual_inverses:
+        assert usage["edges", "DaG"] == 0
+    else:
+        assert usage["edges", "DaG"] > 0
+
+
+def test_node_and_edge_hashes():
+    graph = get_disease_gene_example_hetnet()
+    copy = graph.get_subgraph()
+    view = graph.get_subgraph(view=True)
+    for node in graph.get_nodes():
+        assert hash(node) == hash(node.get_id())
+        assert node == copy.get_node(node.get_id())
+        assert node == view.get_node(node.get_id())
+        assert node != node.metanode
+        assert node != node.get_id()
+    for edge in graph.get_edges(exclude_inverts=False):
+        assert hash(edge) == hash(edge.get_id())
+        assert edge == copy.get_edge(edge.get_id())
+        assert edge != edge.metaedge
+        if edge.inverse is not edge:
+            assert edge != edge.inverse
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_lazy_incident_edges(virtual_inverses):
+    metagraph = get_hetionet_metagraph()
+    graph = hetnetpy.hetnet.Graph(metagraph, virtual_inverses=virtual_inverses)
+    gene_1, gene_2 = graph.add_nodes("Gene", [1, 2])
+    (disease,) = graph.add_nodes("Disease", ["DOID:1"])
+    gad = metagraph.get_metaedge("GaD")
+    gig = metagraph.get_metaedge("GiG")
+    # No sets are stored until edges are added
+    assert dict.__len__(gene_1.edges) == 0
+    assert len(gene_1.edges) == len(gene_1.metanode.edges)
+    assert set(gene_1.edges) == gene_1.metanode.edges
+    assert gene_1.edges[gad] == set()
+    assert gene_1.get_edges(gad) == set()
+    assert gene_1.get_degree(gad) == 0
+    assert gad in gene_1.edges
+    assert gad.inverse not in gene_1.edges
+    with pytest.raises(KeyError):
+        gene_1.edges[gad.inverse]
+    assert gene_1.edges.get(gad.inverse) is None
+
+    edge, inverse = graph.add_edge(gene_1, disease, "associates", "both")
+    graph.add_edge(gene_2, gene_1, "interacts", "both")
+    assert dict.__len__(gene_1.edges) == 2
+    assert dict.__len__(disease.edges) == 1
+    assert gene_1.edges[gad] == {edge}
+    assert disease.edges[gad.inverse] == {inverse}
+    assert len(gene_1.edges[gig]) == 1
+    assert dict(gene_1.edges.items())[gad] == {edge}
+    assert sum(map(len, gene_1.edges.values())) == 2
+
+
+def test_estimate_metapath_cost():
+    """
+    Test that metapath cost estimates are exact for metapaths of up to two
+    metaedges and are recomputed after masking.
+    """
+    graph = get_disease_gene_example_hetnet()
+    # Walk counts from the adjacency matrices of the example graph
+    estimate = graph.estimate_metapath_cost("GaDaG")
+    assert estimate["n_sources"] == 7
+    assert estimate["n_targets"] == 7
+    assert estimate["n_walks"] == [6, 20]
+    assert estimate["n_paths"] == 20
+    assert estimate["cost"] == 26
+    assert 0 < estimate["density"] < 1
+    assert estimate["engine"] == "traversal"
+    estimate = graph.estimate_metapath_cost("GiGaD")
+    assert estimate["n_walks"] == [10, 8]
+    assert estimate["split_index"] == 2
+
+    # Estimates of longer metapaths are positive and inverses agree
+    estimate = graph.estimate_metapath_cost("GiGiGaD")
+    inverse_estimate = graph.estimate_metapath_cost("DaGiGiG")
+    assert estimate["n_paths"] == pytest.approx(inverse_estimate["n_paths"])
+    assert estimate["n_paths"] > 0
+
+    # Masked sources are excluded
+    gad = graph.metagraph.get_metaedge("GaD")
+    source = graph.get_node(("Gene", "IRF1"))
+    degree = source.get_degree(gad)
+    source.masked = True
+    estimate = graph.estimate_metapath_cost("GaDaG")
+    assert estimate["n_walks"][0] == 6 - degree
+    graph.unmask()
+
+    # Masked edges are excluded
+    graph.get_node(("Disease", "Crohn's Disease")).masked = True
+    graph.get_node(("Disease", "Multiple Sclerosis")).masked = True
+    estimate = graph.estimate_metapath_cost("GaDaG")
+    assert estimate["n_paths"] == 0
+    assert estimate["density"] == 0
+
+
+@pytest.mark.parametrize("metapath_registry_size", [None, 10])
+def test_metagraph_pickle(metapath_registry_size):
+    """
+    Test that metagraphs, metanodes and metapaths survive a pickle round trip.
+    """
+    metagraph = get_hetionet_metagraph()
+    metagraph.path_dict = hetnetpy.hetnet.MetaPathRegistry(metapath_registry_size)
+    metapaths = metagraph.extract_metapaths("Compound", "Disease", max_length=2)
+    metagraph.get_metanode("Gene").masked = True
+    unpickled = pickle.loads(pickle.dumps(metagraph))
+    assert unpickled.node_dict.keys() == metagraph.node_dict.keys()
+    assert unpickled.edge_dict.keys() == metagraph.edge_dict.keys()
+    for metaedge in unpickled.get_edges(exclude_inverts=False):
+        assert unpickled.edge_dict[metaedge.get_id()] is metaedge
+        assert metaedge in metaedge.source.edges
+        assert metaedge.inverse.inverse is metaedge
+        assert unpickled.get_metaedge(metaedge.abbrev) is metaedge
+    assert unpickled.get_metanode("Gene").masked
+    assert not unpickled.get_metanode("Disease").masked
+    assert unpickled.path_dict.max_size == metapath_registry_size
+    for metapath in metapaths:
+        unpickled_metapath = unpickled.get_metapath(str(metapath))
+        assert unpickled_metapath == metapath
+        assert unpickled_metapath.inverse.inverse is unpickled_metapath
+    assert unpickled.extract_metapaths("Compound", "Disease", max_length=2) == [
+        unpickled.get_metapath(str(metapath)) for metapath in metapaths
+    ]
+
+    # Metanodes pickle with their metaedges
+    metanode = pickle.loads(pickle.dumps(metagraph.get_metanode("Compound")))
+    assert metanode == metagraph.get_metanode("Compound")
+    assert {metaedge.abbrev for metaedge in metanode.edges} == {
+        metaedge.abbrev for metaedge in metagraph.get_metanode("Compound").edges
+    }
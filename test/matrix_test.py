@@ -4,8 +4,13 @@ import numpy
 import pytest
 import scipy.sparse
 
+import hetnetpy.matrix
 import hetnetpy.readwrite
-from hetnetpy.matrix import metaedge_to_adjacency_matrix, sparsify_or_densify
+from hetnetpy.matrix import (
+    metaedge_to_adjacency_matrix,
+    prune_metapaths,
+    sparsify_or_densify,
+)
 
 directory = os.path.dirname(os.path.abspath(__file__))
 
@@ -86,3 +91,75 @@ def test_sparsify_or_densify(array, dense_threshold, expect_sparse):
     array = scipy.sparse.csc_matrix(array)
     output = sparsify_or_densify(array, dense_threshold)
     assert scipy.sparse.issparse(output) == expect_sparse
+
+
+@pytest.mark.parametrize("max_chunk_words", [1, 2**24])
+def test_prune_metapaths(max_chunk_words):
+    """
+    Test that prune_metapaths counts the pairs connected by each metapath,
+    as computed from products of adjacency matrices, and drops metapaths
+    without connected pairs.
+    """
+    path = os.path.join(directory, "data", "random-subgraph.json.xz")
+    graph = hetnetpy.readwrite.read_graph(path)
+    metapaths = graph.metagraph.extract_all_metapaths(3)
+    metapath_to_pairs = prune_metapaths(
+        graph, metapaths, max_chunk_words=max_chunk_words
+    )
+    # Products of adjacency matrices by metapath prefix
+    edges_to_product = dict()
+    for metaedge in graph.metagraph.get_edges(exclude_inverts=False):
+        _, _, adjacency_matrix = metaedge_to_adjacency_matrix(
+            graph, metaedge, dtype=numpy.int64, dense_threshold=2
+        )
+        edges_to_product[(metaedge,)] = adjacency_matrix
+    n_retained = 0
+    for metapath in metapaths:
+        edges = metapath.edges
+        for i in range(2, len(edges) + 1):
+            if edges[:i] not in edges_to_product:
+                edges_to_product[edges[:i]] = (
+                    edges_to_product[edges[: i - 1]]
+                    @ edges_to_product[edges[i - 1 : i]]
+                )
+        product = edges_to_product[edges]
+        n_pairs = product.count_nonzero()
+        if n_pairs:
+            n_retained += 1
+            assert metapath_to_pairs[metapath] == n_pairs
+        else:
+            assert metapath not in metapath_to_pairs
+    assert 0 < n_retained < len(metapaths)
+    assert list(metapath_to_pairs) == [m for m in metapaths if m in metapath_to_pairs]
+
+    # Test abbreviations and min_pairs
+    abbrevs = [str(metapath) for metapath in metapath_to_pairs]
+    min_pairs = sorted(metapath_to_pairs.values())[len(abbrevs) // 2]
+    retained = prune_metapaths(graph, abbrevs, min_pairs=min_pairs)
+    assert retained == {
+        metapath: n_pairs
+        for metapath, n_pairs in metapath_to_pairs.items()
+        if n_pairs >= min_pairs
+    }
+
+
+def test_prune_metapaths_reuses_prefixes(monkeypatch):
+    """
+    Test that prune_metapaths extends each shared prefix once, including
+    prefixes shared by metapaths of different lengths.
+    """
+    path = os.path.join(directory, "data", "disease-gene-example-graph.json")
+    graph = hetnetpy.readwrite.read_graph(path)
+    extended = list()
+    extend_reach = hetnetpy.matrix._extend_reach
+
+    def record_extend_reach(reach, transpose, max_chunk_words):
+        extended.append(transpose)
+        return extend_reach(reach, transpose, max_chunk_words)
+
+    monkeypatch.setattr(hetnetpy.matrix, "_extend_reach", record_extend_reach)
+    abbrevs = ["GaDaG", "GiG", "GaD", "GaDlT"]
+    metapath_to_pairs = prune_metapaths(graph, abbrevs)
+    assert [str(metapath) for metapath in metapath_to_pairs] == abbrevs
+    # One extension each by GaD, DaG, DlT and GiG
+    assert len(extended) == 4
@@ -94,3 +94,44 @@ def test_bupropion_CbGpPWpGaD_traversal():
       count(path) AS PC,
       sum(reduce(pdp = 1.0, d in degrees| pdp * d ^ -0.4)) AS DWPC
     """
+
+
+def test_masked_degree_cache():
+    """
+    Node.get_degree reflects mask and edge changes and path_degree_product
+    matches degrees computed from edge sets.
+    """
+    path = os.path.join(directory, "data", "disease-gene-example-graph.json")
+    graph = hetnetpy.readwrite.read_graph(path)
+    metaedge = graph.metagraph.get_metaedge("GiG")
+    node = graph.get_node(("Gene", "IRF1"))
+    metapath = graph.metagraph.metapath_from_abbrev("GiGaD")
+    paths = paths_between(graph, node, ("Disease", "Multiple Sclerosis"), metapath)
+
+    def check_degrees():
+        for gene in graph.metanode_to_nodes[metaedge.source]:
+            for exclude_masked in True, False:
+                edges = gene.get_edges(metaedge, exclude_masked)
+                assert gene.get_degree(metaedge, exclude_masked) == len(edges)
+        # exclude_edges computes degrees from edge sets, bypassing the cache
+        expected = DWPC(paths, 0.5, exclude_edges={None})
+        assert DWPC(paths, 0.5) == pytest.approx(expected)
+
+    check_degrees()
+    edge = min(node.edges[metaedge])
+    edge.mask()
+    check_degrees()
+    edge.target.mask()
+    check_degrees()
+    neighbors = {edge.target for edge in node.edges[metaedge]}
+    other = next(
+        gene
+        for gene in graph.metanode_to_nodes[metaedge.source]
+        if gene not in neighbors and gene != node
+    )
+    graph.add_edge(node, other, "interaction", "both")
+    check_degrees()
+    edge.unmask()
+    check_degrees()
+    graph.unmask()
+    check_degrees()
@@ -1,6 +1,10 @@
+import collections
+import pathlib
+
 import pytest
 
 import hetnetpy.permute
+import hetnetpy.readwrite
 
 
 @pytest.mark.parametrize(
@@ -19,3 +23,25 @@ def test_permute_inplace(edges, inplace):
         assert edges == new_edges
     else:
         assert edges != new_edges
+
+
+def test_permute_graph_preserves_degree():
+    directory = pathlib.Path(__file__).parent
+    path = directory.joinpath("data", "random-subgraph.json.xz")
+    graph = hetnetpy.readwrite.read_graph(path)
+    permuted_graph, stats = hetnetpy.permute.permute_graph(graph, seed=1)
+    assert permuted_graph.n_edges == graph.n_edges
+    metaedge_to_edges = graph.get_metaedge_to_edges(exclude_inverts=True)
+    permuted_metaedge_to_edges = permuted_graph.get_metaedge_to_edges(
+        exclude_inverts=True
+    )
+    for metaedge, edges in metaedge_to_edges.items():
+        permuted_edges = permuted_metaedge_to_edges[metaedge]
+        for attribute in "source", "target":
+            degrees = collections.Counter(
+                getattr(edge, attribute).get_id() for edge in edges
+            )
+            permuted_degrees = collections.Counter(
+                getattr(edge, attribute).get_id() for edge in permuted_edges
+            )
+            assert degrees == permuted_degrees
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+from hetnetpy.properties import PropertyStore
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_property_store_columns():
+    store = PropertyStore()
+    rows = [
+        {"source": "a", "affinity": 1.5, "n": 2, "unbiased": True},
+        {"source": "b", "n": 2**70, "unbiased": False, "pmids": [1, 2]},
+        {},
+        {"source": "a", "affinity": 0.5, "n": 3, "unbiased": True},
+    ]
+    for data in rows:
+        store.append(data)
+    assert len(store) == 4
+    for row, data in enumerate(rows):
+        assert store.get_row(row) == data
+    columns = store.columns
+    assert columns["source"].kind == "str"
+    assert columns["source"].categories == ["a", "b"]
+    assert columns["affinity"].kind == "float"
+    assert columns["unbiased"].kind == "bool"
+    # int64 overflow converts the column to a list of objects
+    assert columns["n"].kind == "object"
+    assert store.get_column("affinity") == [1.5, None, None, 0.5]
+
+    assert store.select("source", "a") == [0, 3]
+    assert store.select("source", "c") == []
+    assert store.select("source", predicate=lambda x: x > "a") == [1]
+    assert store.select("unbiased", True) == [0, 3]
+    assert store.select("affinity", predicate=lambda x: x > 1) == [0]
+    assert store.select("n", 2**70) == [1]
+    assert store.select("missing", 1) == []
+
+    # Values of another kind convert the column to a list of objects
+    store.set(2, "affinity", "high")
+    assert columns["affinity"].kind == "object"
+    assert store.get_column("affinity") == [1.5, None, "high", 0.5]
+    store.delete(0, "source")
+    with pytest.raises(KeyError):
+        store.get(0, "source")
+    assert store.select("source", "a") == [3]
+
+
+def test_columnar_graph():
+    path = os.path.join(directory, "data", "disease-gene-example-graph.json")
+    graph = hetnetpy.readwrite.read_graph(path)
+    writable = hetnetpy.readwrite.writable_from_graph(graph)
+    for i, edge in enumerate(writable["edges"]):
+        edge["data"] = {"source": "ab"[i % 2], "weight": i}
+    graph = hetnetpy.readwrite.graph_from_writable(writable)
+    columnar = hetnetpy.readwrite.graph_from_writable(writable, columnar_data=True)
+    assert hetnetpy.readwrite.writable_from_graph(columnar) == writable
+
+    for edge in graph.get_edges(exclude_inverts=False):
+        assert columnar.get_edge(edge.get_id()).data == edge.data
+    for abbrev in "GiG", "GaD", "DaG":
+        for value in "a", "b":
+            expected = graph.filter_edges(abbrev, "source", value)
+            observed = columnar.filter_edges(abbrev, "source", value)
+            assert observed == expected
+        expected = graph.filter_edges(abbrev, "weight", predicate=lambda x: x > 5)
+        observed = columnar.filter_edges(abbrev, "weight", predicate=lambda x: x > 5)
+        assert observed == expected
+
+    node = columnar.get_node(("Gene", "IRF1"))
+    node.data["chromosome"] = 5
+    assert columnar.filter_nodes("Gene", "chromosome", 5) == [node]
+    node.data = {"symbol": "IRF1"}
+    assert node.data == {"symbol": "IRF1"}
+    assert columnar.filter_nodes("Gene", "chromosome", 5) == []
+    edge = next(columnar.get_edges())
+    edge.data["weight"] = -1
+    assert edge.inverse.data["weight"] == -1
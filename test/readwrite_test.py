@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 import hetnetpy.readwrite
 
 directory = os.path.dirname(os.path.abspath(__file__))
@@ -47,3 +49,30 @@ def test_metagraph_reading_no_abbrev():
     """
     path = os.path.join(directory, "data", "hetionet-v1.0-metagraph-no-abbrev.json")
     read_hetionet_v1_0_metagraph(path)
+
+
+@pytest.mark.parametrize("virtual_inverses", [False, True])
+def test_graph_round_trip_order(virtual_inverses):
+    """
+    Test that writing a graph that was read preserves the order of its nodes
+    and edges.
+    """
+    path = os.path.join(directory, "data", "random-subgraph.json.xz")
+    writable = hetnetpy.readwrite.extract_writable(path)
+    graph = hetnetpy.readwrite.graph_from_writable(
+        writable, virtual_inverses=virtual_inverses
+    )
+    written = hetnetpy.readwrite.writable_from_graph(graph)
+    assert [(node["kind"], node["identifier"]) for node in written["nodes"]] == [
+        (node["kind"], node["identifier"]) for node in writable["nodes"]
+    ]
+    assert list(map(get_edge_id, written["edges"])) == list(
+        map(get_edge_id, writable["edges"])
+    )
+
+
+def get_edge_id(edge):
+    """Return the edge id of an edge in a writable."""
+    source_id = tuple(edge["source_id"])
+    target_id = tuple(edge["target_id"])
+    return source_id, target_id, edge["kind"], edge["direction"]
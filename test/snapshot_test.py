@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import pickle
+
+import pytest
+
+import hetnetpy.readwrite
+import hetnetpy.snapshot
+from hetnetpy.matrix import metaedge_to_adjacency_matrix
+from hetnetpy.pathtools import DWPC, paths_between
+from hetnetpy.snapshot import GraphSnapshot, create_snapshot
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_graph():
+    path = os.path.join(directory, "data", "disease-gene-example-graph.json")
+    return hetnetpy.readwrite.read_graph(path)
+
+
+def compute_dwpc(graph, abbrev="GiGaD"):
+    metapath = graph.metagraph.metapath_from_abbrev(abbrev)
+    paths = paths_between(
+        graph, ("Gene", "IRF1"), ("Disease", "Multiple Sclerosis"), metapath
+    )
+    return len(paths), DWPC(paths, damping_exponent=0.5)
+
+
+@pytest.fixture
+def snapshot():
+    snapshot = create_snapshot(get_graph())
+    yield snapshot
+    snapshot.close()
+    snapshot.unlink()
+
+
+@pytest.mark.parametrize("abbrev", ["GiGaD", "GaDaG", "GeTlD", "GiGiGaD"])
+def test_snapshot_dwpc(snapshot, abbrev):
+    graph = get_graph()
+    metapath = graph.metagraph.metapath_from_abbrev(abbrev)
+    target_kind = metapath.target().identifier
+    target = "STAT3" if target_kind == "Gene" else "Multiple Sclerosis"
+    dwpcs = list()
+    for graph_ in graph, snapshot:
+        paths = paths_between(graph_, ("Gene", "IRF1"), (target_kind, target), metapath)
+        dwpcs.append(DWPC(paths, damping_exponent=0.5))
+    assert dwpcs[0] == pytest.approx(dwpcs[1])
+
+
+def test_snapshot_matches_graph(snapshot):
+    graph = get_graph()
+    assert snapshot.n_nodes == graph.n_nodes
+    assert snapshot.n_edges == graph.n_edges
+    assert len(snapshot.node_dict) == len(graph.node_dict)
+    assert set(snapshot.node_dict) == set(graph.node_dict)
+    for node_id, node in graph.node_dict.items():
+        snapshot_node = snapshot.node_dict[node_id]
+        assert snapshot_node.name == node.name
+        for metaedge, edges in node.edges.items():
+            snapshot_edges = snapshot_node.edges[metaedge]
+            assert set(snapshot_edges) == edges
+            assert snapshot_node.get_degree(metaedge) == len(edges)
+            for edge in snapshot_edges:
+                assert edge.inverted == graph.get_edge(edge.get_id()).inverted
+    for metaedge in graph.metagraph.get_edges(exclude_inverts=False):
+        expected = metaedge_to_adjacency_matrix(graph, metaedge, dense_threshold=0)
+        observed = metaedge_to_adjacency_matrix(snapshot, metaedge, dense_threshold=0)
+        assert observed[0] == expected[0]
+        assert observed[1] == expected[1]
+        assert (observed[2] == expected[2]).all()
+
+
+@pytest.mark.parametrize("exclude_inverts", [True, False])
+def test_snapshot_edges(snapshot, exclude_inverts):
+    """Snapshots generate edges like graphs."""
+    graph = get_graph()
+    expected = {edge.get_id() for edge in graph.get_edges(exclude_inverts)}
+    observed = [edge.get_id() for edge in snapshot.get_edges(exclude_inverts)]
+    assert len(observed) == len(expected)
+    assert set(observed) == expected
+
+
+def test_snapshot_file(tmp_path):
+    path = tmp_path / "graph.snapshot"
+    with create_snapshot(get_graph(), path) as snapshot:
+        assert snapshot.name is None
+        assert compute_dwpc(snapshot) == pytest.approx(compute_dwpc(get_graph()))
+    with GraphSnapshot.open(path) as snapshot:
+        assert compute_dwpc(snapshot) == pytest.approx(compute_dwpc(get_graph()))
+
+
+def test_snapshot_multiprocessing(snapshot):
+    """Worker processes attach to the shared memory of a pickled snapshot."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(2) as pool:
+        results = pool.map(compute_dwpc, [snapshot] * 2)
+    expected = compute_dwpc(get_graph())
+    for result in results:
+        assert result == pytest.approx(expected)
+
+
+def test_snapshot_attach_in_creator(snapshot, monkeypatch):
+    """
+    Attaching in the creating process keeps the creator's resource tracker
+    registration of the shared memory block.
+    """
+    unregistered = list()
+    unregister = hetnetpy.snapshot.resource_tracker.unregister
+
+    def record_unregister(name, rtype):
+        unregistered.append(name)
+        unregister(name, rtype)
+
+    monkeypatch.setattr(
+        hetnetpy.snapshot.resource_tracker, "unregister", record_unregister
+    )
+    assert snapshot.creator
+    with pickle.loads(pickle.dumps(snapshot)) as attached:
+        assert attached.name == snapshot.name
+        assert attached.creator
+        assert compute_dwpc(attached) == pytest.approx(compute_dwpc(get_graph()))
+    assert unregistered == []
+    assert compute_dwpc(snapshot) == pytest.approx(compute_dwpc(get_graph()))
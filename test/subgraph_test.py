@@ -1,6 +1,11 @@
 import os
 
+import pytest
+import scipy.sparse
+
 import hetnetpy.readwrite
+from hetnetpy.matrix import metaedge_to_adjacency_matrix
+from hetnetpy.pathtools import DWPC, paths_between
 
 directory = os.path.dirname(os.path.abspath(__file__))
 
@@ -106,3 +111,117 @@ def test_subgraph_metaedges_subset():
     assert subgraph.metagraph.n_edges == 1
     assert subgraph.n_nodes == 7
     assert subgraph.n_edges == 5
+
+
+def to_dense(matrix):
+    if scipy.sparse.issparse(matrix):
+        return matrix.toarray()
+    return matrix
+
+
+@pytest.mark.parametrize(
+    "metanodes, nodes",
+    [
+        (None, None),
+        (["Gene", "Disease"], None),
+        (None, [("Gene", "STAT3"), ("Gene", "CXCR4"), ("Gene", "IRF1")]),
+    ],
+)
+def test_subgraph_view(metanodes, nodes):
+    """
+    Test that get_subgraph views match copies.
+    """
+    graph = get_disease_gene_example_hetnet()
+    if metanodes is not None:
+        metanodes = [graph.metagraph.get_node(mn) for mn in metanodes]
+    if nodes is not None:
+        nodes = [graph.get_node(node) for node in nodes]
+    subgraph = graph.get_subgraph(metanodes=metanodes, nodes=nodes)
+    view = graph.get_subgraph(metanodes=metanodes, nodes=nodes, view=True)
+    assert view.metagraph == subgraph.metagraph
+    assert view.n_nodes == subgraph.n_nodes
+    assert set(view.node_dict) == set(subgraph.node_dict)
+    for node_id, node in subgraph.node_dict.items():
+        view_node = view.node_dict[node_id]
+        assert view_node.data is graph.node_dict[node_id].data
+        for metaedge, edges in node.edges.items():
+            assert set(view_node.edges[metaedge]) == edges
+            assert view_node.get_degree(metaedge) == len(edges)
+    for metaedge in subgraph.metagraph.get_edges(exclude_inverts=False):
+        expected = metaedge_to_adjacency_matrix(subgraph, metaedge)
+        observed = metaedge_to_adjacency_matrix(view, metaedge)
+        assert observed[:2] == expected[:2]
+        assert (to_dense(observed[2]) == to_dense(expected[2])).all()
+    if ("Gene", "IRF1") in view and ("Gene", "STAT3") in view:
+        metapath = view.metagraph.metapath_from_abbrev("GiGiG")
+        dwpcs = list()
+        for graph_ in subgraph, view:
+            paths = paths_between(graph_, ("Gene", "IRF1"), ("Gene", "STAT3"), metapath)
+            dwpcs.append(DWPC(paths, damping_exponent=0.5))
+        assert dwpcs[0] == pytest.approx(dwpcs[1])
+
+
+def test_subgraph_view_masks():
+    """
+    Test that get_subgraph views share masks with their parent.
+    """
+    graph = get_disease_gene_example_hetnet()
+    metanodes = [graph.metagraph.get_node("Gene")]
+    view = graph.get_subgraph(metanodes=metanodes, view=True)
+    node = view.get_node(("Gene", "IRF1"))
+    interaction = view.metagraph.get_metaedge("GiG")
+    degree = node.get_degree(interaction)
+    edge = node.edges[interaction][0]
+    graph.get_edge(edge.get_id()).mask()
+    assert edge.masked
+    assert node.get_degree(interaction) == degree - 1
+    graph.unmask()
+    assert node.get_degree(interaction) == degree
+
+
+def test_subgraph_view_edges():
+    """
+    Test that get_subgraph views generate edges like graphs.
+    """
+    graph = get_disease_gene_example_hetnet()
+    metanodes = [graph.metagraph.get_node(mn) for mn in ["Gene", "Disease"]]
+    subgraph = graph.get_subgraph(metanodes=metanodes)
+    view = graph.get_subgraph(metanodes=metanodes, view=True)
+    for exclude_inverts in True, False:
+        expected = {edge.get_id() for edge in subgraph.get_edges(exclude_inverts)}
+        observed = [edge.get_id() for edge in view.get_edges(exclude_inverts)]
+        assert len(observed) == len(expected)
+        assert set(observed) == expected
+
+
+@pytest.mark.parametrize("change", ["remove_node", "add_edge", "mask"])
+def test_subgraph_view_invalidation(change):
+    """
+    Test that get_subgraph views cannot be used after their parent's nodes or
+    edges change.
+    """
+    graph = get_disease_gene_example_hetnet()
+    metanodes = [graph.metagraph.get_node("Gene")]
+    view = graph.get_subgraph(metanodes=metanodes, view=True)
+    node = view.get_node(("Gene", "STAT3"))
+    interaction = view.metagraph.get_metaedge("GiG")
+    if change == "remove_node":
+        graph.remove_node(("Gene", "IRF1"))
+    elif change == "add_edge":
+        graph.add_edge(("Gene", "STAT3"), ("Gene", "ITCH"), "interaction", "both")
+    else:
+        graph.get_node(("Gene", "IRF1")).mask()
+        assert view.get_node(("Gene", "IRF1")).masked
+        metaedge_to_adjacency_matrix(view, interaction)
+        return
+    match = "view is invalid"
+    with pytest.raises(AssertionError, match=match):
+        view.get_node(("Gene", "STAT3"))
+    with pytest.raises(AssertionError, match=match):
+        node.edges[interaction]
+    with pytest.raises(AssertionError, match=match):
+        node.get_degree(interaction)
+    with pytest.raises(AssertionError, match=match):
+        list(view.get_nodes())
+    with pytest.raises(AssertionError, match=match):
+        metaedge_to_adjacency_matrix(view, interaction)
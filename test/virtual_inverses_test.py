@@ -0,0 +1,154 @@
+import os
+
+import pytest
+
+import hetnetpy.hetnet
+import hetnetpy.readwrite
+from hetnetpy.pathtools import DWPC, path_degree_product, paths_between
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_graph(name, virtual_inverses):
+    path = os.path.join(directory, "data", name)
+    return hetnetpy.readwrite.read_graph(path, virtual_inverses=virtual_inverses)
+
+
+@pytest.mark.parametrize(
+    "name", ["disease-gene-example-graph.json", "random-subgraph.json.xz"]
+)
+def test_virtual_inverses_match_stored_inverses(name):
+    graph = read_graph(name, virtual_inverses=False)
+    virtual = read_graph(name, virtual_inverses=True)
+    assert virtual.n_edges == graph.n_edges
+    assert virtual.n_inverts == graph.n_inverts
+    assert len(virtual.edge_dict) == virtual.n_edges
+
+    edge_ids = {edge.get_id() for edge in graph.get_edges(exclude_inverts=False)}
+    virtual_edges = list(virtual.get_edges(exclude_inverts=False))
+    assert len(virtual_edges) == len(edge_ids)
+    assert {edge.get_id() for edge in virtual_edges} == edge_ids
+    for edge in virtual_edges:
+        assert edge.inverse.inverse == edge
+        assert edge.inverted == graph.get_edge(edge.get_id()).inverted
+        assert virtual.get_edge(edge.get_id()) == edge
+
+    for node_id, node in graph.node_dict.items():
+        virtual_node = virtual.node_dict[node_id]
+        for metaedge, edges in node.edges.items():
+            virtual_edges = virtual_node.edges[metaedge]
+            assert len(virtual_edges) == len(edges)
+            assert virtual_edges == edges
+            for edge in edges:
+                assert edge in virtual_edges
+                assert edge.source == virtual_node
+
+    assert hetnetpy.readwrite.writable_from_graph(
+        virtual
+    ) == hetnetpy.readwrite.writable_from_graph(graph)
+
+
+@pytest.mark.parametrize("abbrev", ["GeTlD", "GiGaD", "GaDaG"])
+def test_virtual_inverses_dwpc(abbrev):
+    dwpcs = list()
+    for virtual_inverses in False, True:
+        graph = read_graph("disease-gene-example-graph.json", virtual_inverses)
+        metapath = graph.metagraph.metapath_from_abbrev(abbrev)
+        target_kind = metapath.target().identifier
+        target = "STAT3" if target_kind == "Gene" else "Multiple Sclerosis"
+        paths = paths_between(graph, ("Gene", "IRF1"), (target_kind, target), metapath)
+        dwpcs.append(DWPC(paths, damping_exponent=0.5))
+    assert dwpcs[0] == pytest.approx(dwpcs[1])
+
+
+def test_virtual_inverses_add_edge():
+    metagraph = hetnetpy.hetnet.MetaGraph.from_edge_tuples(
+        [
+            ("gene", "gene", "regulates", "forward"),
+            ("gene", "gene", "interacts", "both"),
+        ]
+    )
+    graph = hetnetpy.hetnet.Graph(metagraph, virtual_inverses=True)
+    a = graph.add_node("gene", "a")
+    b = graph.add_node("gene", "b")
+
+    # Adding an inverted edge stores its forward orientation
+    edge, inverse = graph.add_edge(a, b, "regulates", "backward")
+    assert edge.inverted and not inverse.inverted
+    assert edge.get_id() == (("gene", "a"), ("gene", "b"), "regulates", "backward")
+    assert list(graph.edge_dict) == [inverse.get_id()]
+    with pytest.raises(AssertionError):
+        graph.add_edge(b, a, "regulates", "forward")
+
+    edge, inverse = graph.add_edge(a, b, "interacts", "both")
+    with pytest.raises(AssertionError):
+        graph.add_edge(b, a, "interacts", "both")
+    interacts = metagraph.get_metaedge(("gene", "gene", "interacts", "both"))
+    assert b.edges[interacts] == {inverse}
+    assert a.get_edges(interacts) == {edge}
+
+    # Bidirectional self loops are their own inverse
+    edge, inverse = graph.add_edge(a, a, "interacts", "both")
+    assert edge is inverse
+    assert graph.get_edge(edge.get_id()) is edge
+    assert edge in a.edges[interacts]
+    assert len(a.edges[interacts]) == 2
+    assert graph.n_edges == 3
+    assert graph.n_inverts == 2
+
+    # Masks of virtual inverses persist across materializations
+    edge.mask()
+    forward = graph.get_edge((("gene", "a"), ("gene", "b"), "interacts", "both"))
+    assert a.get_edges(interacts) == {forward}
+    forward.inverse.mask()
+    assert forward.inverse.masked
+    assert not forward.masked
+    assert b.get_edges(interacts) == set()
+
+
+def test_virtual_inverses_set_operations():
+    """
+    Test that set operations on virtual incident edges return the same edges
+    as on stored incident edges.
+    """
+    graph = read_graph("disease-gene-example-graph.json", virtual_inverses=False)
+    virtual = read_graph("disease-gene-example-graph.json", virtual_inverses=True)
+    metaedge = graph.metagraph.get_metaedge("GiG")
+    edges = graph.get_node(("Gene", "IRF1")).edges[metaedge]
+    virtual_edges = virtual.get_node(("Gene", "IRF1")).edges[metaedge]
+    assert isinstance(virtual_edges, hetnetpy.hetnet.IncidentEdgeSet)
+    other = set(list(edges)[:2])
+    assert virtual_edges - other == edges - other
+    assert len(virtual_edges - other) == len(edges) - 2
+    assert virtual_edges & other == other
+    assert virtual_edges | other == edges
+    assert type(virtual_edges - other) is set
+
+
+@pytest.mark.parametrize("exclude_masked", [True, False])
+def test_virtual_inverses_dwpc_exclude_edges(exclude_masked):
+    """
+    Test path degree products excluding edges with virtual inverses.
+    """
+    degree_products = list()
+    for virtual_inverses in False, True:
+        graph = read_graph("disease-gene-example-graph.json", virtual_inverses)
+        metapath = graph.metagraph.metapath_from_abbrev("GiGaD")
+        paths = paths_between(
+            graph, ("Gene", "IRF1"), ("Disease", "Multiple Sclerosis"), metapath
+        )
+        edge_id = ("Gene", "IRF1"), ("Gene", "IRF8"), "interaction", "both"
+        exclude_edges = {graph.get_edge(edge_id)}
+        degree_products.append(
+            sorted(
+                path_degree_product(
+                    path,
+                    0.5,
+                    exclude_edges=exclude_edges,
+                    exclude_masked=exclude_masked,
+                )
+                for path in paths
+            )
+        )
+    assert all(product > 0 for product in degree_products[0])
+    assert degree_products[0] == pytest.approx(degree_products[1])